@@ -0,0 +1,64 @@
+"""Per-call overhead of the package logger.
+
+Compares eager f-string vs lazy %-style calls with DEBUG disabled, and the
+cost of an enabled INFO call with the direct stream handler vs the queue
+handler. Output goes to os.devnull, so the direct handler never blocks here;
+with a slow or blocked stream only the queue handler keeps the caller free.
+
+    python benchmarks/bench_logging.py
+"""
+import logging
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from genie_client.utils.logging import StructuredFormatter, flush_logging, setup_logger  # noqa: E402
+
+N = 100_000
+METHOD, URL = "GET", "https://adb-123.azuredatabricks.net/api/2.0/genie/spaces/abc/conversations/def"
+METRICS = {"success": True, "status": "COMPLETED", "duration_ms": 1234.5, "result_row_count": 3333}
+
+
+def make_logger(name, use_queue, sample_rates=None):
+    if use_queue:
+        # The listener's StreamHandler writes to sys.stderr, redirected in main()
+        return setup_logger(name, use_queue=True, sample_rates=sample_rates)
+    logger = logging.getLogger(name)
+    handler = logging.StreamHandler(open(os.devnull, "w"))
+    handler.setFormatter(StructuredFormatter())
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+def per_call_us(stmt, globals_):
+    return min(timeit.repeat(stmt, globals=globals_, number=N, repeat=3)) / N * 1e6
+
+
+def main():
+    sys.stderr = open(os.devnull, "w")  # listener's StreamHandler writes to stderr
+    direct = make_logger("bench.direct", use_queue=False)
+    queued = make_logger("bench.queued", use_queue=True)
+    sampled = make_logger("bench.sampled", use_queue=True, sample_rates={"poll": 10})
+    env = {"direct": direct, "queued": queued, "sampled": sampled, "METHOD": METHOD, "URL": URL,
+           "METRICS": METRICS}
+
+    rows = [
+        ("debug disabled, f-string", per_call_us('direct.debug(f"Making {METHOD} request to {URL}")', env)),
+        ("debug disabled, lazy %s", per_call_us('direct.debug("Making %s request to %s", METHOD, URL)', env)),
+        ("info + metrics, direct handler", per_call_us('direct.info("Operation metrics", extra={"metrics": METRICS})', env)),
+        ("info + metrics, queue handler", per_call_us('queued.info("Operation metrics", extra={"metrics": METRICS})', env)),
+        ("poll event, sampled 1-in-10", per_call_us('sampled.info("Poll status: %s", "EXECUTING_QUERY", extra={"event": "poll"})', env)),
+    ]
+    flush_logging()
+    sys.stderr = sys.__stderr__
+    width = max(len(name) for name, _ in rows)
+    for name, us in rows:
+        print(f"{name:<{width}}  {us:8.3f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Row-level diff of a 200,000-row result against a re-run with 1% of rows changed.
+
+Times building the row index from a previous result, diffing the re-run
+chunk by chunk (with key columns and without, with column types and
+without), and rendering the markdown
+table a consumer would otherwise rebuild on every run.
+
+    python benchmarks/bench_refresh.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from genie_client.core.refresh import RowIndex  # noqa: E402
+from genie_client.utils.tables import render_table  # noqa: E402
+
+ROWS = 200_000
+CHUNK = 20_000
+COLUMNS = ["order_id", "customer", "quantity", "unit_price", "total", "status"]
+TYPES = ["LONG", "STRING", "INT", "DECIMAL", "DOUBLE", "STRING"]
+
+
+def make_rows(version):
+    rows = [[str(1_000_000 + i), f"customer {i % 977}", str(i % 40), f"{(i % 500) / 3:.4f}",
+             f"{i * 1.37:.2f}", "shipped"] for i in range(ROWS)]
+    if version:
+        for i in range(0, ROWS, 200):
+            rows[i][5] = "returned"  # 0.5% updated
+        del rows[1::400]  # 0.25% deleted
+        rows.extend([str(2_000_000 + i), "new", "1", "9.9900", "9.99", "open"] for i in range(500))
+    return rows
+
+
+def timed(name, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{name:<36} {(time.perf_counter() - start) * 1000:>8.1f} ms")
+    return result
+
+
+def main():
+    old_rows, new_rows = make_rows(0), make_rows(1)
+    chunks = [new_rows[i:i + CHUNK] for i in range(0, len(new_rows), CHUNK)]
+    for keys, types in ((["order_id"], TYPES), (["order_id"], None), (None, None)):
+        label = ("keyed" if keys else "whole row") + (", typed" if types else "")
+        index = timed(f"index previous rows ({label})",
+                      lambda: RowIndex.from_rows(COLUMNS, keys, old_rows, types))
+        _, delta = timed(f"diff re-run ({label})", lambda: index.diff(chunks))
+        print(f"  inserted {len(delta['inserted'])}, updated {len(delta['updated'])}, "
+              f"deleted {len(delta['deleted'])}")
+    timed("render full table (for comparison)", lambda: render_table(COLUMNS, new_rows))
+
+
+if __name__ == "__main__":
+    main()
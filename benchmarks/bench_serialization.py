@@ -0,0 +1,67 @@
+"""Size and speed of the binary GenieResponse format vs JSON.
+
+Round-trips follow_up_response.json (3,333 rows, shared by the response and
+its query attachment as GenieClient returns them) through pydantic's
+model_dump_json/model_validate_json and through dump_response/load_response
+with and without zstd, and times reading only the metadata of a serialized
+response with open_response.
+
+    python benchmarks/bench_serialization.py
+"""
+import json
+import os
+import sys
+import timeit
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, ROOT)
+
+from genie_client.models.response_models import Attachment, GenieResponse  # noqa: E402
+from genie_client.models.serialization import dump_response, load_response, open_response  # noqa: E402
+
+N = 20
+
+
+def load_fixture() -> GenieResponse:
+    with open(os.path.join(ROOT, "follow_up_response.json")) as f:
+        raw = json.load(f)
+    raw["attachments"] = [Attachment(**a) for a in raw.get("attachments", [])]
+    response = GenieResponse(**raw)
+    # As in GenieClient, the first query attachment carries the same results
+    for attachment in response.query_attachments[:1]:
+        attachment.results = response.results
+    return response
+
+
+def report(name, size, dump_s, load_s):
+    print(f"{name:<14} {size / 1024:>9.1f} KiB {dump_s * 1000:>9.2f} ms {load_s * 1000:>9.2f} ms")
+
+
+def main():
+    response = load_fixture()
+    print(f"{len(response.results['data'])} rows, {N} iterations\n")
+    print(f"{'format':<14} {'size':>13} {'dump':>12} {'load':>12}")
+
+    encoded = response.model_dump_json()
+    report(
+        "json",
+        len(encoded.encode()),
+        timeit.timeit(response.model_dump_json, number=N) / N,
+        timeit.timeit(lambda: GenieResponse.model_validate_json(encoded), number=N) / N,
+    )
+    for name, compress in (("msgpack", False), ("msgpack+zstd", True)):
+        data = dump_response(response, compress=compress)
+        report(
+            name,
+            len(data),
+            timeit.timeit(lambda: dump_response(response, compress=compress), number=N) / N,
+            timeit.timeit(lambda: load_response(data), number=N) / N,
+        )
+
+    data = dump_response(response)
+    metadata_s = timeit.timeit(lambda: open_response(data).metadata["status"], number=N) / N
+    print(f"\nmetadata only (open_response): {metadata_s * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
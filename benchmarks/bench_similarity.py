@@ -0,0 +1,66 @@
+"""Lookup latency and hit rate of the question-similarity index.
+
+Indexes 4,800 distinct analytics questions in one space, generated from
+metric x dimension x month x year templates, then looks up rephrasings of indexed
+questions (which should match) and questions for other periods (which must
+not).
+
+    python benchmarks/bench_similarity.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from genie_client.core.similarity import QuestionIndex  # noqa: E402
+
+METRICS = ["revenue", "order count", "average order value", "units sold", "refund rate",
+           "gross margin", "new customers", "returning customers", "discount amount", "basket size"]
+DIMENSIONS = ["product", "franchise", "city", "country", "payment method", "customer segment",
+              "sales channel", "store size", "weekday", "hour of day"]
+MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August",
+          "September", "October", "November", "December"]
+YEARS = ["2021", "2022", "2023", "2024", "2025"]
+
+ASKED = "What was the {metric} by {dimension} in {month} {year}?"
+REPHRASED = "Show me {month} {year} {metric} by {dimension}"
+
+
+def questions():
+    for metric in METRICS:
+        for dimension in DIMENSIONS:
+            for month in MONTHS:
+                for year in YEARS[:-1]:
+                    yield dict(metric=metric, dimension=dimension, month=month, year=year)
+
+
+def main():
+    index = QuestionIndex(max_size=20_000, ttl=0)
+    params = list(questions())
+    start = time.perf_counter()
+    for i, p in enumerate(params):
+        index.add("space", ASKED.format(**p), f"SELECT {i}")
+    print(f"indexed {len(index):,} questions in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    rng = random.Random(0)
+    sample = rng.sample(params, 1000)
+    for name, template, year, expect in (
+        ("rephrased", REPHRASED, None, True),
+        ("other year", ASKED, YEARS[-1], False),
+    ):
+        lookups = [template.format(**{**p, "year": year or p["year"]}) for p in sample]
+        start = time.perf_counter()
+        matches = [index.lookup("space", q) for q in lookups]
+        per_lookup_us = (time.perf_counter() - start) / len(lookups) * 1e6
+        correct = sum(
+            (m is not None and m.sql == f"SELECT {params.index(p)}") if expect else m is None
+            for m, p in zip(matches, sample)
+        )
+        print(f"{name:<11} {per_lookup_us:>7.1f} us/lookup   correct {correct}/{len(lookups)}")
+    print(index.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Markdown table rendering of 100,000 result rows.
+
+Compares the previous per-cell formatter (kept below as ``legacy_format``)
+with the column-wise renderer on string cells as Genie returns them. The
+legacy formatter only formats typed numbers, so it is also timed after
+converting the cells with convert_column. Cases: the full table, the full
+table streamed in 10 chunks, and a 2,000-token prompt budget read from an
+iterator. Times are the best of three runs.
+
+    python benchmarks/bench_tables.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from genie_client.utils.tables import TableRenderer, render_table  # noqa: E402
+from genie_client.utils.types import convert_column  # noqa: E402
+
+ROWS = 100_000
+COLUMNS = ["order_id", "customer", "quantity", "unit_price", "total", "created_at"]
+TYPES = ["LONG", "STRING", "INT", "DOUBLE", "DECIMAL", "TIMESTAMP"]
+
+
+def make_rows():
+    return [
+        [str(1_000_000 + i), f"customer {i % 977}", str(i % 40), f"{(i % 500) / 3:.4f}",
+         f"{i * 1.37:.2f}", "2024-05-14T12:17:01.495Z"]
+        for i in range(ROWS)
+    ]
+
+
+def legacy_format(columns, data, max_rows=100):
+    """format_results_to_markdown before the column-wise renderer"""
+    truncated = False
+    if len(data) > max_rows:
+        data = data[:max_rows]
+        truncated = True
+    header = "| " + " | ".join(columns) + " |"
+    separator = "| " + " | ".join(["---"] * len(columns)) + " |"
+    rows = []
+    for row in data:
+        formatted_row = []
+        for value in row:
+            if isinstance(value, (int, float)):
+                if abs(value) >= 1000:
+                    value = f"{value:,.2f}" if isinstance(value, float) else f"{value:,}"
+            formatted_row.append(str(value))
+        rows.append("| " + " | ".join(formatted_row) + " |")
+    table = "\n".join([header, separator] + rows)
+    if truncated:
+        table += f"\n\n*Showing first {max_rows} of {len(data)} rows*"
+    return table
+
+
+def timed(name, fn, repeat=3):
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = fn()
+        elapsed = min(elapsed, (time.perf_counter() - start) * 1000)
+    print(f"{name:<34} {elapsed:>9.1f} ms {len(output) / 1024:>9.1f} KiB")
+
+
+def legacy_typed(rows):
+    """Typing cells first is what the legacy formatter needs to format numbers"""
+    columns = [convert_column(values, type_name) for values, type_name in zip(zip(*rows), TYPES)]
+    return legacy_format(COLUMNS, [list(row) for row in zip(*columns)], max_rows=len(rows))
+
+
+def streamed(rows):
+    renderer = TableRenderer(COLUMNS, TYPES, total_rows=len(rows))
+    step = len(rows) // 10
+    parts = [renderer.feed(rows[i:i + step]) for i in range(0, len(rows), step)]
+    return "".join(parts) + renderer.finish()
+
+
+def main():
+    rows = make_rows()
+    print(f"{ROWS:,} rows x {len(COLUMNS)} columns\n")
+    print(f"{'renderer':<34} {'time':>12} {'output':>13}")
+    timed("legacy, all rows", lambda: legacy_format(COLUMNS, rows, max_rows=ROWS))
+    timed("legacy after typing, all rows", lambda: legacy_typed(rows))
+    timed("column-wise, all rows", lambda: render_table(COLUMNS, rows, TYPES))
+    timed("column-wise, 10 streamed chunks", lambda: streamed(rows))
+    timed("legacy, 100 rows", lambda: legacy_format(COLUMNS, rows))
+    timed("column-wise, 2,000 tokens", lambda: render_table(COLUMNS, iter(rows), TYPES, max_tokens=2000))
+
+
+if __name__ == "__main__":
+    main()
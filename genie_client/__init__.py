@@ -1,5 +1,28 @@
-from .core.client import GenieClient
-from .core.api_client import GenieAPIClient
-from .core.auth import TokenManager
+import importlib
 
-__all__ = ["GenieClient", "GenieAPIClient", "TokenManager"]
\ No newline at end of file
+# Public names are resolved on first access so that importing the package
+# does not pull in requests, pydantic and the client modules up front.
+_LAZY_EXPORTS = {
+    "GenieClient": ".core.client",
+    "GenieAPIClient": ".core.api_client",
+    "TokenManager": ".core.auth",
+    "GenieConversation": ".core.conversation",
+    "FileConversationStore": ".core.conversation",
+    "GenieClientPool": ".core.pool",
+    "SpaceGroup": ".core.space_groups",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,6 +1,5 @@
 from pydantic import AnyHttpUrl, BaseModel, Field, model_validator, field_validator, ValidationInfo
-from typing import Optional, Union
-from .utils.prompts import DEFAULT_SYSTEM_PROMPT, DEFAULT_USER_PROMPT
+from typing import Any, Dict, List, Literal, Optional, Union
 
 class BaseGenieClientConfig(BaseModel):
     """Base configuration with common fields"""
@@ -13,6 +12,46 @@ class BaseGenieClientConfig(BaseModel):
     model_endpoint_name: Optional[str] = Field(None, description="Model serving endpoint name")
     system_prompt_template: Optional[str] = Field(None, description="System prompt template")
     user_prompt_template: Optional[str] = Field(None, description="User prompt template")
+    nl_table_max_tokens: int = Field(2000, ge=1, description="Approximate tokens of result tables included in the NL prompt")
+    memory_budget_mb: Optional[float] = Field(None, gt=0, description="Result memory held across concurrent requests before fetches wait")
+    memory_wait_timeout: float = Field(30.0, ge=0, description="Seconds a chunk fetch waits for memory before overflowing")
+    memory_overflow: Literal["spill", "reject"] = Field("spill", description="Spill results to disk or reject them when memory stays unavailable")
+    spill_directory: Optional[str] = Field(None, description="Directory for spilled results (system temp dir by default)")
+    offload_workers: Optional[int] = Field(None, ge=1, description="Decode and format results in this many worker processes")
+    typed_results: bool = Field(False, description="Convert result cells from strings to Python values using the manifest column types")
+    fetch_policy: Literal["none", "metadata", "first_rows", "full", "lazy"] = Field("full", description="Query results downloaded for completed messages")
+    fetch_first_rows: int = Field(100, ge=1, description="Rows downloaded by the first_rows fetch policy")
+    space_groups: Optional[Dict[str, Union[List[str], Dict[str, float]]]] = Field(None, description="Named groups of equivalent spaces (space IDs, or space ID to weight), usable as space_id")
+    space_routing: Literal["least_outstanding", "lowest_latency", "weighted"] = Field("least_outstanding", description="How a space group picks the space for a new question")
+    space_failure_threshold: int = Field(3, ge=1, description="Consecutive errors before a grouped space is skipped")
+    space_cooldown_seconds: float = Field(30.0, gt=0, description="Seconds an erroring grouped space is skipped")
+    profile_every: Optional[int] = Field(None, ge=1, description="Profile one in this many ask_genie and execute_sql calls")
+    profile_directory: Optional[str] = Field(None, description="Directory receiving full CPU and allocation profiles of profiled calls")
+    max_attachment_workers: int = Field(4, ge=1, description="Query attachments fetched concurrently per message")
+    warehouse_id: Optional[str] = Field(None, description="SQL warehouse ID (resolved from the space if not set)")
+    enable_sql_cache: bool = Field(False, description="Re-execute cached SQL for repeated questions")
+    sql_cache_size: int = Field(256, ge=1, description="Maximum cached question-to-SQL mappings")
+    sql_cache_ttl: int = Field(3600, ge=0, description="Seconds a cached SQL mapping stays valid (0 = no expiry)")
+    enable_question_index: bool = Field(False, description="Reuse answers of similar earlier questions")
+    question_similarity_threshold: float = Field(0.8, gt=0, le=1, description="Trigram similarity at which an earlier question's answer is reused")
+    question_index_size: int = Field(1024, ge=1, description="Questions indexed per space")
+    question_index_ttl: int = Field(3600, ge=0, description="Seconds an indexed question stays valid (0 = no expiry)")
+    question_reuse: Literal["sql", "results"] = Field("sql", description="Re-execute the similar question's SQL or reuse its results as-is")
+    question_audit_rate: float = Field(0.0, ge=0, le=1, description="Share of reused answers checked by asking Genie in the background")
+    enable_circuit_breakers: bool = Field(False, description="Fail fast on endpoints with high error rate or latency")
+    breaker_failure_rate: float = Field(0.5, gt=0, le=1, description="Failure ratio that opens a circuit breaker")
+    breaker_slow_call_ms: Optional[float] = Field(None, gt=0, description="Calls slower than this count towards opening the breaker")
+    breaker_window_size: int = Field(20, ge=1, description="Recent calls considered by each circuit breaker")
+    breaker_min_calls: int = Field(10, ge=1, description="Calls needed before a circuit breaker can open")
+    breaker_open_seconds: float = Field(30.0, gt=0, description="Seconds a breaker stays open before trial calls")
+    max_in_flight_requests: Optional[int] = Field(None, ge=1, description="Concurrent asks, SQL runs and refreshes allowed before shedding load")
+    max_concurrent_requests: Optional[int] = Field(None, ge=1, description="Enable the priority scheduler with this many send slots")
+    priority_classes: Optional[Dict[str, Dict[str, Any]]] = Field(None, description="Scheduler budgets per priority class (weight, reserved, max_concurrency, rate_per_second, burst)")
+    default_priority: str = Field("interactive", description="Priority class for requests without an explicit priority")
+    enable_hedging: bool = Field(False, description="Send a backup request for slow polls and chunk downloads")
+    hedge_percentile: float = Field(95.0, gt=0, lt=100, description="Latency percentile after which a hedge is sent")
+    hedge_min_delay_ms: float = Field(50.0, ge=0, description="Minimum delay before a hedge is sent")
+    hedge_max_rate: float = Field(0.1, gt=0, le=1, description="Largest share of requests that may be hedged")
 
     # Pydantic V2 field validator (runs before other validators)
     @field_validator('databricks_url', mode='before')
@@ -26,6 +65,8 @@ class BaseGenieClientConfig(BaseModel):
     def validate_natural_language_settings(self):
         """Validate NL generation settings when enabled"""
         if self.enable_natural_language:
+            from .utils.prompts import DEFAULT_SYSTEM_PROMPT, DEFAULT_USER_PROMPT
+
             # Validate model endpoint
             if not self.model_endpoint_name:
                 raise ValueError("Model endpoint name is required when NL generation is enabled")
@@ -1,20 +1,78 @@
+import time
 import requests
-from typing import Any, Dict, Optional
-from ..utils.constants import GenieEndpoints, ModelServingEndpoints
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional
+from ..utils.constants import (
+    BreakerEndpoints, GenieEndpoints, HEDGED_REQUEST_KINDS, ModelServingEndpoints, RequestKinds,
+    SQLStatementEndpoints, SQLWarehouseEndpoints
+)
+from ..utils.circuit_breaker import AdmissionController, CircuitBreaker
+from ..utils.profiling import phase
 from ..utils.retry import retry_api_call
-from ..exceptions.custom_errors import APIRequestError, RateLimitError
+from ..exceptions.custom_errors import APIRequestError, GenieBaseError, RateLimitError
 from .auth import TokenManager
 from ..utils.logging import logger
 
+if TYPE_CHECKING:
+    from ..utils.hedging import Hedger
+    from ..utils.scheduler import RequestScheduler
+
 class GenieAPIClient:
     """Low-level client for Genie REST API operations"""
     
-    def __init__(self, base_url: str, token_manager: TokenManager):
+    def __init__(self, base_url: str, token_manager: TokenManager,
+                 breaker_settings: Optional[Dict[str, Any]] = None,
+                 max_in_flight: Optional[int] = None,
+                 session: Optional[requests.Session] = None,
+                 admission: Optional[AdmissionController] = None,
+                 scheduler: Optional["RequestScheduler"] = None,
+                 hedger: Optional["Hedger"] = None):
+        """
+        Args:
+            base_url: Databricks workspace URL
+            token_manager: Supplies bearer tokens
+            breaker_settings: CircuitBreaker keyword arguments; enables one
+                breaker per endpoint group in BreakerEndpoints when given
+            max_in_flight: Concurrent operations (see admitted) allowed before new ones are shed
+            session: Shared HTTP session; the client creates and owns one if omitted
+            admission: Shared admission controller; takes precedence over max_in_flight
+            scheduler: Priority scheduler that queues requests for a send slot
+            hedger: Sends backup requests for slow polls and chunk downloads
+        """
         self.base_url = str(base_url).rstrip('/')
         self.token_manager = token_manager
-        self.session = requests.Session()
+        self.owns_session = session is None
+        self.session = session if session is not None else requests.Session()
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        if breaker_settings is not None:
+            self.breakers = {
+                name: CircuitBreaker(name, **breaker_settings) for name in BreakerEndpoints.ALL
+            }
+        if admission is None and max_in_flight:
+            admission = AdmissionController(max_in_flight)
+        self.admission = admission
+        self.scheduler = scheduler
+        self.hedger = hedger
         logger.debug("API client initialized")
         
+    @contextmanager
+    def admitted(self, operation: str) -> Iterator[None]:
+        """
+        Holds one admission slot for a whole operation such as an ask
+
+        Raises LoadShedError when the cap is reached. Admission is taken once
+        per operation rather than per HTTP request, so the polls and chunk
+        downloads of an admitted operation are never shed half-way through.
+        """
+        if self.admission is None:
+            yield
+            return
+        self.admission.acquire(operation)
+        try:
+            yield
+        finally:
+            self.admission.release()
+
     def _build_url(self, endpoint: str) -> str:
         """Constructs full URL from endpoint template"""
         return f"{self.base_url}{endpoint}"
@@ -23,8 +81,75 @@ class GenieAPIClient:
     @retry_api_call
     def _make_request(self, method: str, endpoint: str, payload: Optional[Dict] = None, 
                     path_params: Optional[Dict] = None, 
-                    query_params: Optional[Dict] = None) -> Dict[str, Any]:
-        """Executes API request with retry logic and parameters"""
+                    query_params: Optional[Dict] = None,
+                    breaker: Optional[str] = None,
+                    kind: str = RequestKinds.OTHER,
+                    decode: bool = True) -> Dict[str, Any]:
+        """
+        Executes API request with retry logic, scheduling and circuit breaking
+
+        Returns the decoded JSON body, or the raw body bytes if ``decode`` is False.
+        """
+        if self.scheduler is None:
+            return self._guarded_send(method, endpoint, payload, path_params, query_params, breaker, kind, decode)
+        priority = self.scheduler.acquire(kind)
+        try:
+            return self._guarded_send(method, endpoint, payload, path_params, query_params, breaker, kind, decode)
+        finally:
+            self.scheduler.release(priority)
+
+    def _guarded_send(self, method: str, endpoint: str, payload: Optional[Dict],
+                      path_params: Optional[Dict], query_params: Optional[Dict],
+                      breaker: Optional[str], kind: str = RequestKinds.OTHER,
+                      decode: bool = True) -> Dict[str, Any]:
+        """Sends the request through the endpoint's circuit breaker, if any"""
+        circuit = self.breakers.get(breaker) if breaker else None
+        if circuit is None:
+            return self._hedged_send(method, endpoint, payload, path_params, query_params, kind, decode)
+
+        circuit.before_call()
+        start = time.perf_counter()
+        success = False
+        try:
+            result = self._hedged_send(method, endpoint, payload, path_params, query_params, kind, decode)
+            success = True
+            return result
+        except GenieBaseError as e:
+            success = not self._counts_as_failure(e)
+            raise
+        finally:
+            circuit.record(success, (time.perf_counter() - start) * 1000)
+
+    def _hedged_send(self, method: str, endpoint: str, payload: Optional[Dict],
+                     path_params: Optional[Dict], query_params: Optional[Dict],
+                     kind: str, decode: bool = True) -> Dict[str, Any]:
+        """Hedges idempotent polls and chunk downloads when a hedger is configured"""
+        if self.hedger is None or method != "GET" or kind not in HEDGED_REQUEST_KINDS:
+            return self._send(method, endpoint, payload, path_params, query_params, decode)
+        return self.hedger.call(
+            kind, lambda: self._send(method, endpoint, payload, path_params, query_params, decode)
+        )
+
+    @staticmethod
+    def _counts_as_failure(error: GenieBaseError) -> bool:
+        """Network errors, throttling and 5xx count against a breaker; client errors do not"""
+        if not isinstance(error, APIRequestError):
+            return False
+        return error.status_code == 0 or error.status_code == 429 or error.status_code >= 500
+
+    def resilience_metrics(self) -> Dict[str, Any]:
+        """Circuit breaker states and admission counters"""
+        return {
+            "circuit_breakers": {name: b.snapshot() for name, b in self.breakers.items()},
+            "admission": self.admission.snapshot() if self.admission else None,
+            "scheduler": self.scheduler.snapshot() if self.scheduler else None,
+            "hedging": self.hedger.snapshot() if self.hedger else None,
+        }
+
+    def _send(self, method: str, endpoint: str, payload: Optional[Dict],
+              path_params: Optional[Dict], query_params: Optional[Dict],
+              decode: bool = True) -> Dict[str, Any]:
+        """Sends a single HTTP request and decodes the JSON response (unless decode is False)"""
         url = self._build_url(endpoint)
         if path_params:
             url = url.format(**path_params)
@@ -35,15 +160,16 @@ class GenieAPIClient:
         }
         
         try:
-            logger.debug(f"Making {method} request to {url}")
-            response = self.session.request(
-                method,
-                url,
-                headers=headers,
-                params=query_params,  # Add query parameters
-                json=payload,
-                timeout=30
-            )
+            logger.debug("Making %s request to %s", method, url, extra={"event": "http_request"})
+            with phase("http"):
+                response = self.session.request(
+                    method,
+                    url,
+                    headers=headers,
+                    params=query_params,  # Add query parameters
+                    json=payload,
+                    timeout=30
+                )
 
             if response.status_code == 429:
                 raise RateLimitError(
@@ -55,10 +181,13 @@ class GenieAPIClient:
             if response.status_code >= 400:
                 self._handle_error_response(response, endpoint)
                 
-            return response.json()
+            if not decode:
+                return response.content
+            with phase("json_decode"):
+                return response.json()
         
         except requests.exceptions.RequestException as e:
-            logger.error(f"Network error: {str(e)}")
+            logger.error("Network error: %s", e)
             raise APIRequestError(
                 f"Network error: {str(e)}",
                 status_code=0,
@@ -99,7 +228,9 @@ class GenieAPIClient:
             "POST",
             GenieEndpoints.START_CONVERSATION,
             payload={"content": question},
-            path_params={"space_id": space_id}
+            path_params={"space_id": space_id},
+            breaker=BreakerEndpoints.START_CONVERSATION,
+            kind=RequestKinds.START
         )
     
     def send_message(self, space_id: str, conversation_id: str, question: str) -> Dict[str, Any]:
@@ -111,7 +242,9 @@ class GenieAPIClient:
             path_params={
                 "space_id": space_id,
                 "conversation_id": conversation_id
-            }
+            },
+            breaker=BreakerEndpoints.START_CONVERSATION,
+            kind=RequestKinds.START
         )
     
     def get_message(self, space_id: str, conversation_id: str, message_id: str) -> Dict[str, Any]:
@@ -123,7 +256,9 @@ class GenieAPIClient:
                 "space_id": space_id,
                 "conversation_id": conversation_id,
                 "message_id": message_id
-            }
+            },
+            breaker=BreakerEndpoints.GET_MESSAGE,
+            kind=RequestKinds.POLL
         )
     
     # def get_query_result(self, space_id: str, conversation_id: str, 
@@ -142,8 +277,8 @@ class GenieAPIClient:
 
     def get_query_result(self, space_id: str, conversation_id: str, 
                     message_id: str, attachment_id: str, 
-                    chunk_index: Optional[int] = None) -> Dict[str, Any]:
-        """Fetches query execution results with chunk support"""
+                    chunk_index: Optional[int] = None, decode: bool = True) -> Dict[str, Any]:
+        """Fetches query execution results with chunk support (raw bytes if decode is False)"""
         endpoint = GenieEndpoints.GET_QUERY_RESULT
         path_params = {
             "space_id": space_id,
@@ -161,9 +296,96 @@ class GenieAPIClient:
             "GET",
             endpoint,
             path_params=path_params,
-            query_params=query_params or None
+            query_params=query_params or None,
+            breaker=BreakerEndpoints.QUERY_RESULT,
+            kind=RequestKinds.CHUNK,
+            decode=decode
         )
     
+    def get_space(self, space_id: str) -> Dict[str, Any]:
+        """Retrieves Genie space details, including its SQL warehouse"""
+        return self._make_request(
+            "GET",
+            GenieEndpoints.GET_SPACE,
+            path_params={"space_id": space_id}
+        )
+
+    def get_warehouse(self, warehouse_id: str) -> Dict[str, Any]:
+        """Retrieves SQL warehouse details and state"""
+        return self._make_request(
+            "GET",
+            SQLWarehouseEndpoints.GET_WAREHOUSE,
+            path_params={"warehouse_id": warehouse_id}
+        )
+
+    def start_warehouse(self, warehouse_id: str) -> Dict[str, Any]:
+        """Requests a stopped SQL warehouse to start"""
+        return self._make_request(
+            "POST",
+            SQLWarehouseEndpoints.START_WAREHOUSE,
+            path_params={"warehouse_id": warehouse_id}
+        )
+
+    def execute_statement(self, warehouse_id: str, statement: str,
+                          wait_timeout: str = "30s") -> Dict[str, Any]:
+        """Submits a SQL statement with inline JSON results"""
+        return self._make_request(
+            "POST",
+            SQLStatementEndpoints.EXECUTE,
+            payload={
+                "statement": statement,
+                "warehouse_id": warehouse_id,
+                "wait_timeout": wait_timeout,
+                "on_wait_timeout": "CONTINUE",
+                "disposition": "INLINE",
+                "format": "JSON_ARRAY"
+            },
+            breaker=BreakerEndpoints.SQL_STATEMENTS,
+            kind=RequestKinds.START
+        )
+
+    def get_statement(self, statement_id: str) -> Dict[str, Any]:
+        """Retrieves SQL statement status, manifest and first result chunk"""
+        return self._make_request(
+            "GET",
+            SQLStatementEndpoints.GET_STATEMENT,
+            path_params={"statement_id": statement_id},
+            breaker=BreakerEndpoints.SQL_STATEMENTS,
+            kind=RequestKinds.POLL
+        )
+
+    def cancel_statement(self, statement_id: str) -> Dict[str, Any]:
+        """Requests cancellation of a running SQL statement"""
+        return self._make_request(
+            "POST",
+            SQLStatementEndpoints.CANCEL,
+            path_params={"statement_id": statement_id},
+            breaker=BreakerEndpoints.SQL_STATEMENTS
+        )
+
+    def get_statement_result_chunk(self, statement_id: str, chunk_index: int,
+                                   decode: bool = True) -> Dict[str, Any]:
+        """Fetches one result chunk of a SQL statement (raw bytes if decode is False)"""
+        return self._make_request(
+            "GET",
+            SQLStatementEndpoints.GET_RESULT_CHUNK,
+            path_params={"statement_id": statement_id, "chunk_index": chunk_index},
+            breaker=BreakerEndpoints.SQL_STATEMENTS,
+            kind=RequestKinds.CHUNK,
+            decode=decode
+        )
+
+    def warm_connection(self) -> None:
+        """Opens a pooled connection (DNS, TCP and TLS) to the workspace"""
+        try:
+            self.session.head(self.base_url, timeout=10, allow_redirects=False)
+        except requests.exceptions.RequestException as e:
+            raise APIRequestError(
+                f"Network error: {str(e)}",
+                status_code=0,
+                response_body=str(e)
+            ) from e
+
     def generate_natural_language(self, endpoint_name: str, payload: dict) -> str:
         """Generates natural language response from model endpoint"""
 
@@ -176,7 +398,9 @@ class GenieAPIClient:
             "POST",
             endpoint,
             payload=payload,
-            # headers={"Content-Type": "application/json", "Authorization": f"Bearer {token}"}
+            # headers={"Content-Type": "application/json", "Authorization": f"Bearer {token}"},
+            breaker=BreakerEndpoints.SERVING,
+            kind=RequestKinds.NL
         )
         
         # Handle different response formats
@@ -1,4 +1,5 @@
 import time
+import threading
 import requests
 from typing import Optional
 from ..config import AzureADGenieClientConfig, PATGenieClientConfig
@@ -11,6 +12,7 @@ class TokenManager:
         self.config = config
         self.access_token: Optional[str] = None
         self.token_expiry: float = 0.0
+        self._lock = threading.Lock()
         
     def get_access_token(self) -> str:
         """Returns valid access token based on configuration type"""
@@ -20,7 +22,11 @@ class TokenManager:
         if isinstance(self.config, AzureADGenieClientConfig):
             if self._token_is_valid():
                 return self.access_token
-            return self._refresh_azure_token()
+            # Only one thread refreshes; the others reuse its token
+            with self._lock:
+                if self._token_is_valid():
+                    return self.access_token
+                return self._refresh_azure_token()
             
         raise TokenRefreshError("Invalid configuration type")
     
@@ -1,41 +1,253 @@
+import contextvars
+import itertools
+import threading
 import time
-from datetime import datetime
-from typing import Optional
+import weakref
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Iterator, List, Optional
 from ..config import AzureADGenieClientConfig, PATGenieClientConfig
-from ..models.response_models import GenieResponse, Attachment
+from ..models.response_models import GenieResponse, Attachment, LazyResults, determine_attachment_type
 from ..exceptions.custom_errors import *
 from ..utils.validation import validate_input
 from .api_client import GenieAPIClient
 from .auth import TokenManager
-from ..utils.constants import Status, TERMINAL_STATUSES, POLLABLE_STATUSES, POLL_TIMEOUT
-from ..utils.formatting import format_results_to_markdown
-from ..utils.prompts import DEFAULT_SYSTEM_PROMPT, DEFAULT_USER_PROMPT
-from ..utils.logging import logger
+from .results import ResultStream
+from ..utils.constants import FetchPolicies, PriorityClasses, Status, TERMINAL_STATUSES, POLLABLE_STATUSES, POLL_TIMEOUT, STATEMENT_PENDING_STATES
+from ..utils.logging import logger, configure_logging
+from ..utils.circuit_breaker import AdmissionController
+from ..utils.profiling import phase
+
+# Opt-in features are imported where they are first used to keep the client import fast
+if TYPE_CHECKING:
+    from .memory import MemoryBudget
+    from .offload import ResultOffloader
+    from .refresh import RowIndex
+    from .similarity import QuestionMatch
+    from .space_groups import SpaceGroup
+    from .warmup import ClientWarmer
+    from ..utils.scheduler import RequestScheduler
 
 class GenieClient:
     """High-level client for interacting with Databricks Genie"""
     
-    def __init__(self, config: AzureADGenieClientConfig | PATGenieClientConfig):
+    def __init__(self, config: AzureADGenieClientConfig | PATGenieClientConfig,
+                 token_manager: Optional[TokenManager] = None,
+                 session=None, admission=None, scheduler: Optional["RequestScheduler"] = None,
+                 memory_budget: Optional["MemoryBudget"] = None, hedge_executor=None,
+                 offloader: Optional["ResultOffloader"] = None):
         """
         Initialize the Genie client with configuration
         
         Args:
             config: AzureADGenieClientConfig or PATGenieClientConfig
+            token_manager: Shared token manager (see GenieClientPool)
+            session: Shared requests.Session (see GenieClientPool)
+            admission: Shared AdmissionController capping in-flight requests
+            scheduler: Shared RequestScheduler (created from config if not given)
+            memory_budget: Shared MemoryBudget for result data (created from config if not given)
+            hedge_executor: Shared executor for hedged requests (see GenieClientPool)
+            offloader: Shared ResultOffloader (created from config if not given)
         """
+        configure_logging()
         self.config = config
-        self.token_manager = TokenManager(config)
+        self.token_manager = token_manager or TokenManager(config)
+        breaker_settings = None
+        if config.enable_circuit_breakers:
+            breaker_settings = {
+                "failure_rate_threshold": config.breaker_failure_rate,
+                "slow_call_ms": config.breaker_slow_call_ms,
+                "window_size": config.breaker_window_size,
+                "min_calls": config.breaker_min_calls,
+                "open_seconds": config.breaker_open_seconds,
+            }
+        if scheduler is None and config.max_concurrent_requests:
+            from ..utils.scheduler import RequestScheduler
+            scheduler = RequestScheduler(
+                config.max_concurrent_requests,
+                classes=config.priority_classes,
+                default_priority=config.default_priority
+            )
+        if admission is None and config.max_in_flight_requests:
+            admission = AdmissionController(config.max_in_flight_requests)
+        hedger = None
+        if config.enable_hedging:
+            from ..utils.hedging import Hedger
+            hedger = Hedger(
+                percentile=config.hedge_percentile,
+                min_delay_ms=config.hedge_min_delay_ms,
+                max_hedge_rate=config.hedge_max_rate,
+                executor=hedge_executor,
+                admission=admission
+            )
         self.api_client = GenieAPIClient(
             base_url=config.databricks_url,
-            token_manager=self.token_manager
+            token_manager=self.token_manager,
+            breaker_settings=breaker_settings,
+            max_in_flight=config.max_in_flight_requests,
+            session=session,
+            admission=admission,
+            scheduler=scheduler,
+            hedger=hedger
         )
+        self._warmer = None
+        self._warmer_lock = threading.Lock()
+        self.sql_cache = None
+        if config.enable_sql_cache:
+            from .sql_cache import SQLCache
+            self.sql_cache = SQLCache(config.sql_cache_size, config.sql_cache_ttl)
+        self.question_index = None
+        if config.enable_question_index:
+            from .similarity import QuestionIndex
+            self.question_index = QuestionIndex(
+                threshold=config.question_similarity_threshold,
+                max_size=config.question_index_size,
+                ttl=config.question_index_ttl,
+                audit_rate=config.question_audit_rate
+            )
+        self._audit_pool = None
+        self.space_groups = {}
+        if config.space_groups:
+            from .space_groups import SpaceGroup
+            self.space_groups = {
+                name: SpaceGroup(
+                    name, spaces,
+                    strategy=config.space_routing,
+                    failure_threshold=config.space_failure_threshold,
+                    cooldown_seconds=config.space_cooldown_seconds
+                )
+                for name, spaces in config.space_groups.items()
+            }
+        self._space_warehouses = {}
+        self._profile_counter = itertools.count()
+        if memory_budget is None and config.memory_budget_mb:
+            from .memory import MemoryBudget
+            memory_budget = MemoryBudget(
+                int(config.memory_budget_mb * 1024 * 1024), config.memory_wait_timeout
+            )
+        self.memory_budget = memory_budget
+        # Only an offloader built here is shut down by close()
+        self.owns_offloader = offloader is None and bool(config.offload_workers)
+        if self.owns_offloader:
+            from .offload import ResultOffloader
+            offloader = ResultOffloader(config.offload_workers)
+        self.offloader = offloader
+        self._operations = 0
+        self._operations_lock = threading.Lock()
+        self._close_pending = False
         logger.info("Genie client initialized")
+
+    @property
+    def warmer(self) -> "ClientWarmer":
+        """Warm-up and readiness tracker, created on first use"""
+        if self._warmer is None:
+            with self._warmer_lock:
+                if self._warmer is None:
+                    from .warmup import ClientWarmer
+                    self._warmer = ClientWarmer(self)
+        return self._warmer
+
+    def warmup(
+        self,
+        space_id: Optional[str] = None,
+        warehouse: bool = True,
+        wait_for_warehouse: bool = False,
+        keep_warm_interval: Optional[float] = None
+    ) -> dict:
+        """
+        Primes connection, authentication, models and SQL warehouse concurrently
+
+        Args:
+            space_id: Genie space whose warehouse should be started (uses default if not provided)
+            warehouse: Start the space's SQL warehouse if it is stopped
+            wait_for_warehouse: Block until the warehouse is RUNNING
+            keep_warm_interval: If set, repeat the warm-up every N seconds in the background
+
+        Returns:
+            Readiness state (see readiness())
+        """
+        state = self.warmer.warmup(space_id, warehouse=warehouse, wait_for_warehouse=wait_for_warehouse)
+        if keep_warm_interval:
+            self.warmer.start_keep_warm(keep_warm_interval, space_id=space_id, warehouse=warehouse)
+        return state
+
+    def readiness(self) -> dict:
+        """
+        Returns warm-up readiness for health checks
+
+        Includes per-component status and the first ask_genie latency along
+        with whether it ran after a warm-up, to compare cold and warm starts,
+        plus circuit breaker states, load-shedding counters, memory usage,
+        question index reuse and the health of grouped spaces.
+        """
+        state = self.warmer.state.to_dict()
+        state["circuits"] = self.api_client.resilience_metrics()
+        state["memory"] = self.memory_budget.snapshot() if self.memory_budget else None
+        state["question_index"] = self.question_index.stats() if self.question_index else None
+        state["space_groups"] = {name: group.snapshot() for name, group in self.space_groups.items()}
+        return state
+
+    @contextmanager
+    def _operation(self, name: str) -> Iterator[None]:
+        """Admits an ask, SQL run or refresh and counts it for close_when_idle"""
+        with self._operations_lock:
+            self._operations += 1
+        try:
+            with self.api_client.admitted(name):
+                yield
+        finally:
+            with self._operations_lock:
+                self._operations -= 1
+                close = self._close_pending and self._operations == 0
+            if close:
+                self.close()
+
+    def close_when_idle(self) -> None:
+        """Closes now, or once the asks, SQL runs and refreshes in progress finish"""
+        with self._operations_lock:
+            if self._operations:
+                self._close_pending = True
+                return
+        self.close()
+
+    def close(self):
+        """Stops background threads and closes pooled connections it owns"""
+        self._close_pending = False
+        if self._warmer is not None:
+            self._warmer.stop_keep_warm()
+        if self.api_client.hedger is not None:
+            self.api_client.hedger.shutdown()
+        if self.owns_offloader:
+            self.offloader.shutdown()
+        if self._audit_pool is not None:
+            self._audit_pool.shutdown(wait=False)
+        if self.api_client.owns_session:
+            self.api_client.session.close()
+
+    def conversation(self, space_id: Optional[str] = None, **kwargs) -> "GenieConversation":
+        """
+        Opens a conversation session that tracks follow-ups and history
+
+        Args:
+            space_id: Target Genie space ID (uses default if not provided)
+            **kwargs: Additional GenieConversation arguments (store, max_history, ...)
+
+        Returns:
+            GenieConversation bound to this client
+        """
+        from .conversation import GenieConversation
+        return GenieConversation(self, space_id=space_id, **kwargs)
         
     def ask_genie(
         self,
         question: str,
         space_id: Optional[str] = None,
         follow_up: bool = False,
-        conversation_id: Optional[str] = None
+        conversation_id: Optional[str] = None,
+        priority: Optional[str] = None,
+        fetch_policy: Optional[str] = None,
+        profile: Optional[bool] = None
     ) -> GenieResponse:
         """
         Main method to interact with Genie API
@@ -45,56 +257,501 @@ class GenieClient:
             space_id: Target Genie space ID (uses default if not provided)
             follow_up: Whether this is a follow-up question
             conversation_id: Existing conversation ID for follow-ups
+            priority: Scheduler priority class, e.g. "interactive" or "batch"
+            fetch_policy: Query results to download, one of FetchPolicies.ALL
+                (defaults to config.fetch_policy)
+            profile: Profile CPU and allocations of this call into
+                response.metrics["profile"] (None samples per config.profile_every)
             
         Returns:
             GenieResponse object with full results and metadata
         """
-        start_time = datetime.now()
-        response = GenieResponse(
-            start_time=start_time,
-            status="INITIATED",
-            success=False
-        )
+        return self._profiled(profile, self._prioritized, priority, self._ask_genie, question,
+                              space_id, follow_up, conversation_id, fetch_policy)
+
+    def _fetch_policy(self, fetch_policy: Optional[str]) -> str:
+        fetch_policy = fetch_policy or self.config.fetch_policy
+        if fetch_policy not in FetchPolicies.ALL:
+            raise InvalidInputError(
+                f"Unknown fetch policy: {fetch_policy}",
+                context={"fetch_policies": list(FetchPolicies.ALL)}
+            )
+        return fetch_policy
+
+    def _profiled(self, profile: Optional[bool], call, *args) -> GenieResponse:
+        """Runs a request method under the profiler when asked to or sampled"""
+        if profile is None:
+            every = self.config.profile_every
+            profile = bool(every) and next(self._profile_counter) % every == 0
+        if not profile:
+            return call(*args)
+        from ..utils.profiling import CallProfile
+        with CallProfile() as profiler:
+            response = call(*args)
+        summary = response.metrics["profile"] = profiler.summary()
+        if self.config.profile_directory:
+            call_id = response.message_id or f"{id(response):x}"
+            name = f"{response.start_time:%Y%m%dT%H%M%S}-{call_id}"
+            try:
+                summary["paths"] = profiler.dump(self.config.profile_directory, name)
+            except OSError as e:
+                logger.warning("Could not write profile: %s", e)
+        return response
+
+    def _prioritized(self, priority: Optional[str], call, *args) -> GenieResponse:
+        """Runs a request method under a priority class and records its queue wait"""
+        if self.api_client.scheduler is None:
+            return call(*args)
+        from ..utils.scheduler import current_priority, request_priority
+        priority = priority or current_priority() or self.config.default_priority
+        with request_priority(priority) as queue_wait:
+            response = call(*args)
+        response.metrics["priority"] = priority
+        response.metrics["queue_wait_ms"] = round(queue_wait["queue_wait_ms"], 2)
+        response.metrics["queued_requests"] = queue_wait["queued_requests"]
+        return response
+
+    def _ask_genie(self, question: str, space_id: Optional[str], follow_up: bool,
+                   conversation_id: Optional[str], fetch_policy: Optional[str]) -> GenieResponse:
+        response = GenieResponse.start(status=Status.INITIATED)
         
         try:
             # Validate and resolve inputs
             space_id = space_id or self.config.default_space_id
             validate_input(question, space_id, follow_up, conversation_id or "")
+            fetch_policy = self._fetch_policy(fetch_policy)
+            response.space_id = space_id
+            group = self.space_groups.get(space_id)
+            if group is not None and follow_up:
+                raise InvalidInputError(
+                    "Follow-ups must use the space that answered the conversation",
+                    context={"space_group": space_id, "conversation_id": conversation_id}
+                )
             
-            # Create or continue conversation
-            if follow_up and conversation_id:
-                logger.info(f"Continuing conversation: {conversation_id}")
-                response.conversation_id = conversation_id
-                message = self._send_message(space_id, conversation_id, question)
-            else:
-                logger.info("Starting new conversation")
-                conversation, message = self._start_conversation(space_id, question)
-                response.conversation_id = conversation["id"]
-            
-            response.message_id = message["id"]
-            response.status = message["status"]
-            
-            # Poll for completion with timeout handling
-            response = self._poll_message_status(space_id, response)
-            
-            # Process results if completed
-            if response.status == Status.COMPLETED:
-                response = self._process_attachments(space_id, question, response)
+            with self._operation("ask_genie"):
+                # Answers are cached under the space that gave them, so a group checks each member
+                lookup_spaces = list(group.spaces) if group is not None else [space_id]
+                answered = False
+                if self.sql_cache is not None and not follow_up:
+                    # Repeated questions re-run the SQL Genie generated before
+                    for lookup_space in lookup_spaces:
+                        cached_sql = self.sql_cache.get(lookup_space, question)
+                        if cached_sql is not None:
+                            response.space_id = lookup_space
+                            answered = self._answer_from_cached_sql(
+                                response, cached_sql, lookup_space, question, fetch_policy)
+                            break
+                # Rephrasings of earlier questions reuse their SQL or results
+                if not answered and self.question_index is not None and not follow_up:
+                    for lookup_space in lookup_spaces:
+                        if self._answer_from_similar_question(response, lookup_space, question, fetch_policy):
+                            response.space_id = lookup_space
+                            answered = True
+                            break
+                if not answered:
+                    if group is not None:
+                        response = self._ask_space_group(group, question, response, fetch_policy)
+                    else:
+                        response = self._ask_space(space_id, question, follow_up, conversation_id, response,
+                                                   fetch_policy)
+                    if not follow_up and response.status == Status.COMPLETED and response.sql:
+                        if self.sql_cache is not None:
+                            self.sql_cache.put(response.space_id, question, response.sql)
+                        if self.question_index is not None:
+                            # Partial results are not reused; their SQL is re-executed instead
+                            reuse_results = (self.config.question_reuse == "results"
+                                             and fetch_policy in (FetchPolicies.FULL, FetchPolicies.LAZY))
+                            self.question_index.add(response.space_id, question, response.sql,
+                                                    response if reuse_results else None)
             
             response.success = True
             logger.info("Operation completed successfully")
             
         except GenieBaseError as e:
-            logger.error(f"Genie operation failed: {str(e)}", exc_info=True)
+            logger.error("Genie operation failed: %s", e, exc_info=True)
             response.error_message = str(e)
             response.error_type = type(e).__name__
             if hasattr(e, "context"):
                 response.metrics["error_context"] = e.context
         finally:
             response.finalize()
+            # Only tracked once warm-up or readiness is used, so plain clients skip the warmer
+            if self._warmer is not None and self._warmer.state.record_first_request(response.duration_ms):
+                response.metrics["first_request"] = True
+                response.metrics["warm_start"] = self._warmer.state.first_request_warm
             self._log_metrics(response)
             return response
             
+    def _ask_space_group(self, group: "SpaceGroup", question: str, response: GenieResponse,
+                         fetch_policy: str) -> GenieResponse:
+        """Asks a space chosen by the group, failing over to the others when a space errors or fails the message"""
+        tried = []
+        while True:
+            space_id = group.acquire(exclude=tried)
+            response.space_id = space_id
+            last = len(tried) + 1 == len(group.spaces)
+            failed = False
+            try:
+                response = self._ask_space(space_id, question, False, None, response, fetch_policy)
+                # A message that ended FAILED or CANCELLED produced no answer
+                failed = response.status != Status.COMPLETED
+                if failed and not last:
+                    logger.warning("Space %s ended with status %s, failing over", space_id, response.status)
+            except (APIRequestError, CircuitOpenError, TimeoutError) as e:
+                failed = True
+                # Once Genie has answered, asking another space would not help
+                if response.status == Status.COMPLETED or last:
+                    raise
+                logger.warning("Space %s failed, failing over: %s", space_id, e)
+            finally:
+                group.release(space_id, not failed, response.metrics.get("status_ms"))
+            if not failed or last:
+                response.metrics["space_group"] = group.name
+                if tried:
+                    response.metrics["failed_over_from"] = tried
+                return response
+            tried.append(space_id)
+            group.record_failover()
+            response.conversation_id = response.message_id = None
+            response.status = Status.INITIATED
+            response.attachments = []
+            response.results = None
+            response.metrics.pop("status_ms", None)
+
+    def _ask_space(self, space_id: str, question: str, follow_up: bool,
+                   conversation_id: Optional[str], response: GenieResponse,
+                   fetch_policy: str = FetchPolicies.FULL) -> GenieResponse:
+        """Sends the question to Genie, polls for completion and fetches results"""
+        # Create or continue conversation
+        if follow_up and conversation_id:
+            logger.info("Continuing conversation: %s", conversation_id)
+            response.conversation_id = conversation_id
+            message = self._send_message(space_id, conversation_id, question)
+        else:
+            logger.info("Starting new conversation")
+            conversation, message = self._start_conversation(space_id, question)
+            response.conversation_id = conversation["id"]
+        
+        response.message_id = message["id"]
+        response.status = message["status"]
+        
+        # Poll for completion with timeout handling
+        response = self._poll_message_status(space_id, response)
+        
+        # Process results if completed
+        if response.status == Status.COMPLETED:
+            response = self._process_attachments(space_id, question, response, fetch_policy)
+        return response
+
+    def execute_sql(
+        self,
+        sql: str,
+        space_id: Optional[str] = None,
+        warehouse_id: Optional[str] = None,
+        question: Optional[str] = None,
+        priority: Optional[str] = None,
+        fetch_policy: Optional[str] = None,
+        profile: Optional[bool] = None
+    ) -> GenieResponse:
+        """
+        Runs SQL directly on the SQL warehouse, bypassing Genie's LLM planning
+
+        Args:
+            sql: SQL statement, typically generated by Genie earlier
+            space_id: Genie space whose warehouse runs the SQL (uses default if not provided)
+            warehouse_id: SQL warehouse ID (overrides config and space lookup)
+            question: Original question, used for NL answer generation
+            priority: Scheduler priority class, e.g. "interactive" or "batch"
+            fetch_policy: Result chunks to download, as for ask_genie; "metadata"
+                keeps the manifest's columns and row count
+            profile: Profile this call, as for ask_genie
+
+        Returns:
+            GenieResponse with results in the same layout as ask_genie
+        """
+        return self._profiled(profile, self._prioritized, priority, self._execute_sql, sql, space_id,
+                              warehouse_id, question, fetch_policy)
+
+    def _execute_sql(self, sql: str, space_id: Optional[str], warehouse_id: Optional[str],
+                     question: Optional[str], fetch_policy: Optional[str]) -> GenieResponse:
+        response = GenieResponse.start(status=Status.INITIATED)
+        try:
+            if not sql or not sql.strip():
+                raise InvalidInputError("SQL statement cannot be empty")
+            fetch_policy = self._fetch_policy(fetch_policy)
+            response.space_id = space_id or self.config.default_space_id
+            with self._operation("execute_sql"):
+                response = self._run_statement(response, sql, response.space_id, question, warehouse_id,
+                                               fetch_policy)
+            response.success = True
+        except GenieBaseError as e:
+            logger.error("SQL execution failed: %s", e, exc_info=True)
+            response.error_message = str(e)
+            response.error_type = type(e).__name__
+            if hasattr(e, "context"):
+                response.metrics["error_context"] = e.context
+        finally:
+            response.finalize()
+            self._log_metrics(response)
+            return response
+
+    def rerun(self, previous: GenieResponse, warehouse_id: Optional[str] = None,
+              question: Optional[str] = None, priority: Optional[str] = None) -> GenieResponse:
+        """
+        Re-executes the SQL of a previous response to get fresh results
+
+        Args:
+            previous: Earlier response with a query attachment
+            warehouse_id: SQL warehouse ID (overrides config and space lookup)
+            question: Original question, used for NL answer generation
+            priority: Scheduler priority class, e.g. "interactive" or "batch"
+
+        Returns:
+            GenieResponse with fresh results and no new Genie message
+        """
+        sql = previous.sql
+        if not sql:
+            raise InvalidInputError(
+                "Response has no generated SQL to re-run",
+                context={"message_id": previous.message_id}
+            )
+        response = self.execute_sql(sql, previous.space_id, warehouse_id, question, priority)
+        response.conversation_id = previous.conversation_id
+        return response
+
+    def refresh(self, previous: GenieResponse, key_columns: Optional[List[str]] = None,
+                warehouse_id: Optional[str] = None, question: Optional[str] = None,
+                priority: Optional[str] = None) -> GenieResponse:
+        """
+        Re-executes the SQL of a previous response and reports which rows changed
+
+        The new chunks are compared with a hash index of the previous rows as
+        they stream in. results["delta"] holds the "inserted", "updated" and
+        "deleted" rows and a "changed" flag; results["data"] still has every
+        current row. The index is kept on the returned response, so passing
+        it to the next refresh skips rehashing. When nothing changed, the
+        previous NL answer is reused instead of generating a new one.
+
+        Args:
+            previous: Earlier response with a query attachment (or refresh result)
+            key_columns: Columns identifying a row, so changed values count as
+                updates (without them a changed row is a deletion plus an insertion)
+            warehouse_id: SQL warehouse ID (overrides config and space lookup)
+            question: Original question, used for NL answer generation
+            priority: Scheduler priority class, e.g. "interactive" or "batch"
+
+        Returns:
+            GenieResponse with the current results and their delta
+        """
+        return self._prioritized(priority, self._refresh, previous, key_columns, warehouse_id, question)
+
+    def _refresh(self, previous: GenieResponse, key_columns: Optional[List[str]],
+                 warehouse_id: Optional[str], question: Optional[str]) -> GenieResponse:
+        response = GenieResponse.start(status=Status.INITIATED)
+        try:
+            if not previous.sql:
+                raise InvalidInputError(
+                    "Response has no generated SQL to refresh",
+                    context={"message_id": previous.message_id}
+                )
+            response.space_id = previous.space_id or self.config.default_space_id
+            response.conversation_id = previous.conversation_id
+            with self._operation("refresh"):
+                stream = self._start_statement(response, previous.sql, response.space_id, warehouse_id)
+                response.metrics["result_row_count"] = stream.total_rows
+                response.metrics["result_chunk_count"] = stream.total_chunks
+
+                from .refresh import RowIndex
+                baseline = self._baseline_index(previous, stream.columns, stream.column_types, key_columns)
+                response.metrics["refresh_baseline"] = baseline is not None
+                if baseline is None:
+                    baseline = RowIndex(stream.columns, key_columns, stream.column_types)
+                with phase("diff_rows"):
+                    index, delta = baseline.diff(rows for _, rows in stream)
+                response._row_index = index
+                response.results = stream.to_results(index.data)
+                response.results["delta"] = delta
+                response.metrics["changed"] = delta["changed"]
+                for change in ("inserted", "updated", "deleted"):
+                    response.metrics[f"rows_{change}"] = len(delta[change])
+
+                if delta["changed"]:
+                    self._add_natural_language_answer(response, question, [response.results])
+                elif previous.natural_language_answer:
+                    response.natural_language_answer = previous.natural_language_answer
+            response.success = True
+        except GenieBaseError as e:
+            logger.error("Refresh failed: %s", e, exc_info=True)
+            response.error_message = str(e)
+            response.error_type = type(e).__name__
+            if hasattr(e, "context"):
+                response.metrics["error_context"] = e.context
+        finally:
+            response.finalize()
+            self._log_metrics(response)
+            return response
+
+    def _baseline_index(self, previous: GenieResponse, columns: List[str],
+                        column_types: List[Optional[str]],
+                        key_columns: Optional[List[str]]) -> Optional["RowIndex"]:
+        """Index of the previous rows, or None if they are unknown or have other columns"""
+        from .refresh import RowIndex
+        index = previous._row_index
+        if index is not None:
+            if index.columns != columns:
+                return None
+            if index.key_columns == list(key_columns or []) and index.column_types == list(column_types):
+                return index
+            return RowIndex.from_rows(columns, key_columns, index.data, column_types)
+        results = previous.results
+        if not results or results.get("complete") is False or results.get("columns") != columns:
+            return None
+        return RowIndex.from_rows(columns, key_columns, results.get("data") or [], column_types)
+
+    def resolve_warehouse_id(self, space_id: Optional[str]) -> Optional[str]:
+        """Returns the configured warehouse or the one backing the Genie space"""
+        if self.config.warehouse_id:
+            return self.config.warehouse_id
+        if not space_id:
+            return None
+        if space_id in self.space_groups:
+            space_id = self.space_groups[space_id].choose()
+        if space_id not in self._space_warehouses:
+            self._space_warehouses[space_id] = self.api_client.get_space(space_id).get("warehouse_id")
+        return self._space_warehouses[space_id]
+
+    def open_statement_stream(self, sql: str, warehouse_id: str) -> ResultStream:
+        """
+        Executes SQL and opens a chunk-by-chunk stream over its results
+
+        Args:
+            sql: SQL statement
+            warehouse_id: SQL warehouse ID
+
+        Returns:
+            ResultStream whose manifest and first chunk are already fetched
+        """
+        statement = self.api_client.execute_statement(warehouse_id, sql)
+        statement_id = statement.get("statement_id")
+        start_time = time.time()
+        while statement.get("status", {}).get("state") in STATEMENT_PENDING_STATES:
+            elapsed = time.time() - start_time
+            if elapsed > self.config.poll_timeout:
+                # Stop the warehouse from running a statement nobody will read
+                try:
+                    self.api_client.cancel_statement(statement_id)
+                except GenieBaseError as e:
+                    logger.warning("Could not cancel statement %s: %s", statement_id, e)
+                raise TimeoutError(
+                    "Statement execution timed out",
+                    context={"statement_id": statement_id, "elapsed_seconds": elapsed}
+                )
+            time.sleep(self.config.poll_interval)
+            statement = self.api_client.get_statement(statement_id)
+
+        def fetch_chunk(chunk_index: int) -> dict:
+            return self.api_client.get_statement_result_chunk(statement_id, chunk_index)
+
+        def fetch_raw_chunk(chunk_index: int) -> bytes:
+            return self.api_client.get_statement_result_chunk(statement_id, chunk_index, decode=False)
+
+        return ResultStream(statement, fetch_chunk, fetch_raw_chunk, typed=self.config.typed_results)
+
+    def _run_statement(self, response: GenieResponse, sql: str, space_id: Optional[str],
+                       question: Optional[str], warehouse_id: Optional[str] = None,
+                       fetch_policy: str = FetchPolicies.FULL) -> GenieResponse:
+        """Executes SQL and stores its results on the response"""
+        stream = self._start_statement(response, sql, space_id, warehouse_id)
+        self._store_results(response, stream, question, fetch_policy)
+        return response
+
+    def _start_statement(self, response: GenieResponse, sql: str, space_id: Optional[str],
+                         warehouse_id: Optional[str]) -> ResultStream:
+        """Executes SQL and records the statement on the response"""
+        warehouse_id = warehouse_id or self.resolve_warehouse_id(space_id)
+        if not warehouse_id:
+            raise ConfigurationError("warehouse_id or space_id is required to execute SQL")
+        stream = self.open_statement_stream(sql, warehouse_id)
+        response.attachments = [Attachment.from_api({
+            "query": {"query": sql, "statement_id": stream.statement_id}
+        })]
+        response.status = Status.COMPLETED
+        response.metrics["executed_directly"] = True
+        response.metrics["statement_id"] = stream.statement_id
+        return stream
+
+    def _answer_from_cached_sql(self, response: GenieResponse, sql: str, space_id: str,
+                                question: str, fetch_policy: str = FetchPolicies.FULL) -> bool:
+        """Answers from cached SQL; returns False so the caller falls back to Genie"""
+        logger.info("SQL cache hit, executing cached SQL directly")
+        if not self._answer_from_sql(response, sql, space_id, question, fetch_policy):
+            self.sql_cache.invalidate(space_id, question)
+            return False
+        response.metrics["sql_cache_hit"] = True
+        return True
+
+    def _answer_from_similar_question(self, response: GenieResponse, space_id: str, question: str,
+                                      fetch_policy: str) -> bool:
+        """Answers from an indexed similar question; returns False so the caller falls back to Genie"""
+        match = self.question_index.lookup(space_id, question)
+        if match is None:
+            return False
+        logger.info("Similar question found (%.2f): %s", match.similarity, match.question)
+        if match.response is not None:
+            response.attachments = list(match.response.attachments)
+            response.results = match.response.results
+            response.natural_language_answer = match.response.natural_language_answer
+            response.status = Status.COMPLETED
+        elif not self._answer_from_sql(response, match.sql, space_id, question, fetch_policy):
+            self.question_index.remove(space_id, match.question)
+            return False
+        response.metrics["similar_question_hit"] = True
+        response.metrics["similarity"] = round(match.similarity, 3)
+        response.metrics["matched_question"] = match.question
+        if self.question_index.should_audit():
+            if self._audit_pool is None:
+                self._audit_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="genie-audit")
+            self._audit_pool.submit(self._audit_match, match, question)
+        return True
+
+    def _audit_match(self, match: "QuestionMatch", question: str) -> None:
+        """Asks Genie a reused question and records whether its SQL agrees with the match"""
+        from ..utils.scheduler import request_priority
+        scheduler = self.api_client.scheduler
+        priority = PriorityClasses.BATCH
+        if scheduler is not None and priority not in scheduler.classes:
+            priority = self.config.default_priority
+        try:
+            with request_priority(priority):
+                audit = self._ask_space(match.space_id, question, False, None,
+                                        GenieResponse.start(status=Status.INITIATED), FetchPolicies.NONE)
+            if audit.status == Status.COMPLETED and audit.sql:
+                self.question_index.record_audit(match, question, audit.sql)
+        except Exception as e:
+            logger.warning("Similar question audit failed: %s", e)
+
+    def _answer_from_sql(self, response: GenieResponse, sql: str, space_id: str,
+                         question: str, fetch_policy: str) -> bool:
+        """
+        Executes SQL from an earlier answer; returns False and resets the response if it fails
+
+        API failures, open circuits and statement timeouts fall back to asking
+        Genie rather than failing the question. Memory budget and load
+        shedding errors are raised: Genie's answer would hit the same limit and
+        add load.
+        """
+        try:
+            self._run_statement(response, sql, space_id, question, fetch_policy=fetch_policy)
+            return True
+        except (APIRequestError, CircuitOpenError, TimeoutError) as e:
+            logger.warning("Reused SQL failed (%s), asking Genie instead: %s", type(e).__name__, e)
+            response.attachments = []
+            response.results = None
+            response.status = Status.INITIATED
+            for key in ("executed_directly", "statement_id"):
+                response.metrics.pop(key, None)
+            return False
+
     def _start_conversation(self, space_id: str, question: str) -> tuple:
         """Initiates a new Genie conversation"""
         try:
@@ -130,6 +787,10 @@ class GenieClient:
     def _poll_message_status(self, space_id: str, response: GenieResponse) -> GenieResponse:
         """Polls message status until terminal state or timeout"""
         start_time = time.time()
+        raw_attachments = None
+        # Time spent in each status, e.g. SUBMITTED and PENDING_WAREHOUSE while queued
+        status_ms = response.metrics["status_ms"] = {}
+        phase_start = time.monotonic()
         
         while response.status in POLLABLE_STATUSES:
             # Handle timeout
@@ -154,164 +815,374 @@ class GenieClient:
                     response.conversation_id,
                     response.message_id
                 )
+                now = time.monotonic()
+                status_ms[response.status] = status_ms.get(response.status, 0.0) + (now - phase_start) * 1000
+                phase_start = now
                 response.status = message["status"]
+                logger.debug("Poll status: %s", response.status, extra={"event": "poll"})
                 
-                # Update attachments
-                if "attachments" in message:
-                    response.attachments = [
-                        Attachment(
-                            type=self._determine_attachment_type(att),
-                            content=att,
-                            attachment_id=att.get("attachment_id")
-                        ) for att in message["attachments"]
-                    ]
+                # Update attachments only when the payload changed
+                if "attachments" in message and message["attachments"] != raw_attachments:
+                    raw_attachments = message["attachments"]
+                    with phase("poll_attachments"):
+                        response.attachments = self._update_attachments(
+                            response.attachments, raw_attachments
+                        )
                 
                 # Handle terminal states
                 if response.status in TERMINAL_STATUSES:
-                    logger.info(f"Message reached terminal state: {response.status}")
+                    logger.info("Message reached terminal state: %s", response.status)
                     if response.status != Status.COMPLETED and "error" in message:
                         response.error_message = message["error"].get("message")
                         response.error_type = message["error"].get("type")
                     break
                     
             except APIRequestError as e:
-                logger.warning(f"Polling error: {str(e)}. Retrying...")
+                logger.warning("Polling error: %s. Retrying...", e, extra={"event": "poll_error"})
                 # Continue polling on recoverable errors
                 if e.status_code < 500:
                     raise
         
+        for status, elapsed_ms in status_ms.items():
+            status_ms[status] = round(elapsed_ms, 1)
         return response
     
+    def _update_attachments(self, current: list, raw_attachments: list) -> list:
+        """Rebuilds only the attachments whose payload changed since the last poll"""
+        existing = {att.attachment_id: att for att in current if att.attachment_id}
+        updated = []
+        for raw in raw_attachments:
+            previous = existing.get(raw.get("attachment_id")) if isinstance(raw, dict) else None
+            if previous is not None and previous.content == raw:
+                updated.append(previous)
+            else:
+                updated.append(Attachment.from_api(raw))
+        return updated
+
     def _determine_attachment_type(self, attachment: dict) -> str:
         """Identifies attachment type based on content"""
-        if "query" in attachment:
-            return "query"
-        elif "text" in attachment:
-            return "text"
-        elif "error" in attachment:
-            return "error"
-        return "unknown"
-
-    def _process_attachments(self, space_id: str, question: str, response: GenieResponse) -> GenieResponse:
-        """Processes attachments and fetches query results with chunk handling"""
-        for attachment in response.attachments:
-            if attachment.type == "query" and attachment.attachment_id:
-                try:
-                    result_data = self.api_client.get_query_result(
-                        space_id,
-                        response.conversation_id,
-                        response.message_id,
-                        attachment.attachment_id
+        return determine_attachment_type(attachment)
+
+    def open_result_stream(self, space_id: str, conversation_id: str,
+                           message_id: str, attachment_id: str) -> ResultStream:
+        """
+        Opens a chunk-by-chunk stream over a query attachment's results
+
+        Args:
+            space_id: Genie space ID
+            conversation_id: Conversation ID
+            message_id: Message ID
+            attachment_id: Query attachment ID
+
+        Returns:
+            ResultStream whose manifest and first chunk are already fetched
+        """
+        result_data = self.api_client.get_query_result(
+            space_id, conversation_id, message_id, attachment_id
+        )
+
+        def fetch_chunk(chunk_index: int) -> dict:
+            chunk_data = self.api_client.get_query_result(
+                space_id, conversation_id, message_id, attachment_id,
+                chunk_index=chunk_index
+            )
+            return chunk_data.get("statement_response", {}).get("result", {})
+
+        def fetch_raw_chunk(chunk_index: int) -> bytes:
+            return self.api_client.get_query_result(
+                space_id, conversation_id, message_id, attachment_id,
+                chunk_index=chunk_index, decode=False
+            )
+
+        return ResultStream(result_data.get("statement_response", {}), fetch_chunk, fetch_raw_chunk,
+                            typed=self.config.typed_results)
+
+    def export_results(
+        self,
+        response: GenieResponse,
+        path: str,
+        format: Optional[str] = None,
+        attachment_id: Optional[str] = None,
+        max_workers: int = 4
+    ) -> dict:
+        """
+        Streams a response's query results straight to a file
+
+        Chunks are re-fetched from Genie and written as they arrive, so memory
+        use stays constant regardless of total_row_count. Responses without a
+        query attachment, such as execute_sql and refresh responses, write the
+        results they hold.
+
+        Args:
+            response: Completed response with a query attachment or complete results
+            path: Destination file path
+            format: "csv", "ndjson" or "parquet" (inferred from the suffix if omitted)
+            attachment_id: Query attachment to export (first query attachment by default)
+            max_workers: Chunks fetched and encoded in parallel
+
+        Returns:
+            Summary with path, format, row_count, chunk_count and bytes_written
+        """
+        from .export import export_rows, export_stream
+
+        if attachment_id is None:
+            attachment_id = next(
+                (att.attachment_id for att in response.attachments
+                 if att.type == "query" and att.attachment_id),
+                None
+            )
+            results = response.results
+            if attachment_id is None and results and results.get("columns"):
+                rows = results.get("data") or []
+                if results.get("complete") is False or results.get("row_count", len(rows)) > len(rows):
+                    raise InvalidInputError(
+                        "Response holds only part of its results and has no query attachment to re-read",
+                        context={"row_count": results.get("row_count"), "rows_held": len(rows)}
                     )
-                    
-                    # Extract the statement response
-                    stmt_response = result_data.get("statement_response", {})
-                    
-                    # Check execution status
-                    status = stmt_response.get("status", {}).get("state", "")
-                    if status != "SUCCEEDED":
-                        raise ResultRetrievalError(
-                            f"Query execution failed with status: {status}",
-                            status_code=400,
-                            response_body=result_data
-                        )
-                    
-                    # Extract manifest and result data
-                    manifest = stmt_response.get("manifest", {})
-                    result_chunk = stmt_response.get("result", {})
-                    
-                    # Process schema
-                    schema = manifest.get("schema", {})
-                    columns = [col["name"] for col in schema.get("columns", [])]
-                    
-                    # Handle chunked results
-                    total_chunks = manifest.get("total_chunk_count", 1)
-                    total_rows = manifest.get("total_row_count", 0)
-                    
-                    if total_chunks == 1:
-                        # Single chunk - simple case
-                        data_array = result_chunk.get("data_array", [])
-                    else:
-                        # Multiple chunks - fetch all chunks
-                        data_array = []
-                        logger.info(f"Fetching {total_chunks} result chunks...")
-                        
-                        # Fetch first chunk (already retrieved)
-                        if result_chunk.get("chunk_index", 0) == 0:
-                            data_array.extend(result_chunk.get("data_array", []))
-                        
-                        # Fetch remaining chunks
-                        for chunk_index in range(1, total_chunks):
-                            chunk_data = self.api_client.get_query_result(
-                                space_id,
-                                response.conversation_id,
-                                response.message_id,
-                                attachment.attachment_id,
-                                chunk_index=chunk_index  # New parameter needed in API client
-                            )
-                            chunk_result = chunk_data.get("statement_response", {}).get("result", {})
-                            data_array.extend(chunk_result.get("data_array", []))
-                    
-                    # Store results in response
-                    response.results = {
-                        "data": data_array,
-                        "columns": columns,
-                        "row_count": total_rows,
-                        "chunk_count": total_chunks
-                    }
-                    # Add metrics
-                    response.metrics["result_row_count"] = total_rows
-                    response.metrics["result_chunk_count"] = total_chunks
-
-                    # Generating Natural language answer if enabled
-                    if self.config.enable_natural_language and response.results:
-                        response.natural_language_answer = self._generate_natural_language_answer(
-                            question, 
-                            response.results
-                        )
-                        # Add metric
-                        response.metrics["nl_generated"] = bool(response.natural_language_answer)
-                    
-                except APIRequestError as e:
-                    logger.error(f"Failed to fetch results: {str(e)}")
-                    response.error_message = f"Result fetch failed: {str(e)}"
-                    response.error_type = "RESULT_RETRIEVAL_ERROR"
+                return export_rows(results["columns"], results.get("column_types"), rows, path, format)
+        space_id = response.space_id or self.config.default_space_id
+        if not attachment_id or not space_id:
+            raise InvalidInputError(
+                "Response has no query attachment to export",
+                context={"message_id": response.message_id}
+            )
+        stream = self.open_result_stream(
+            space_id, response.conversation_id, response.message_id, attachment_id
+        )
+        return export_stream(stream, path, format=format, max_workers=max_workers)
+
+    def _process_attachments(self, space_id: str, question: str, response: GenieResponse,
+                             fetch_policy: str = FetchPolicies.FULL) -> GenieResponse:
+        """
+        Fetches the results of every query attachment concurrently
+
+        Each attachment keeps its own results; ``response.results`` holds the
+        first query's results and one NL call summarizes all of them. The
+        fetch policy decides how much is downloaded (see FetchPolicies).
+        """
+        attachments = [att for att in response.query_attachments if att.attachment_id]
+        if not attachments or fetch_policy == FetchPolicies.NONE:
+            return response
+        if fetch_policy != FetchPolicies.FULL:
+            response.metrics["fetch_policy"] = fetch_policy
+
+        def open_stream(attachment: Attachment) -> ResultStream:
+            return self.open_result_stream(
+                space_id,
+                response.conversation_id,
+                response.message_id,
+                attachment.attachment_id
+            )
+
+        def fetch(attachment: Attachment) -> None:
+            try:
+                attachment.results = self._policy_results(
+                    lambda: open_stream(attachment), response, fetch_policy, attachment.result_row_count
+                )
+            except APIRequestError as e:
+                logger.error("Failed to fetch results: %s", e)
+                attachment.error_message = f"Result fetch failed: {str(e)}"
+
+        if fetch_policy == FetchPolicies.METADATA:
+            # Genie reports the row count on the message itself
+            for attachment in attachments:
+                attachment.results = {"data": [], "row_count": attachment.result_row_count, "complete": False}
+        elif len(attachments) == 1 or fetch_policy == FetchPolicies.LAZY:
+            for attachment in attachments:
+                fetch(attachment)
+        else:
+            workers = min(len(attachments), self.config.max_attachment_workers)
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="genie-attachments") as pool:
+                # Each task runs in a copy of the caller's context to keep its request priority
+                futures = [pool.submit(contextvars.copy_context().run, fetch, att) for att in attachments]
+                for future in futures:
+                    future.result()
+
+        failed = [att for att in attachments if att.error_message]
+        if failed:
+            response.error_message = failed[0].error_message
+            response.error_type = "RESULT_RETRIEVAL_ERROR"
+        results = [att.results for att in attachments if att.results is not None]
+        if results:
+            response.results = results[0]
+            if fetch_policy in (FetchPolicies.METADATA, FetchPolicies.LAZY):
+                # Counted from message metadata so lazy results stay unfetched
+                row_counts = [att.result_row_count for att in attachments]
+                if None not in row_counts:
+                    response.metrics["result_row_count"] = sum(row_counts)
+            else:
+                response.metrics["result_row_count"] = sum(r["row_count"] for r in results)
+                response.metrics["result_chunk_count"] = sum(r["chunk_count"] for r in results)
+            if len(attachments) > 1:
+                response.metrics["query_attachment_count"] = len(attachments)
+            if fetch_policy in (FetchPolicies.FULL, FetchPolicies.FIRST_ROWS):
+                self._add_natural_language_answer(response, question, results)
         return response
-    
-    def _generate_natural_language_answer(self, question: str, results: dict) -> str:
-        """Generates natural language answer from query results"""
-        # Format results as markdown
-        formatted_table = format_results_to_markdown(
-            columns=results.get("columns", []),
-            data=results.get("data", [])
+
+    def _policy_results(self, open_stream: Callable[[], ResultStream], response: GenieResponse,
+                        fetch_policy: str, row_count: Optional[int] = None) -> dict:
+        """Reads a result stream as far as a first_rows, full or lazy policy asks"""
+        if fetch_policy == FetchPolicies.LAZY:
+            # A weak reference keeps the results from holding their response alive
+            owner = weakref.ref(response)
+            return LazyResults(lambda: self._collect_results(open_stream(), owner()), row_count)
+        stream = open_stream()
+        if fetch_policy == FetchPolicies.FIRST_ROWS:
+            return self._collect_first_rows(stream)
+        return self._collect_results(stream, response)
+
+    def _collect_first_rows(self, stream: ResultStream) -> dict:
+        """Fetches chunks only until fetch_first_rows rows are read"""
+        limit = self.config.fetch_first_rows
+        rows = []
+        for _, chunk_rows in stream:
+            rows.extend(chunk_rows[:limit - len(rows)])
+            if len(rows) >= limit:
+                break
+        results = stream.to_results(rows)
+        results["complete"] = len(rows) >= stream.total_rows
+        return results
+
+    def _collect_results(self, stream: ResultStream, response: Optional[GenieResponse] = None) -> dict:
+        """Fetches all chunks of a stream into a results dict"""
+        if stream.total_chunks > 1:
+            logger.info("Fetching %d result chunks...", stream.total_chunks)
+        if self.memory_budget is not None:
+            return self._collect_within_budget(stream, response)
+        if self.offloader is not None:
+            return self.offloader.collect(stream)
+        data_array = []
+        for _, chunk_rows in stream:
+            with phase("extend_rows"):
+                data_array.extend(chunk_rows)
+        return stream.to_results(data_array)
+
+    def _collect_within_budget(self, stream: ResultStream, response: Optional[GenieResponse]) -> dict:
+        """Collects results against the memory budget, waiting, spilling or rejecting as configured"""
+        from .memory import DECODED_SIZE_FACTOR, BudgetedCollector
+        collector = BudgetedCollector(
+            self.memory_budget, self.config.memory_overflow, self.config.spill_directory
         )
-        
-        # Get prompt templates from config or defaults
-        system_prompt = self.config.system_prompt_template or DEFAULT_SYSTEM_PROMPT
-        user_prompt_template = self.config.user_prompt_template or DEFAULT_USER_PROMPT
-        user_prompt = user_prompt_template.format(
-            question=question,
-            formatted_query_results=formatted_table
+
+        def before_fetch(chunk_index: int) -> None:
+            byte_count = stream.chunk_byte_count(chunk_index)
+            collector.before_fetch(byte_count * DECODED_SIZE_FACTOR if byte_count else None)
+
+        if self.offloader is not None:
+            chunks = self.offloader.iter_chunks(stream, before_fetch)
+        else:
+            chunks = (rows for _, rows in stream.iter_chunks(before_fetch))
+        try:
+            for rows in chunks:
+                with phase("extend_rows"):
+                    collector.add(rows)
+        except BaseException:
+            collector.release()
+            if collector.spilled is not None:
+                collector.spilled.close()
+            raise
+
+        results = stream.to_results(collector.rows)
+        if collector.spilled is not None:
+            results["spilled"] = True
+            results["spill_path"] = collector.spilled.path
+            logger.warning("Memory budget exhausted, spilled %d rows to %s",
+                           len(collector.spilled), collector.spilled.path)
+        if response is not None:
+            response.metrics["result_bytes"] = response.metrics.get("result_bytes", 0) + collector.reserved_bytes
+            if collector.spilled is not None:
+                response.metrics["spilled_to_disk"] = True
+            response.hold_memory(collector.release)
+        return results
+
+    def _store_results(self, response: GenieResponse, stream: ResultStream,
+                       question: Optional[str], fetch_policy: str = FetchPolicies.FULL) -> None:
+        """Fetches the chunks of a stream the fetch policy asks for into response.results"""
+        if fetch_policy != FetchPolicies.FULL:
+            response.metrics["fetch_policy"] = fetch_policy
+        if fetch_policy == FetchPolicies.NONE:
+            return
+        response.metrics["result_row_count"] = stream.total_rows
+        response.metrics["result_chunk_count"] = stream.total_chunks
+        if fetch_policy == FetchPolicies.METADATA:
+            response.results = stream.to_results([])
+            response.results["complete"] = stream.total_rows == 0
+            return
+        response.results = self._policy_results(lambda: stream, response, fetch_policy, stream.total_rows)
+        if fetch_policy != FetchPolicies.LAZY:
+            self._add_natural_language_answer(response, question, [response.results])
+
+    def _add_natural_language_answer(self, response: GenieResponse, question: Optional[str],
+                                     results: list) -> None:
+        """Summarizes one or more result sets in a single NL call, if enabled"""
+        if self.config.enable_natural_language and results and question:
+            response.natural_language_answer = self._generate_natural_language_answer(question, results)
+            response.metrics["nl_generated"] = bool(response.natural_language_answer)
+
+    def _generate_natural_language_answer(self, question: str, results) -> str:
+        """Generates natural language answer from one or more query results"""
+        # Only needed when NL generation is enabled
+        from ..utils.formatting import format_results_to_markdown
+        from ..utils.tables import TableRenderer
+        from ..utils.prompts import DEFAULT_SYSTEM_PROMPT, DEFAULT_USER_PROMPT
+
+        # Format results as markdown, one table per query
+        if isinstance(results, dict):
+            results = [results]
+        format_table = (
+            self.offloader.format_markdown if self.offloader is not None else format_results_to_markdown
         )
+        # Tables share the prompt's token budget; rows are read (from disk,
+        # if spilled) only as far as that budget can hold
+        max_tokens = max(1, self.config.nl_table_max_tokens // len(results))
+        tables = []
+        for r in results:
+            columns = r.get("columns", [])
+            row_bound = TableRenderer(columns, max_tokens=max_tokens).max_rows() + 1
+            with phase("markdown"):
+                tables.append(format_table(
+                    columns,
+                    list(islice(r.get("data", []), row_bound)),
+                    max_rows=None,
+                    column_types=r.get("column_types"),
+                    max_tokens=max_tokens,
+                    total_rows=r.get("row_count"),
+                ))
+        if len(tables) == 1:
+            formatted_table = tables[0]
+        else:
+            formatted_table = "\n\n".join(
+                f"**Query {i}:**\n{table}" for i, table in enumerate(tables, 1)
+            )
         
-        # Prepare payload for model endpoint
-        payload = {
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            "max_tokens": 2048,
-            "temperature": 0.0
-        }
+        # Get prompt templates from config or defaults
+        with phase("prompt"):
+            system_prompt = self.config.system_prompt_template or DEFAULT_SYSTEM_PROMPT
+            user_prompt_template = self.config.user_prompt_template or DEFAULT_USER_PROMPT
+            user_prompt = user_prompt_template.format(
+                question=question,
+                formatted_query_results=formatted_table
+            )
+            
+            # Prepare payload for model endpoint
+            payload = {
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                "max_tokens": 2048,
+                "temperature": 0.0
+            }
         
         try:
             # Generate natural language response
-            return self.api_client.generate_natural_language(
-                self.config.model_endpoint_name,
-                payload
-            )
+            with phase("nl_generation"):
+                return self.api_client.generate_natural_language(
+                    self.config.model_endpoint_name,
+                    payload
+                )
         except Exception as e:
-            logger.error(f"NL generation failed: {str(e)}")
+            logger.error("NL generation failed: %s", e)
             return None
     
     def _log_metrics(self, response: GenieResponse):
@@ -323,7 +1194,10 @@ class GenieClient:
             "attachments_count": len(response.attachments),
             "error_type": response.error_type or "NONE"
         }
-        if response.results:
+        # Multi-query messages already report the total across attachments
+        if "result_row_count" in response.metrics:
+            metrics["result_row_count"] = response.metrics["result_row_count"]
+        elif response.results:
             metrics["result_row_count"] = response.results.get("row_count", 0)
         
         logger.info("Operation metrics", extra={"metrics": metrics})
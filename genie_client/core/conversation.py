@@ -0,0 +1,281 @@
+"""Conversation sessions that keep state between Genie questions.
+
+``GenieConversation`` threads ``conversation_id`` and ``follow_up`` through
+``GenieClient.ask_genie`` and keeps a bounded, message_id-indexed history of
+questions, generated SQL and results. With a ``ConversationStore`` the
+session is saved after every turn, so it can be resumed after a restart or
+on another worker that shares the store.
+"""
+import json
+import os
+from abc import ABC, abstractmethod
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from pydantic import BaseModel
+
+from ..exceptions.custom_errors import InvalidInputError
+from ..models.response_models import GenieResponse, LazyResults
+from ..utils.logging import logger
+from .local_query import LocalQueryRouter
+
+
+class ConversationTurn(BaseModel):
+    """One question and its answer within a conversation"""
+    message_id: str
+    question: str
+    sql: Optional[str] = None
+    answered_locally: bool = False
+    asked_at: datetime
+    response: GenieResponse
+
+
+class ConversationStore(ABC):
+    """Persistence interface for conversation sessions"""
+
+    @abstractmethod
+    def load(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the saved session state or None if unknown"""
+
+    @abstractmethod
+    def save(self, conversation_id: str, state: Dict[str, Any]) -> None:
+        """Saves the session state"""
+
+    @abstractmethod
+    def delete(self, conversation_id: str) -> None:
+        """Removes a saved session"""
+
+
+class FileConversationStore(ConversationStore):
+    """Stores each conversation as a JSON file in a local (or shared) directory"""
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, conversation_id: str) -> Path:
+        if not conversation_id or os.sep in conversation_id or conversation_id.startswith("."):
+            raise InvalidInputError(f"Invalid conversation ID: {conversation_id!r}")
+        return self.directory / f"{conversation_id}.json"
+
+    def load(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        path = self._path(conversation_id)
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save(self, conversation_id: str, state: Dict[str, Any]) -> None:
+        path = self._path(conversation_id)
+        # Write then rename so readers on other workers never see partial files
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def delete(self, conversation_id: str) -> None:
+        path = self._path(conversation_id)
+        if path.exists():
+            path.unlink()
+
+
+class GenieConversation:
+    """Stateful session over a single Genie conversation"""
+
+    def __init__(
+        self,
+        client,
+        space_id: Optional[str] = None,
+        conversation_id: Optional[str] = None,
+        max_history: int = 20,
+        store: Optional[ConversationStore] = None,
+        persist_results: bool = True,
+        answer_locally: bool = False
+    ):
+        """
+        Args:
+            client: GenieClient used to send questions
+            space_id: Genie space ID (uses the client default if not provided)
+            conversation_id: Existing conversation to continue
+            max_history: Number of turns kept in memory and in the store
+            store: Optional store the session is saved to after every turn
+            persist_results: Include result rows when saving to the store (rows that
+                are spilled to disk or lazy and not yet fetched are never saved)
+            answer_locally: Try answering follow-ups from the previous
+                results with LocalQueryRouter before asking Genie
+        """
+        if max_history < 1:
+            raise InvalidInputError("max_history must be at least 1")
+        self.client = client
+        self.space_id = space_id or client.config.default_space_id
+        self.conversation_id = conversation_id
+        self.max_history = max_history
+        self.store = store
+        self.persist_results = persist_results
+        self.router = LocalQueryRouter(client) if answer_locally else None
+        self._turns: "OrderedDict[str, ConversationTurn]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def resume(cls, client, conversation_id: str, store: ConversationStore,
+               **kwargs) -> "GenieConversation":
+        """
+        Restores a saved session from a store
+
+        Args:
+            client: GenieClient used for new questions
+            conversation_id: Conversation to restore
+            store: Store the session was saved to
+            **kwargs: Overrides for GenieConversation arguments
+
+        Returns:
+            GenieConversation with its history restored
+        """
+        state = store.load(conversation_id)
+        if state is None:
+            raise InvalidInputError(
+                "Conversation not found in store",
+                context={"conversation_id": conversation_id}
+            )
+        kwargs.setdefault("space_id", state.get("space_id"))
+        kwargs.setdefault("max_history", state.get("max_history", 20))
+        conversation = cls(client, conversation_id=conversation_id, store=store, **kwargs)
+        for turn in state.get("turns", []):
+            conversation._append(ConversationTurn.model_validate(turn))
+        logger.info("Resumed conversation %s with %d turns", conversation_id, len(conversation))
+        return conversation
+
+    def __len__(self) -> int:
+        return len(self._turns)
+
+    def __contains__(self, message_id: str) -> bool:
+        return message_id in self._turns
+
+    def __getitem__(self, message_id: str) -> ConversationTurn:
+        return self._turns[message_id]
+
+    @property
+    def history(self) -> List[ConversationTurn]:
+        """Turns in the order they were asked, oldest first"""
+        return list(self._turns.values())
+
+    @property
+    def last_turn(self) -> Optional[ConversationTurn]:
+        return next(reversed(self._turns.values()), None)
+
+    @property
+    def last_response(self) -> Optional[GenieResponse]:
+        turn = self.last_turn
+        return turn.response if turn else None
+
+    def get(self, message_id: str) -> Optional[ConversationTurn]:
+        """Returns the turn for a message ID, if still in history"""
+        return self._turns.get(message_id)
+
+    def ask(self, question: str, fetch_policy: Optional[str] = None) -> GenieResponse:
+        """
+        Asks a question in this conversation
+
+        The first question starts a new Genie conversation; later ones are
+        sent as follow-ups.
+
+        Args:
+            question: Natural language query
+            fetch_policy: Query results to download (see GenieClient.ask_genie)
+
+        Returns:
+            GenieResponse for the question
+        """
+        with self._lock:
+            response = None
+            previous = self._last_with_results() if self.router is not None else None
+            if previous is not None:
+                response = self.router.try_local(question, previous)
+
+            if response is None:
+                options = {"fetch_policy": fetch_policy} if fetch_policy else {}
+                response = self.client.ask_genie(
+                    question,
+                    space_id=self.space_id,
+                    follow_up=self.conversation_id is not None,
+                    conversation_id=self.conversation_id,
+                    **options
+                )
+                if response.success and response.conversation_id:
+                    self.conversation_id = response.conversation_id
+                    self.space_id = response.space_id or self.space_id
+
+            if response.success:
+                answered_locally = bool(response.metrics.get("answered_locally"))
+                self._append(ConversationTurn(
+                    message_id=response.message_id or f"local-{uuid.uuid4().hex}",
+                    question=question,
+                    sql=response.sql,
+                    answered_locally=answered_locally,
+                    asked_at=response.start_time,
+                    response=response
+                ))
+                self.save()
+            return response
+
+    def _last_with_results(self) -> Optional[GenieResponse]:
+        for turn in reversed(self._turns.values()):
+            results = turn.response.results
+            if results:
+                # Partial results (see FetchPolicies) cannot answer follow-ups locally
+                return turn.response if results.get("complete", True) else None
+        return None
+
+    def _append(self, turn: ConversationTurn) -> None:
+        self._turns[turn.message_id] = turn
+        self._turns.move_to_end(turn.message_id)
+        while len(self._turns) > self.max_history:
+            self._turns.popitem(last=False)
+
+    def to_state(self) -> Dict[str, Any]:
+        """Serializable snapshot of the session"""
+        without_results = {"response": {"results": True, "attachments": {"__all__": {"results"}}}}
+        turns = []
+        for turn in self._turns.values():
+            exclude = without_results if not self.persist_results else self._unstored_results(turn.response)
+            turns.append(turn.model_dump(mode="json", exclude=exclude))
+        return {
+            "conversation_id": self.conversation_id,
+            "space_id": self.space_id,
+            "max_history": self.max_history,
+            "turns": turns,
+        }
+
+    @staticmethod
+    def _unstored_results(response: GenieResponse) -> Optional[Dict[str, Any]]:
+        """model_dump exclude for results that are not copied into the store"""
+        def stored(results) -> bool:
+            # Unfetched lazy results would be downloaded just to be saved
+            if isinstance(results, LazyResults) and not results.loaded:
+                return False
+            # Results spilled to disk under a memory budget stay on disk
+            return not (results and results.get("spilled"))
+
+        exclude: Dict[str, Any] = {}
+        if not stored(response.results):
+            exclude["results"] = True
+        attachments = {i: {"results"} for i, att in enumerate(response.attachments) if not stored(att.results)}
+        if attachments:
+            exclude["attachments"] = attachments
+        return {"response": exclude} if exclude else None
+
+    def save(self) -> None:
+        """Saves the session to its store, if one is configured"""
+        if self.store is None or self.conversation_id is None:
+            return
+        self.store.save(self.conversation_id, self.to_state())
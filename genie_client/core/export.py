@@ -0,0 +1,280 @@
+"""Streaming export of query results to CSV, NDJSON and Parquet.
+
+Chunks are fetched and encoded on a small thread pool and written to disk in
+chunk order as soon as they are ready, so at most ``max_workers`` chunks are
+held in memory regardless of the result size. Column types come from the
+result manifest schema. Results already held by a response can be written
+the same way with ``export_rows``. A failed export removes the partial file.
+Parquet support requires the optional ``pyarrow`` dependency.
+"""
+import csv
+import io
+import json
+import math
+import os
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from ..exceptions.custom_errors import ConfigurationError, InvalidInputError
+from ..utils.logging import logger
+from ..utils.types import FLOAT_TYPES, INTEGER_TYPES, convert_column, to_raw_string
+from .results import ResultStream
+
+_SUFFIX_FORMATS = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+}
+
+
+class ResultWriter(ABC):
+    """
+    Writes result chunks to a file
+
+    ``encode`` turns a chunk's rows into a writable payload and may run on
+    worker threads in parallel; ``write`` appends payloads in chunk order.
+    """
+
+    def __init__(self, path: Union[str, Path], schema_columns: List[Dict[str, Any]]):
+        self.path = Path(path)
+        self.schema_columns = schema_columns
+        self.columns = [col["name"] for col in schema_columns]
+        self.type_names = [(col.get("type_name") or "STRING").upper() for col in schema_columns]
+        self.rows_written = 0
+
+    @abstractmethod
+    def encode(self, rows: List[List[Any]]) -> Any:
+        """Encodes a chunk's rows; may run on a worker thread"""
+
+    @abstractmethod
+    def write(self, payload: Any, row_count: int) -> None:
+        """Appends an encoded chunk"""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Flushes and closes the file"""
+
+
+class CSVResultWriter(ResultWriter):
+    """CSV with a header row; values are written exactly as returned"""
+
+    def __init__(self, path, schema_columns):
+        super().__init__(path, schema_columns)
+        self._file = open(self.path, "w", encoding="utf-8", newline="")
+        csv.writer(self._file).writerow(self.columns)
+
+    def encode(self, rows):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+
+    def write(self, payload, row_count):
+        self._file.write(payload)
+        self.rows_written += row_count
+
+    def close(self):
+        self._file.close()
+
+
+class NDJSONResultWriter(ResultWriter):
+    """One JSON object per row; integer, float and boolean columns are typed, NaN and infinities are null"""
+
+    _TYPED = INTEGER_TYPES | FLOAT_TYPES | {"BOOLEAN"}
+
+    def __init__(self, path, schema_columns):
+        super().__init__(path, schema_columns)
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+    def encode(self, rows):
+        if not rows:
+            return ""
+        # Decimals, dates and timestamps stay strings to keep full precision
+        columns = [
+            convert_column(values, type_name) if type_name in self._TYPED else values
+            for values, type_name in zip(zip(*rows), self.type_names)
+        ]
+        for i, type_name in enumerate(self.type_names):
+            if type_name in FLOAT_TYPES:
+                # JSON has no NaN or Infinity
+                columns[i] = [None if isinstance(v, float) and not math.isfinite(v) else v
+                              for v in columns[i]]
+        encode = self._encoder.encode
+        names = self.columns
+        return "".join(encode(dict(zip(names, row))) + "\n" for row in zip(*columns))
+
+    def write(self, payload, row_count):
+        self._file.write(payload)
+        self.rows_written += row_count
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetResultWriter(ResultWriter):
+    """Parquet file with one row group per result chunk"""
+
+    def __init__(self, path, schema_columns):
+        super().__init__(path, schema_columns)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ConfigurationError(
+                "Parquet export requires pyarrow: pip install databricks-genie-client[parquet]"
+            ) from e
+        self._pa = pa
+        self.schema = pa.schema([
+            pa.field(col["name"], self._arrow_type(col)) for col in schema_columns
+        ])
+        self._writer = pq.ParquetWriter(self.path, self.schema)
+
+    def _arrow_type(self, column: Dict[str, Any]):
+        pa = self._pa
+        type_name = (column.get("type_name") or "STRING").upper()
+        if type_name == "DECIMAL":
+            return pa.decimal128(column.get("type_precision", 38), column.get("type_scale", 0))
+        return {
+            "BYTE": pa.int8(),
+            "SHORT": pa.int16(),
+            "INT": pa.int32(),
+            "LONG": pa.int64(),
+            "FLOAT": pa.float32(),
+            "DOUBLE": pa.float64(),
+            "BOOLEAN": pa.bool_(),
+            "DATE": pa.date32(),
+            "TIMESTAMP": pa.timestamp("us", tz="UTC"),
+        }.get(type_name, pa.string())
+
+    def encode(self, rows):
+        pa = self._pa
+        raw_columns = list(zip(*rows)) if rows else [()] * len(self.columns)
+        arrays = []
+        for field, values in zip(self.schema, raw_columns):
+            # Arrow parses the string cells column-at-a-time in C++
+            array = pa.array(values, type=pa.string())
+            arrays.append(array if field.type == pa.string() else array.cast(field.type))
+        return pa.Table.from_arrays(arrays, schema=self.schema)
+
+    def write(self, payload, row_count):
+        self._writer.write_table(payload)
+        self.rows_written += row_count
+
+    def close(self):
+        self._writer.close()
+
+
+WRITERS = {
+    "csv": CSVResultWriter,
+    "ndjson": NDJSONResultWriter,
+    "parquet": ParquetResultWriter,
+}
+
+
+def resolve_format(path: Union[str, Path], format: Optional[str] = None) -> str:
+    """Returns the export format, inferring it from the file suffix if not given"""
+    resolved = (format or _SUFFIX_FORMATS.get(Path(path).suffix.lower(), "")).lower()
+    if resolved not in WRITERS:
+        raise InvalidInputError(
+            f"Unsupported export format: {format or Path(path).suffix!r}",
+            context={"supported_formats": sorted(WRITERS)}
+        )
+    return resolved
+
+
+def export_stream(stream: ResultStream, path: Union[str, Path], format: Optional[str] = None,
+                  max_workers: int = 4) -> Dict[str, Any]:
+    """
+    Streams all chunks of a result to a file
+
+    Args:
+        stream: Result stream to export
+        path: Destination file path
+        format: "csv", "ndjson" or "parquet" (inferred from the suffix if omitted)
+        max_workers: Chunks fetched and encoded in parallel; also the upper
+            bound on chunks held in memory
+
+    Returns:
+        Summary with path, format, row_count, chunk_count and bytes_written
+    """
+    format = resolve_format(path, format)
+    max_workers = max(1, max_workers)
+    writer = WRITERS[format](path, stream.schema_columns)
+
+    def fetch_and_encode(chunk_index: int):
+        rows = stream.fetch(chunk_index)
+        return writer.encode(rows), len(rows)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="genie-export") as pool:
+        def encoded():
+            pending = deque()
+            for chunk_index in range(stream.total_chunks):
+                pending.append(pool.submit(fetch_and_encode, chunk_index))
+                if len(pending) >= max_workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+        return _write(writer, encoded(), path, format, stream.total_chunks)
+
+
+def export_rows(columns: List[str], column_types: Optional[List[Optional[str]]], rows: Sequence[List[Any]],
+                path: Union[str, Path], format: Optional[str] = None,
+                chunk_size: int = 10_000) -> Dict[str, Any]:
+    """
+    Writes rows that are already in memory, e.g. ``GenieResponse.results``
+
+    Typed cells are turned back into their Databricks strings first, so the
+    output matches an export of the same result from Genie.
+
+    Args:
+        columns: Column names
+        column_types: Manifest type names (STRING where unknown)
+        rows: Rows to write
+        path: Destination file path
+        format: "csv", "ndjson" or "parquet" (inferred from the suffix if omitted)
+        chunk_size: Rows encoded per write (one Parquet row group each)
+
+    Returns:
+        Summary with path, format, row_count, chunk_count and bytes_written
+    """
+    format = resolve_format(path, format)
+    types = list(column_types or [None] * len(columns))
+    writer = WRITERS[format](path, [{"name": name, "type_name": type_name}
+                                    for name, type_name in zip(columns, types)])
+    chunk_count = max(1, math.ceil(len(rows) / chunk_size))
+
+    def encoded():
+        for start in range(0, max(len(rows), 1), chunk_size):
+            chunk = [[to_raw_string(value) for value in row] for row in rows[start:start + chunk_size]]
+            yield writer.encode(chunk), len(chunk)
+
+    return _write(writer, encoded(), path, format, chunk_count)
+
+
+def _write(writer: ResultWriter, encoded: Iterable[Tuple[Any, int]], path: Union[str, Path],
+           format: str, chunk_count: int) -> Dict[str, Any]:
+    """Writes encoded chunks in order; removes the partial file if anything fails"""
+    try:
+        for payload, row_count in encoded:
+            writer.write(payload, row_count)
+    except BaseException:
+        writer.close()
+        Path(path).unlink(missing_ok=True)
+        raise
+    writer.close()
+
+    summary = {
+        "path": str(path),
+        "format": format,
+        "row_count": writer.rows_written,
+        "chunk_count": chunk_count,
+        "bytes_written": os.path.getsize(path),
+    }
+    logger.info("Exported %d rows to %s (%s)", writer.rows_written, path, format)
+    return summary
@@ -0,0 +1,549 @@
+"""Local query layer over results that have already been fetched from Genie.
+
+Follow-up questions such as "now break that down by paymentMethod" can often
+be answered from the rows of the previous answer without another round trip
+to Genie and the SQL warehouse. ``LocalResultSet`` holds results in columnar
+form and runs filter / group-by / aggregate / top-N operations column at a
+time, and ``LocalQueryRouter`` answers simple follow-ups locally and falls
+back to ``GenieClient.ask_genie`` for everything else.
+"""
+import heapq
+import re
+from dataclasses import dataclass, field
+from itertools import compress
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..exceptions.custom_errors import InvalidInputError
+from ..models.response_models import GenieResponse
+from ..utils.constants import Status
+from ..utils.logging import logger
+from ..utils.types import NUMERIC_TYPES, convert_column, infer_column_type
+
+_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "=": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    "in": lambda a, b: a in b,
+    "contains": lambda a, b: b.lower() in str(a).lower(),
+}
+
+
+def _mean(values: List[Any]) -> Optional[float]:
+    return sum(values) / len(values) if values else None
+
+
+_AGGREGATES: Dict[str, Callable[[List[Any]], Any]] = {
+    "count": len,
+    "sum": sum,
+    "avg": _mean,
+    "min": lambda values: min(values) if values else None,
+    "max": lambda values: max(values) if values else None,
+    "count_distinct": lambda values: len(set(values)),
+}
+
+
+def _normalize_name(name: str) -> str:
+    """Normalizes a column name so "payment method" matches "paymentMethod" """
+    return re.sub(r"[^0-9a-z]", "", name.lower())
+
+
+class LocalResultSet:
+    """Columnar, typed view over a ``GenieResponse.results`` dict"""
+
+    def __init__(self, columns: List[str], data: Dict[str, List[Any]],
+                 column_types: Optional[List[Optional[str]]] = None):
+        self.columns = list(columns)
+        self.data = data
+        self.column_types = list(column_types or [None] * len(self.columns))
+        self._lookup = {_normalize_name(col): col for col in self.columns}
+
+    @classmethod
+    def from_results(cls, results: dict,
+                     column_types: Optional[List[Optional[str]]] = None) -> "LocalResultSet":
+        """
+        Builds a typed columnar result set from a results dict
+
+        Args:
+            results: ``GenieResponse.results`` with "columns", "data" and
+                optionally "column_types" from the manifest schema
+            column_types: Types to use instead, e.g. from ``schema_of``
+
+        Returns:
+            LocalResultSet with one converted list per column
+        """
+        columns = results.get("columns", [])
+        rows = results.get("data", [])
+        column_types = list(column_types or results.get("column_types") or [None] * len(columns))
+
+        raw_columns = list(zip(*rows)) if rows else [()] * len(columns)
+        data = {}
+        for i, name in enumerate(columns):
+            type_name = column_types[i] or infer_column_type(raw_columns[i])
+            column_types[i] = type_name
+            data[name] = convert_column(raw_columns[i], type_name)
+        return cls(columns, data, column_types)
+
+    @classmethod
+    def schema_of(cls, results: dict) -> "LocalResultSet":
+        """
+        Empty result set with the columns and types of a results dict
+
+        Enough to plan a follow-up without converting every row; types
+        missing from the manifest are inferred as ``from_results`` does.
+        """
+        columns = results.get("columns", [])
+        rows = results.get("data", [])
+        column_types = [
+            type_name or infer_column_type(row[i] for row in rows)
+            for i, type_name in enumerate(results.get("column_types") or [None] * len(columns))
+        ]
+        return cls(columns, {name: [] for name in columns}, column_types)
+
+    @classmethod
+    def from_response(cls, response: GenieResponse) -> "LocalResultSet":
+        """Builds a result set from a completed ``GenieResponse``"""
+        if not response.results:
+            raise InvalidInputError(
+                "Response has no results to query locally",
+                context={"message_id": response.message_id}
+            )
+        return cls.from_results(response.results)
+
+    @property
+    def row_count(self) -> int:
+        return len(self.data[self.columns[0]]) if self.columns else 0
+
+    def resolve_column(self, name: str) -> str:
+        """Maps a loosely written column name onto an actual column"""
+        if name in self.data:
+            return name
+        resolved = self._lookup.get(_normalize_name(name))
+        if resolved is None:
+            raise InvalidInputError(
+                f"Unknown column: {name}",
+                context={"columns": self.columns}
+            )
+        return resolved
+
+    def type_of(self, column: str) -> Optional[str]:
+        return self.column_types[self.columns.index(self.resolve_column(column))]
+
+    def is_numeric(self, column: str) -> bool:
+        return (self.type_of(column) or "").upper() in NUMERIC_TYPES
+
+    def _take(self, mask: Sequence[bool]) -> "LocalResultSet":
+        data = {col: list(compress(values, mask)) for col, values in self.data.items()}
+        return LocalResultSet(self.columns, data, self.column_types)
+
+    def _gather(self, indices: Sequence[int]) -> "LocalResultSet":
+        data = {col: [values[i] for i in indices] for col, values in self.data.items()}
+        return LocalResultSet(self.columns, data, self.column_types)
+
+    def select(self, columns: List[str]) -> "LocalResultSet":
+        """Returns a result set restricted to the given columns"""
+        resolved = [self.resolve_column(col) for col in columns]
+        types = [self.type_of(col) for col in resolved]
+        return LocalResultSet(resolved, {col: self.data[col] for col in resolved}, types)
+
+    def filter(self, column: str, op: str, value: Any) -> "LocalResultSet":
+        """
+        Keeps rows where ``column <op> value`` holds
+
+        Args:
+            column: Column name (matched case- and separator-insensitively)
+            op: One of =, !=, >, >=, <, <=, in, contains
+            value: Comparison value; converted to the column type
+
+        Returns:
+            New LocalResultSet with the matching rows
+        """
+        column = self.resolve_column(column)
+        if op not in _OPERATORS:
+            raise InvalidInputError(f"Unsupported filter operator: {op}")
+        compare = _OPERATORS[op]
+        type_name = self.type_of(column)
+        if op == "in":
+            value = set(convert_column([str(v) for v in value], type_name))
+        elif op != "contains":
+            value = convert_column([str(value)], type_name)[0]
+        values = self.data[column]
+        mask = [v is not None and compare(v, value) for v in values]
+        return self._take(mask)
+
+    def group_by(self, keys: List[str],
+                 aggregations: List[Tuple[str, Optional[str]]]) -> "LocalResultSet":
+        """
+        Groups rows by key columns and aggregates each group
+
+        Args:
+            keys: Group-by column names
+            aggregations: (function, column) pairs, e.g. ("sum", "totalPrice").
+                Use ("count", None) for a row count.
+
+        Returns:
+            New LocalResultSet with one row per group
+        """
+        keys = [self.resolve_column(key) for key in keys]
+        groups: Dict[Tuple, List[int]] = {}
+        if keys:
+            key_columns = [self.data[key] for key in keys]
+            for i, group_key in enumerate(zip(*key_columns)):
+                groups.setdefault(group_key, []).append(i)
+        else:
+            groups[()] = list(range(self.row_count))
+
+        columns = list(keys)
+        types = [self.type_of(key) for key in keys]
+        data: Dict[str, List[Any]] = {key: [] for key in keys}
+        for group_key in groups:
+            for key, part in zip(keys, group_key):
+                data[key].append(part)
+
+        for func, column in aggregations:
+            if func not in _AGGREGATES:
+                raise InvalidInputError(f"Unsupported aggregation: {func}")
+            name = func if column is None else f"{func}_{self.resolve_column(column)}"
+            source = None if column is None else self.data[self.resolve_column(column)]
+            aggregate = _AGGREGATES[func]
+            if source is None:
+                data[name] = [len(indices) for indices in groups.values()]
+            else:
+                data[name] = [
+                    aggregate([source[i] for i in indices if source[i] is not None])
+                    for indices in groups.values()
+                ]
+            columns.append(name)
+            if func in ("count", "count_distinct"):
+                types.append("LONG")
+            elif func == "avg":
+                types.append("DOUBLE")
+            else:
+                types.append(self.type_of(column))
+        return LocalResultSet(columns, data, types)
+
+    def aggregate(self, aggregations: List[Tuple[str, Optional[str]]]) -> "LocalResultSet":
+        """Aggregates the whole result set into a single row"""
+        return self.group_by([], aggregations)
+
+    def top_n(self, column: str, n: int = 10, descending: bool = True) -> "LocalResultSet":
+        """Returns the ``n`` rows with the largest (or smallest) ``column`` values"""
+        column = self.resolve_column(column)
+        values = self.data[column]
+        candidates = [i for i, v in enumerate(values) if v is not None]
+        pick = heapq.nlargest if descending else heapq.nsmallest
+        return self._gather(pick(n, candidates, key=values.__getitem__))
+
+    def to_results(self) -> Dict[str, Any]:
+        """Converts back to the ``GenieResponse.results`` dict layout"""
+        rows = [list(row) for row in zip(*(self.data[col] for col in self.columns))]
+        return {
+            "data": rows,
+            "columns": list(self.columns),
+            "column_types": list(self.column_types),
+            "row_count": len(rows),
+            "chunk_count": 1
+        }
+
+
+@dataclass
+class LocalQueryPlan:
+    """Operations a follow-up question maps onto"""
+    filters: List[Tuple[str, str, Any]] = field(default_factory=list)
+    group_by: List[str] = field(default_factory=list)
+    aggregations: List[Tuple[str, Optional[str]]] = field(default_factory=list)
+    order_by: Optional[str] = None
+    limit: Optional[int] = None
+    descending: bool = True
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.filters or self.group_by or self.aggregations or self.order_by)
+
+    def describe(self) -> str:
+        parts = []
+        for column, op, value in self.filters:
+            parts.append(f"filter {column} {op} {value!r}")
+        if self.group_by:
+            parts.append(f"group by {', '.join(self.group_by)}")
+        if self.aggregations:
+            parts.append("aggregate " + ", ".join(
+                f"{func}({column or '*'})" for func, column in self.aggregations
+            ))
+        if self.order_by:
+            direction = "top" if self.descending else "bottom"
+            parts.append(f"{direction} {self.limit} by {self.order_by}")
+        return "; ".join(parts)
+
+    def execute(self, result_set: LocalResultSet) -> LocalResultSet:
+        for column, op, value in self.filters:
+            result_set = result_set.filter(column, op, value)
+        if self.group_by or self.aggregations:
+            aggregations = self.aggregations or [("count", None)]
+            result_set = result_set.group_by(self.group_by, aggregations)
+        if self.order_by:
+            order_by = self.order_by
+            if order_by not in result_set.data:
+                # Ordering a grouped result by a measure column uses its aggregate
+                order_by = next(
+                    (col for col in result_set.columns if col.endswith(f"_{order_by}")),
+                    order_by
+                )
+            result_set = result_set.top_n(order_by, self.limit or 10, self.descending)
+        return result_set
+
+
+_AGGREGATE_WORDS = {
+    "sum": "sum", "total": "sum", "average": "avg", "avg": "avg", "mean": "avg",
+    "min": "min", "minimum": "min", "max": "max", "maximum": "max",
+    "count": "count", "number": "count", "distinct": "count_distinct",
+    "unique": "count_distinct",
+}
+_NUMBER_WORDS = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+                 "ten": 10, "twenty": 20}
+_COLUMN = r"[`'\"]?([A-Za-z_][\w ]*?)[`'\"]?"
+_GROUP_END = r"(?=\s*(?:$|[,.?;]|\band\b|\bthen\b|\bwith\b|\bwhere\b|\bonly\b))"
+_GROUP_RE = re.compile(
+    r"\b(?:break(?:\s+(?:that|it|this|them))?\s+down|group(?:ed)?|split|broken\s+down|per|for\s+each|each)"
+    r"\s+(?:by\s+)?" + _COLUMN + _GROUP_END,
+    re.IGNORECASE
+)
+# Further keys of a group-by list: "by product, region and paymentMethod"
+_GROUP_MORE_RE = re.compile(r"\s*(?:,\s*(?:and\s+)?|and\s+)" + _COLUMN + _GROUP_END, re.IGNORECASE)
+_TOP_RE = re.compile(
+    r"\b(top|bottom|highest|lowest|largest|smallest)\s+(\d+|" + "|".join(_NUMBER_WORDS) + r")"
+    r"(?:\s+([\w ]*?))?\s+by\s+" + _COLUMN + r"(?=\s*(?:$|[,.?;]|\band\b))",
+    re.IGNORECASE
+)
+# Nouns in "top 5 <noun> by ..." that mean individual rows rather than a grouping column
+_ROW_NOUNS = {"row", "record", "entry", "result", "transaction"}
+_AGGREGATE_RE = re.compile(
+    r"\b(" + "|".join(_AGGREGATE_WORDS) + r")\s+(?:of\s+)?(?:the\s+)?" + _COLUMN
+    + r"(?=\s*(?:$|[,.?;]|\bby\b|\bper\b|\band\b|\bfor\b|\bwhere\b))",
+    re.IGNORECASE
+)
+_FILTER_CONDITION = (
+    _COLUMN + r"\s*(=|==|!=|>=|<=|>|<|\bis not\b|\bis\b|\bequals\b|\bcontains\b)\s*"
+    r"[`'\"]?([^,;?`'\"]+?)[`'\"]?(?=\s*(?:$|[,.?;]|\band\b|\bor\b|\bthen\b))"
+)
+_FILTER_PREFIX = r"\b(?:only|where|filter(?:ed)?\s+(?:to|on|for|where)?|just)\s+"
+_FILTER_RE = re.compile(_FILTER_PREFIX + _FILTER_CONDITION, re.IGNORECASE)
+# Further conditions of a filter: "only quantity > 5 and (where) paymentMethod is visa"
+_FILTER_MORE_RE = re.compile(
+    r"\s*(?:,\s*(?:and\s+)?|and\s+)(?:" + _FILTER_PREFIX + ")?" + _FILTER_CONDITION, re.IGNORECASE
+)
+# A conjunction left after a clause, e.g. "... or amex" or "and <unknown>"
+_CONJUNCTION_RE = re.compile(r"\s*,?\s*\b(and|or)\s+", re.IGNORECASE)
+_BY_RE = re.compile(r"\bby\s+" + _COLUMN + r"(?=\s*(?:$|[,.?;]|\band\b))", re.IGNORECASE)
+_FILTER_OPS = {"==": "=", "is": "=", "equals": "=", "is not": "!="}
+
+
+def _singular_forms(noun: str) -> List[str]:
+    forms = [noun]
+    if noun.endswith("ies"):
+        forms.append(noun[:-3] + "y")
+    if noun.endswith("es"):
+        forms.append(noun[:-2])
+    if noun.endswith("s"):
+        forms.append(noun[:-1])
+    return forms
+
+
+def _resolve_noun(noun: str, result_set: LocalResultSet) -> Optional[str]:
+    """Column named by a (possibly plural) noun, "" for row nouns, None if unknown"""
+    for form in _singular_forms(_normalize_name(noun)):
+        if form in _ROW_NOUNS:
+            return ""
+        column = result_set._lookup.get(form)
+        if column is not None:
+            return column
+    return None
+
+
+def _group_keys(question: str, match: "re.Match", result_set: LocalResultSet) -> List[str]:
+    """Resolves every key of a group-by list; raises InvalidInputError for unknown ones"""
+    keys = [result_set.resolve_column(match.group(1).strip())]
+    position = match.end()
+    while True:
+        more = _GROUP_MORE_RE.match(question, position)
+        if more is None:
+            break
+        # "by product and total totalPrice" continues with another clause
+        if any(regex.match(question, more.start(1)) for regex in (_AGGREGATE_RE, _FILTER_RE, _TOP_RE)):
+            break
+        keys.append(result_set.resolve_column(more.group(1).strip()))
+        position = more.end()
+    return keys
+
+
+def _filters(question: str, match: "re.Match",
+             result_set: LocalResultSet) -> Optional[Tuple[List[Tuple[str, str, Any]], int]]:
+    """
+    Resolves a filter and the conditions chained to it with "and"
+
+    Returns the filters and where they end in the question, or None when a conjunction follows that starts neither another
+    condition nor another clause, e.g. "or amex", so no condition is dropped.
+    """
+    filters = []
+    while True:
+        column, op, value = match.groups()
+        op = _FILTER_OPS.get(op.lower(), op.lower())
+        filters.append((result_set.resolve_column(column.strip()), op, value.strip()))
+        position = match.end()
+        match = _FILTER_MORE_RE.match(question, position)
+        if match is None:
+            break
+    conjunction = _CONJUNCTION_RE.match(question, position)
+    if conjunction is not None:
+        if conjunction.group(1).lower() == "or":
+            return None
+        if not any(regex.match(question, conjunction.end())
+                   for regex in (_GROUP_RE, _AGGREGATE_RE, _TOP_RE, _FILTER_RE, _BY_RE)):
+            return None
+    return filters, position
+
+
+def plan_follow_up(question: str, result_set: LocalResultSet) -> Optional[LocalQueryPlan]:
+    """
+    Maps a simple follow-up question onto a local query plan
+
+    Only questions whose every referenced column exists in ``result_set``
+    are planned, including every key of a group-by list, every condition
+    chained with "and" and the noun ranked by "top N <noun> by ...";
+    anything else, such as an "or" condition, returns None so the caller can
+    fall back to Genie. ``result_set`` only needs its columns and types, so
+    ``LocalResultSet.schema_of`` is enough.
+    """
+    plan = LocalQueryPlan()
+    try:
+        match = _FILTER_RE.search(question)
+        while match is not None:
+            chained = _filters(question, match, result_set)
+            if chained is None:
+                return None
+            plan.filters.extend(chained[0])
+            match = _FILTER_RE.search(question, chained[1])
+
+        for match in _GROUP_RE.finditer(question):
+            for key in _group_keys(question, match, result_set):
+                if key not in plan.group_by:
+                    plan.group_by.append(key)
+
+        for match in _AGGREGATE_RE.finditer(question):
+            word, column = match.groups()
+            func = _AGGREGATE_WORDS[word.lower()]
+            column = column.strip()
+            if func == "count" and _normalize_name(column) in ("rows", "records", "transactions"):
+                plan.aggregations.append(("count", None))
+                continue
+            resolved = result_set.resolve_column(column)
+            if func not in ("count", "count_distinct") and not result_set.is_numeric(resolved):
+                return None
+            plan.aggregations.append((func, resolved))
+
+        top = _TOP_RE.search(question)
+        if top:
+            direction, count, noun, column = top.groups()
+            plan.descending = direction.lower() in ("top", "highest", "largest")
+            plan.limit = int(count) if count.isdigit() else _NUMBER_WORDS[count.lower()]
+            plan.order_by = result_set.resolve_column(column.strip())
+            if noun and noun.strip():
+                # "top 5 franchises by totalPrice" ranks franchises, not rows
+                noun_column = _resolve_noun(noun.strip(), result_set)
+                if noun_column is None:
+                    return None
+                if noun_column:
+                    if noun_column not in plan.group_by:
+                        plan.group_by.append(noun_column)
+                    if not plan.aggregations:
+                        if not result_set.is_numeric(plan.order_by):
+                            return None
+                        plan.aggregations.append(("sum", plan.order_by))
+        elif plan.aggregations and not plan.group_by:
+            # "total totalPrice by paymentMethod"
+            by = _BY_RE.search(question)
+            if by:
+                plan.group_by.append(result_set.resolve_column(by.group(1).strip()))
+    except InvalidInputError:
+        return None
+
+    return None if plan.is_empty else plan
+
+
+class LocalQueryRouter:
+    """Answers simple follow-ups from previous results, falling back to Genie"""
+
+    def __init__(self, client):
+        """
+        Args:
+            client: GenieClient used when a follow-up cannot be answered locally
+        """
+        self.client = client
+
+    def ask(
+        self,
+        question: str,
+        previous: GenieResponse,
+        space_id: Optional[str] = None,
+        allow_fallback: bool = True
+    ) -> GenieResponse:
+        """
+        Answers a follow-up question locally when possible
+
+        Args:
+            question: Follow-up question in natural language
+            previous: Completed response whose results the question refers to
+            space_id: Genie space for the fallback (defaults to the one
+                recorded on ``previous``)
+            allow_fallback: Send the question to Genie when it cannot be
+                answered locally
+
+        Returns:
+            GenieResponse; ``metrics["answered_locally"]`` tells which path ran
+        """
+        local = self.try_local(question, previous)
+        if local is not None or not allow_fallback:
+            return local
+        logger.info("Follow-up not answerable locally, asking Genie")
+        return self.client.ask_genie(
+            question,
+            space_id=space_id or previous.space_id,
+            follow_up=True,
+            conversation_id=previous.conversation_id
+        )
+
+    def try_local(self, question: str, previous: GenieResponse) -> Optional[GenieResponse]:
+        """Returns a locally computed response, or None if Genie is needed"""
+        results = previous.results
+        if not results or not results.get("columns"):
+            return None
+        # Partial results (e.g. truncated downloads) would give wrong answers
+        if results.get("row_count", 0) > len(results.get("data", [])):
+            return None
+
+        response = GenieResponse.start(
+            status=Status.COMPLETED,
+            success=True,
+            space_id=previous.space_id,
+            conversation_id=previous.conversation_id
+        )
+        schema = LocalResultSet.schema_of(results)
+        plan = plan_follow_up(question, schema)
+        if plan is None:
+            return None
+        # Rows are only converted once the question is known to be answerable
+        result_set = LocalResultSet.from_results(results, schema.column_types)
+        try:
+            response.results = plan.execute(result_set).to_results()
+        except (InvalidInputError, TypeError) as e:
+            logger.info("Local plan failed, deferring to Genie: %s", e)
+            return None
+
+        response.metrics["answered_locally"] = True
+        response.metrics["local_plan"] = plan.describe()
+        response.metrics["result_row_count"] = response.results["row_count"]
+        response.finalize()
+        logger.info("Answered follow-up locally: %s", response.metrics["local_plan"])
+        return response
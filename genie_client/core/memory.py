@@ -0,0 +1,271 @@
+"""Global memory budget for query results.
+
+Every chunk a client downloads is accounted against a shared
+``MemoryBudget``. Before a chunk is fetched its in-memory size is estimated
+from the manifest ``byte_count`` and reserved; if the budget is exhausted the
+fetch waits until other responses release memory. If it still does not fit
+after ``wait_timeout`` seconds, the result either spills to a temporary file
+(``SpilledRows``) or is rejected with ``MemoryBudgetExceededError``.
+
+Reservations are held by the response that owns the rows and released when
+the response is garbage collected or ``GenieResponse.release_results()`` is
+called.
+"""
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+import weakref
+from collections import deque
+from collections.abc import Sequence
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional
+
+from ..exceptions.custom_errors import MemoryBudgetExceededError
+
+# Decoded Python rows take several times the bytes of their JSON encoding
+DECODED_SIZE_FACTOR = 6
+
+
+def estimate_rows_bytes(rows: List[List[Any]], sample_size: int = 50) -> int:
+    """Estimates the memory held by a list of rows from a sample"""
+    if not rows:
+        return sys.getsizeof(rows)
+    step = max(1, len(rows) // sample_size)
+    sample = rows[::step]
+    per_row = sum(
+        sys.getsizeof(row) + sum(sys.getsizeof(cell) for cell in row) for row in sample
+    ) / len(sample)
+    return sys.getsizeof(rows) + int(per_row * len(rows))
+
+
+class MemoryBudget:
+    """Byte budget shared by all result downloads of one or more clients"""
+
+    def __init__(self, max_bytes: int, wait_timeout: float = 30.0):
+        """
+        Args:
+            max_bytes: Result bytes that may be held at once
+            wait_timeout: Seconds a fetch waits for memory before spilling or rejecting
+        """
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+        self.max_bytes = max_bytes
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+        self.used_bytes = 0
+        self.peak_bytes = 0
+        self.waiting = 0
+        self.waits = 0
+        self.total_wait_ms = 0.0
+        self.spills = 0
+        self.rejections = 0
+
+    def _grant(self, nbytes: int) -> None:
+        self.used_bytes += nbytes
+        self.peak_bytes = max(self.peak_bytes, self.used_bytes)
+
+    def reserve(self, nbytes: int, timeout: Optional[float] = None) -> bool:
+        """
+        Reserves bytes, waiting for other reservations to be released
+
+        A request larger than the whole budget is granted once nothing else
+        is reserved, so it can never wait forever.
+
+        Returns:
+            False if the bytes could not be reserved within the timeout
+        """
+        timeout = self.wait_timeout if timeout is None else timeout
+        with self._lock:
+            if self.used_bytes + nbytes <= self.max_bytes:
+                self._grant(nbytes)
+                return True
+            self.waits += 1
+            self.waiting += 1
+            start = time.monotonic()
+            deadline = start + timeout
+            try:
+                while self.used_bytes + nbytes > self.max_bytes and self.used_bytes > 0:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    self._released.wait(remaining)
+                self._grant(nbytes)
+                return True
+            finally:
+                self.waiting -= 1
+                self.total_wait_ms += (time.monotonic() - start) * 1000
+
+    def record_overflow(self, spilled: bool) -> None:
+        with self._lock:
+            if spilled:
+                self.spills += 1
+            else:
+                self.rejections += 1
+
+    def force(self, nbytes: int) -> None:
+        """Accounts bytes that are already in memory without waiting"""
+        with self._lock:
+            self._grant(nbytes)
+
+    def release(self, nbytes: int) -> None:
+        if nbytes <= 0:
+            return
+        with self._lock:
+            self.used_bytes = max(0, self.used_bytes - nbytes)
+            self._released.notify_all()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_bytes": self.max_bytes,
+                "used_bytes": self.used_bytes,
+                "peak_bytes": self.peak_bytes,
+                "utilization": self.used_bytes / self.max_bytes,
+                "waiting": self.waiting,
+                "waits": self.waits,
+                "total_wait_ms": round(self.total_wait_ms, 2),
+                "spills": self.spills,
+                "rejections": self.rejections,
+            }
+
+
+class SpilledRows(Sequence):
+    """Result rows written to a temporary file, read back lazily as a read-only sequence"""
+
+    def __init__(self, directory: Optional[str] = None):
+        fd, self.path = tempfile.mkstemp(prefix="genie-spill-", suffix=".pkl", dir=directory)
+        self._file = os.fdopen(fd, "wb")
+        self.row_count = 0
+        self.bytes_written = 0
+        self._finalizer = weakref.finalize(self, _remove_file, self._file, self.path)
+
+    def append(self, rows: List[List[Any]]) -> None:
+        if not rows:
+            return
+        payload = pickle.dumps(rows, protocol=pickle.HIGHEST_PROTOCOL)
+        self._file.write(payload)
+        self.row_count += len(rows)
+        self.bytes_written += len(payload)
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    def __iter__(self) -> Iterator[List[Any]]:
+        self._file.flush()
+        with open(self.path, "rb") as f:
+            while True:
+                try:
+                    rows = pickle.load(f)
+                except EOFError:
+                    return
+                yield from rows
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.to_list()[index]
+        if index < 0:
+            index += self.row_count
+        if not 0 <= index < self.row_count:
+            raise IndexError("spilled row index out of range")
+        rows = iter(self)
+        try:
+            return next(islice(rows, index, None))
+        finally:
+            rows.close()
+
+    def to_list(self) -> List[List[Any]]:
+        """Loads every row into memory"""
+        return list(self)
+
+    def close(self) -> None:
+        """Deletes the spill file"""
+        self._finalizer()
+
+
+def _remove_file(handle, path: str) -> None:
+    handle.close()
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class BudgetedCollector:
+    """Collects the rows of one result within a MemoryBudget"""
+
+    def __init__(self, budget: MemoryBudget, overflow: str = "spill",
+                 spill_directory: Optional[str] = None):
+        """
+        Args:
+            budget: Shared memory budget
+            overflow: "spill" to write rows to disk or "reject" to raise
+                MemoryBudgetExceededError when memory stays unavailable
+            spill_directory: Directory for spill files (system temp dir by default)
+        """
+        self.budget = budget
+        self.overflow = overflow
+        self.spill_directory = spill_directory
+        self.data: List[List[Any]] = []
+        self.spilled: Optional[SpilledRows] = None
+        self.reserved_bytes = 0
+        self._estimates: deque = deque()
+
+    def before_fetch(self, estimated_bytes: Optional[int]) -> None:
+        """Reserves memory for the next chunk, blocking while the budget is exhausted"""
+        reserved = 0
+        if self.spilled is None and estimated_bytes:
+            if self.budget.reserve(estimated_bytes):
+                reserved = estimated_bytes
+                self.reserved_bytes += reserved
+            else:
+                self._overflow(estimated_bytes)
+        # Chunks may be fetched ahead of being added (see ResultOffloader)
+        self._estimates.append(reserved)
+
+    def add(self, rows: List[List[Any]]) -> None:
+        """Adds a fetched chunk and corrects its reservation to the measured size"""
+        estimate = self._estimates.popleft() if self._estimates else 0
+        if self.spilled is not None:
+            self.spilled.append(rows)
+            return
+        actual = estimate_rows_bytes(rows)
+        difference = actual - estimate
+        if difference > 0 and not estimate:
+            # Size was unknown before the fetch; wait before holding more
+            if not self.budget.reserve(difference):
+                self._overflow(difference)
+                self.spilled.append(rows)
+                return
+        elif difference > 0:
+            self.budget.force(difference)
+        else:
+            self.budget.release(-difference)
+        self.reserved_bytes += difference
+        self.data.extend(rows)
+
+    def _overflow(self, requested: int) -> None:
+        if self.overflow == "reject":
+            self.budget.record_overflow(spilled=False)
+            self.release()
+            raise MemoryBudgetExceededError(
+                "Result does not fit in the memory budget",
+                context={"requested_bytes": requested, **self.budget.snapshot()}
+            )
+        self.budget.record_overflow(spilled=True)
+        self.spilled = SpilledRows(self.spill_directory)
+        self.spilled.append(self.data)
+        self.data = []
+        self.release()
+
+    def release(self) -> None:
+        """Returns every byte reserved by this collector"""
+        self.budget.release(self.reserved_bytes)
+        self.reserved_bytes = 0
+
+    @property
+    def rows(self):
+        return self.spilled if self.spilled is not None else self.data
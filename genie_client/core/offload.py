@@ -0,0 +1,219 @@
+"""Process-pool offload of CPU-bound result handling.
+
+JSON decoding of result chunks, string-to-type conversion of cells and
+markdown formatting hold the GIL and stall every other thread in the
+process. ``ResultOffloader`` runs them in worker processes instead: chunks
+are fetched as raw response bytes on the calling thread and decoded in a
+worker. Cells are typed only for streams created with ``typed=True`` (the
+``typed_results`` option), exactly as ``ResultStream.iter_chunks`` types
+them, so offloaded and in-process results always match. Typed integer,
+float and boolean columns come back through a shared memory block; other
+columns (decimals, dates, strings) are pickled.
+"""
+import json
+import multiprocessing
+from array import array
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ..utils.types import FLOAT_TYPES, INTEGER_TYPES, convert_column
+from .results import ResultStream
+
+# array typecodes for columns that can be shared as fixed-width buffers
+_SHARED_TYPECODES = {**{t: "q" for t in INTEGER_TYPES}, **{t: "d" for t in FLOAT_TYPES}, "BOOLEAN": "b"}
+
+# (shm name or None, [(column, typecode, offset, count, mask_offset)], {column: values}, row_count)
+PackedChunk = Tuple[Optional[str], List[Tuple[int, str, int, int, int]], Dict[int, List[Any]], int]
+
+
+def _chunk_rows(payload: Dict[str, Any]) -> List[List[Any]]:
+    """Extracts data_array from a Genie query-result or SQL chunk response"""
+    if "statement_response" in payload:
+        payload = payload["statement_response"].get("result", {}) or {}
+    return payload.get("data_array", []) or []
+
+
+def type_columns(rows: List[List[Any]], type_names: Sequence[Optional[str]]) -> List[List[Any]]:
+    """Converts row-major string cells into typed columns"""
+    if not rows:
+        return [[] for _ in type_names]
+    return [convert_column(values, type_name) for values, type_name in zip(zip(*rows), type_names)]
+
+
+def decode_chunk(raw: bytes, type_names: Sequence[Optional[str]]) -> PackedChunk:
+    """
+    Decodes and types one raw chunk; runs in a worker process
+
+    Returns:
+        PackedChunk describing the shared memory block and pickled columns
+    """
+    columns = type_columns(_chunk_rows(json.loads(raw)), type_names)
+    row_count = len(columns[0]) if columns else 0
+
+    buffers, specs, pickled = [], [], {}
+    offset = 0
+    for index, (values, type_name) in enumerate(zip(columns, type_names)):
+        typecode = _SHARED_TYPECODES.get((type_name or "").upper())
+        expected = bool if typecode == "b" else (int if typecode == "q" else float)
+        # Columns with malformed cells keep their raw strings and are pickled
+        if typecode is None or not all(v is None or type(v) is expected for v in values):
+            pickled[index] = values
+            continue
+        data = array(typecode, (0 if v is None else v for v in values)).tobytes()
+        mask = bytes(v is None for v in values)
+        specs.append((index, typecode, offset, row_count, offset + len(data)))
+        buffers.append(data + mask)
+        offset += len(data) + len(mask)
+
+    if offset == 0:
+        # No shareable data (or no rows); empty columns are cheap to pickle
+        pickled.update((spec[0], []) for spec in specs)
+        return None, [], pickled, row_count
+    block = shared_memory.SharedMemory(create=True, size=offset)
+    position = 0
+    for data in buffers:
+        block.buf[position:position + len(data)] = data
+        position += len(data)
+    name = block.name
+    block.close()
+    return name, specs, pickled, row_count
+
+
+def unpack_chunk(packed: PackedChunk, column_count: int) -> List[List[Any]]:
+    """Reads a PackedChunk back into typed columns and frees its shared memory"""
+    name, specs, pickled, _ = packed
+    columns: List[Optional[List[Any]]] = [None] * column_count
+    for index, values in pickled.items():
+        columns[index] = values
+    if name is not None:
+        block = shared_memory.SharedMemory(name=name)
+        try:
+            view = block.buf
+            for index, typecode, offset, count, mask_offset in specs:
+                width = array(typecode).itemsize
+                values = view[offset:offset + count * width].cast(typecode).tolist()
+                if typecode == "b":
+                    values = [bool(v) for v in values]
+                mask = bytes(view[mask_offset:mask_offset + count])
+                if any(mask):
+                    values = [None if null else v for v, null in zip(values, mask)]
+                columns[index] = values
+            del view
+        finally:
+            block.close()
+            block.unlink()
+    return [column if column is not None else [] for column in columns]
+
+
+def rows_from_columns(columns: List[List[Any]]) -> List[List[Any]]:
+    return [list(row) for row in zip(*columns)] if columns else []
+
+
+def format_markdown(columns: list, data: list, max_rows: Optional[int] = 100, **options) -> str:
+    """Worker entry point for format_results_to_markdown"""
+    from ..utils.formatting import format_results_to_markdown
+    return format_results_to_markdown(columns, data, max_rows, **options)
+
+
+class ResultOffloader:
+    """Runs result decoding, optional typing and formatting in a process pool"""
+
+    def __init__(self, max_workers: int = 2, max_pending_chunks: Optional[int] = None):
+        """
+        Args:
+            max_workers: Worker processes
+            max_pending_chunks: Raw chunks queued for decoding before fetching
+                pauses (defaults to twice max_workers)
+        """
+        self.max_workers = max_workers
+        self.max_pending_chunks = max_pending_chunks or 2 * max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        # Spawned workers avoid forking a process that runs logging and I/O threads
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    @staticmethod
+    def _type_names(stream: ResultStream) -> List[Optional[str]]:
+        """Manifest types for typed streams; no types keeps every cell a string"""
+        if stream.typed:
+            return stream.column_types
+        return [None] * len(stream.column_types)
+
+    def submit_chunk(self, raw: bytes, type_names: Sequence[Optional[str]]) -> "Future[PackedChunk]":
+        return self.executor.submit(decode_chunk, raw, list(type_names))
+
+    def iter_chunks(self, stream: ResultStream,
+                    before_fetch: Optional[Callable[[int], Any]] = None) -> Iterator[List[List[Any]]]:
+        """
+        Yields the rows of every chunk in chunk order, typed for typed streams
+
+        Chunk downloads on the calling thread overlap with decoding in the
+        workers; at most ``max_pending_chunks`` raw chunks are held at once.
+
+        Args:
+            stream: Result stream to read
+            before_fetch: Called with each chunk index before it is downloaded
+        """
+        type_names = self._type_names(stream)
+        column_count = len(type_names)
+        first_index = stream.first_chunk.get("chunk_index", 0)
+        pending: "deque" = deque()
+
+        def ready() -> List[List[Any]]:
+            item = pending.popleft()
+            columns = item if isinstance(item, list) else unpack_chunk(item.result(), column_count)
+            return rows_from_columns(columns)
+
+        try:
+            for chunk_index in range(stream.total_chunks):
+                if before_fetch is not None:
+                    before_fetch(chunk_index)
+                if chunk_index == first_index:
+                    # Already decoded with the statement response
+                    pending.append(type_columns(stream.first_chunk.get("data_array", []), type_names))
+                elif stream.supports_raw:
+                    pending.append(self.submit_chunk(stream.fetch_raw(chunk_index), type_names))
+                else:
+                    pending.append(type_columns(stream.fetch(chunk_index), type_names))
+                while len(pending) > self.max_pending_chunks:
+                    yield ready()
+            while pending:
+                yield ready()
+        finally:
+            # Free the shared memory of chunks that were decoded but not read
+            for item in pending:
+                if isinstance(item, Future) and not item.cancel() and item.exception() is None:
+                    unpack_chunk(item.result(), column_count)
+
+    def collect(self, stream: ResultStream) -> Dict[str, Any]:
+        """Fetches every chunk of a stream and returns its results"""
+        data: List[List[Any]] = []
+        for rows in self.iter_chunks(stream):
+            data.extend(rows)
+        return stream.to_results(data)
+
+    def format_markdown(self, columns: list, data: list, max_rows: Optional[int] = 100, **options) -> str:
+        """
+        Formats a markdown table in a worker process
+
+        Accepts the options of format_results_to_markdown. Pass only the rows
+        the table can hold; they are all sent to the worker.
+        """
+        if max_rows is not None:
+            if "total_rows" not in options:
+                options["total_rows"] = len(data)
+            data = data[:max_rows]
+        return self.executor.submit(format_markdown, columns, data, max_rows, **options).result()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,212 @@
+"""Pool of Genie clients for serving many workspaces and tenants.
+
+All clients in a pool share one ``requests.Session`` (urllib3 keeps a
+connection pool per host inside it), one admission controller capping
+in-flight operations across every tenant, one executor for hedged requests,
+one memory budget, one result offloader process pool, and one
+``TokenManager`` per Azure AD (tenant_id, client_id) pair so each service
+principal refreshes its token once. Clients are created on first use and
+evicted least-recently-used when the pool is full or after they have been
+idle for ``idle_timeout`` seconds. An evicted client is closed once its
+asks, SQL runs and refreshes in progress have finished.
+
+SQL caches and question indexes stay per client, so one tenant's answers
+are never reused for another.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, Hashable, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..config import AzureADGenieClientConfig, PATGenieClientConfig
+from ..utils.circuit_breaker import AdmissionController
+from ..utils.logging import logger
+from ..utils.scheduler import RequestScheduler
+from .auth import TokenManager
+from .client import GenieClient
+
+if TYPE_CHECKING:
+    from .memory import MemoryBudget
+    from .offload import ResultOffloader
+
+
+def pool_key(config: AzureADGenieClientConfig | PATGenieClientConfig) -> Tuple[str, ...]:
+    """Identifies a workspace and credential; the secret itself is hashed"""
+    if isinstance(config, AzureADGenieClientConfig):
+        return ("aad", config.databricks_url, config.tenant_id, config.client_id)
+    digest = hashlib.sha256(config.personal_access_token.encode()).hexdigest()[:16]
+    return ("pat", config.databricks_url, digest)
+
+
+class GenieClientPool:
+    """LRU pool of GenieClient instances sharing connections, tokens and a concurrency cap"""
+
+    def __init__(self, max_clients: int = 64, idle_timeout: Optional[float] = 900,
+                 max_in_flight: Optional[int] = None, max_connections_per_host: int = 10,
+                 scheduler: Optional[RequestScheduler] = None, max_hedge_workers: int = 16,
+                 memory_budget_mb: Optional[float] = None, memory_wait_timeout: float = 30.0,
+                 offload_workers: Optional[int] = None):
+        """
+        Args:
+            max_clients: Clients kept before the least recently used is evicted
+            idle_timeout: Seconds a client may go unused before eviction (None disables)
+            max_in_flight: Concurrent asks, SQL runs and refreshes allowed across all clients
+            max_connections_per_host: Keep-alive connections kept per workspace host
+            scheduler: Priority scheduler shared by all tenants, so one tenant's
+                batch traffic cannot starve another's interactive questions
+            max_hedge_workers: Threads shared by the hedged requests of every client
+            memory_budget_mb: Result memory shared by every client; if None, the
+                first tenant config with ``memory_budget_mb`` sizes it
+            memory_wait_timeout: Seconds a fetch waits for the shared budget
+            offload_workers: Worker processes shared by every client; if None,
+                the first tenant config with ``offload_workers`` sizes them
+        """
+        self.max_clients = max_clients
+        self.idle_timeout = idle_timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_clients, pool_maxsize=max_connections_per_host)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.admission = AdmissionController(max_in_flight) if max_in_flight else None
+        self.scheduler = scheduler
+        # Threads start on first use, so pools without hedging clients pay nothing
+        self.hedge_executor = ThreadPoolExecutor(max_workers=max_hedge_workers,
+                                                 thread_name_prefix="genie-hedge")
+        self.memory_budget: Optional["MemoryBudget"] = None
+        if memory_budget_mb:
+            self._memory_budget_for(memory_budget_mb, memory_wait_timeout)
+        self.offloader: Optional["ResultOffloader"] = None
+        if offload_workers:
+            self._offloader_for(offload_workers)
+        self._clients: "OrderedDict[Hashable, Tuple[GenieClient, float]]" = OrderedDict()
+        self._token_managers: Dict[Tuple[str, str], TokenManager] = {}
+        self._lock = threading.RLock()
+        self.evictions = 0
+
+    def get(self, config: AzureADGenieClientConfig | PATGenieClientConfig,
+            key: Optional[Hashable] = None) -> GenieClient:
+        """
+        Returns the pooled client for a configuration, creating it if needed
+
+        Args:
+            config: Client configuration for the tenant
+            key: Pool key (defaults to workspace URL plus credential identity)
+
+        Returns:
+            GenieClient sharing the pool's session, tokens and concurrency cap
+        """
+        key = key if key is not None else pool_key(config)
+        with self._lock:
+            self._evict_idle()
+            entry = self._clients.get(key)
+            if entry is not None:
+                self._clients[key] = (entry[0], time.monotonic())
+                self._clients.move_to_end(key)
+                return entry[0]
+
+            client = GenieClient(
+                config,
+                token_manager=self._token_manager(config),
+                session=self.session,
+                admission=self.admission,
+                scheduler=self.scheduler,
+                hedge_executor=self.hedge_executor,
+                memory_budget=self._memory_budget_for(config.memory_budget_mb, config.memory_wait_timeout),
+                offloader=self._offloader_for(config.offload_workers)
+            )
+            self._clients[key] = (client, time.monotonic())
+            while len(self._clients) > self.max_clients:
+                self._evict(next(iter(self._clients)))
+            logger.debug("Pooled client created", extra={"event": "pool", "clients": len(self._clients)})
+            return client
+
+    def _memory_budget_for(self, budget_mb: Optional[float], wait_timeout: float) -> Optional["MemoryBudget"]:
+        """The shared budget, created on first request; None while no client needs one"""
+        if self.memory_budget is None and budget_mb:
+            from .memory import MemoryBudget
+            self.memory_budget = MemoryBudget(int(budget_mb * 1024 * 1024), wait_timeout)
+        return self.memory_budget
+
+    def _offloader_for(self, workers: Optional[int]) -> Optional["ResultOffloader"]:
+        """The shared offloader, created on first request; clients without offloading skip it"""
+        if not workers:
+            return None
+        if self.offloader is None:
+            from .offload import ResultOffloader
+            self.offloader = ResultOffloader(workers)
+        return self.offloader
+
+    def _token_manager(self, config) -> TokenManager:
+        if not isinstance(config, AzureADGenieClientConfig):
+            return TokenManager(config)
+        token_key = (config.tenant_id, config.client_id)
+        manager = self._token_managers.get(token_key)
+        if manager is None:
+            manager = self._token_managers[token_key] = TokenManager(config)
+        return manager
+
+    def _evict_idle(self) -> None:
+        if not self.idle_timeout:
+            return
+        cutoff = time.monotonic() - self.idle_timeout
+        # Entries are in last-used order, so stop at the first recent one
+        for key, (_, last_used) in list(self._clients.items()):
+            if last_used > cutoff:
+                break
+            self._evict(key)
+
+    def _evict(self, key: Hashable) -> None:
+        client, _ = self._clients.pop(key)
+        # Another thread may still be using it
+        client.close_when_idle()
+        self.evictions += 1
+        in_use = {id(c.token_manager) for c, _ in self._clients.values()}
+        for token_key, manager in list(self._token_managers.items()):
+            if id(manager) not in in_use:
+                del self._token_managers[token_key]
+
+    def evict(self, key: Hashable) -> bool:
+        """Removes a client and closes it once idle; returns False if it was not pooled"""
+        with self._lock:
+            if key not in self._clients:
+                return False
+            self._evict(key)
+            return True
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._clients
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "token_managers": len(self._token_managers),
+                "evictions": self.evictions,
+                "admission": self.admission.snapshot() if self.admission else None,
+                "scheduler": self.scheduler.snapshot() if self.scheduler else None,
+                "memory": self.memory_budget.snapshot() if self.memory_budget else None,
+            }
+
+    def close(self) -> None:
+        """Closes every pooled client, the shared session, hedging threads and offloader"""
+        with self._lock:
+            for key in list(self._clients):
+                self._evict(key)
+            self.session.close()
+            self.hedge_executor.shutdown(wait=False)
+            if self.offloader is not None:
+                self.offloader.shutdown()
+
+    def __enter__(self) -> "GenieClientPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
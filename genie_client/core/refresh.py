@@ -0,0 +1,145 @@
+"""Row-level deltas between a result set and a re-run of its query.
+
+``RowIndex`` maps each row's key to its normalized cells. With key columns,
+the key is their values and different cells mean the row was updated.
+Without key columns, the whole row is the key, so a changed row shows up as
+one deletion and one insertion. Repeated keys are matched in order: the
+second occurrence in the new result is compared with the second in the old
+one.
+
+Cells are normalized before they are compared, so a typed cell and the
+string Databricks sent for it compare equal. Typed cells are turned back into
+strings, except in FLOAT, DOUBLE and TIMESTAMP columns: Databricks writes
+those in more than one form, so their strings are converted instead, like
+``typed_results`` converts them.
+
+Diffing a re-run streams its chunks through the old index once. Each row
+costs two dict lookups and a tuple comparison; FLOAT, DOUBLE and TIMESTAMP
+columns are converted a chunk at a time. The new index is built along the
+way, so the next refresh starts from it instead of re-normalizing.
+"""
+from datetime import datetime
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from ..exceptions.custom_errors import InvalidInputError
+from ..utils.types import FLOAT_TYPES, convert_column, to_raw_string
+
+# Columns whose strings have several forms ("1.0E10", "...Z") are compared typed
+_TYPED_COMPARISON = FLOAT_TYPES | {"TIMESTAMP"}
+_STRING_CELLS = frozenset({str, type(None)})
+_TYPED_CELLS = _STRING_CELLS | {float, datetime}
+
+
+class RowIndex:
+    """Normalized cells of every row of a result, by key"""
+
+    def __init__(self, columns: Sequence[str], key_columns: Optional[Sequence[str]] = None,
+                 column_types: Optional[Sequence[Optional[str]]] = None):
+        """
+        Args:
+            columns: Result column names
+            key_columns: Columns identifying a row (None uses the whole row)
+            column_types: Manifest type names used to normalize cells
+
+        Raises:
+            InvalidInputError: If a key column is not a result column
+        """
+        self.columns = list(columns)
+        self.key_columns = list(key_columns or [])
+        missing = [name for name in self.key_columns if name not in self.columns]
+        if missing:
+            raise InvalidInputError(
+                f"Key columns not in the result: {', '.join(missing)}",
+                context={"columns": self.columns}
+            )
+        self._positions = [self.columns.index(name) for name in self.key_columns]
+        self.column_types = list(column_types or [])
+        self._typed_columns = [(i, type_name) for i, type_name in enumerate(self.column_types)
+                               if type_name and type_name.upper() in _TYPED_COMPARISON]
+        self.rows: Dict[Hashable, List[Any]] = {}
+        self.cells: Dict[Hashable, Tuple[Any, ...]] = {}  # Only with key columns
+        self.data: List[List[Any]] = []
+        self._occurrences: Dict[Hashable, int] = {}
+
+    @classmethod
+    def from_rows(cls, columns: Sequence[str], key_columns: Optional[Sequence[str]],
+                  rows: Iterable[List[Any]],
+                  column_types: Optional[Sequence[Optional[str]]] = None) -> "RowIndex":
+        index = cls(columns, key_columns, column_types)
+        index._add_rows(list(rows))
+        return index
+
+    def _normalize(self, rows: List[List[Any]]) -> List[Tuple[Any, ...]]:
+        """Cells of the rows in one comparable form, whether or not they were typed"""
+        if not rows:
+            return []
+        kept = _STRING_CELLS
+        if self._typed_columns:
+            rows = [list(row) for row in rows]
+            for i, type_name in self._typed_columns:
+                for cells, value in zip(rows, convert_column([cells[i] for cells in rows], type_name)):
+                    cells[i] = value
+            kept = _TYPED_CELLS
+        return [tuple(row) if kept.issuperset(map(type, row))
+                else tuple([value if type(value) in kept else to_raw_string(value) for value in row])
+                for row in rows]
+
+    def _add_rows(self, rows: List[List[Any]], old: Optional["RowIndex"] = None,
+                  inserted: Optional[list] = None, updated: Optional[list] = None) -> None:
+        """Indexes rows, sorting them into inserted and updated against an old index"""
+        positions = self._positions
+        index_rows, index_cells, occurrences = self.rows, self.cells, self._occurrences
+        old_rows = old.rows if old is not None else None
+        old_cells = old.cells if old is not None else None
+        self.data.extend(rows)
+        for row, cells in zip(rows, self._normalize(rows)):
+            if not positions:
+                key = cells  # Equal keys are equal rows, so no cells are kept
+            elif len(positions) == 1:
+                key = cells[positions[0]]
+            else:
+                key = tuple([cells[i] for i in positions])
+            if index_rows.setdefault(key, row) is not row:
+                # Keys are scalars or tuples of scalars, so (key, n) never clashes with one
+                occurrence = occurrences.get(key, 1)
+                occurrences[key] = occurrence + 1
+                key = (key, occurrence)
+                index_rows[key] = row
+            if positions:
+                # The cells themselves are compared; hashes of distinct rows can collide
+                index_cells[key] = cells
+                if old_cells is not None:
+                    previous = old_cells.get(key)
+                    if previous is None:
+                        inserted.append(row)
+                    elif previous != cells:
+                        updated.append(row)
+            elif old_rows is not None and key not in old_rows:
+                inserted.append(row)
+
+    def diff(self, chunks: Iterable[List[List[Any]]]) -> Tuple["RowIndex", Dict[str, Any]]:
+        """
+        Compares re-run rows, chunk by chunk, with the indexed ones
+
+        Args:
+            chunks: Row lists of the new result, in order
+
+        Returns:
+            Index of the new result, and a delta dict with "inserted",
+            "updated" and "deleted" rows and a "changed" flag
+        """
+        new = RowIndex(self.columns, self.key_columns, self.column_types)
+        inserted, updated = [], []
+        for rows in chunks:
+            new._add_rows(rows, self, inserted, updated)
+        new_rows = new.rows
+        deleted = [row for key, row in self.rows.items() if key not in new_rows]
+        return new, {
+            "changed": bool(inserted or updated or deleted),
+            "inserted": inserted,
+            "updated": updated,
+            "deleted": deleted,
+        }
+
+    def __len__(self) -> int:
+        return len(self.rows)
@@ -0,0 +1,130 @@
+"""Chunk-by-chunk access to statement results.
+
+Genie query results and SQL statement results share the same layout: a
+statement response carrying the manifest and the first result chunk, with
+remaining chunks fetched by index. ``ResultStream`` wraps that layout so
+callers can consume chunks as they arrive instead of materializing
+``data_array`` in one list.
+"""
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from ..exceptions.custom_errors import ResultRetrievalError
+from ..utils.types import convert_column, extract_column_types
+
+
+class ResultStream:
+    """Iterates the result chunks of a single statement"""
+
+    def __init__(self, statement_response: Dict[str, Any],
+                 fetch_chunk: Callable[[int], Dict[str, Any]],
+                 fetch_raw_chunk: Optional[Callable[[int], bytes]] = None,
+                 typed: bool = False):
+        """
+        Args:
+            statement_response: Statement response with "status", "manifest" and "result"
+            fetch_chunk: Returns the result chunk dict (with "data_array") for an index
+            fetch_raw_chunk: Returns the undecoded response body for an index, so
+                decoding can happen elsewhere (see ResultOffloader)
+            typed: Convert the rows yielded by iter_chunks to Python values
+                using the manifest column types; fetch always returns strings
+
+        Raises:
+            ResultRetrievalError: If the statement did not succeed
+        """
+        status = statement_response.get("status", {}).get("state", "")
+        if status != "SUCCEEDED":
+            raise ResultRetrievalError(
+                f"Query execution failed with status: {status}",
+                status_code=400,
+                response_body=statement_response
+            )
+        self.statement_id: Optional[str] = statement_response.get("statement_id")
+        self.manifest: Dict[str, Any] = statement_response.get("manifest", {})
+        self.first_chunk: Dict[str, Any] = statement_response.get("result", {}) or {}
+        self._fetch_chunk = fetch_chunk
+        self._fetch_raw_chunk = fetch_raw_chunk
+        self.typed = typed
+
+    @property
+    def columns(self) -> List[str]:
+        return [col["name"] for col in self.manifest.get("schema", {}).get("columns", [])]
+
+    @property
+    def column_types(self) -> List[Optional[str]]:
+        return extract_column_types(self.manifest)
+
+    @property
+    def schema_columns(self) -> List[Dict[str, Any]]:
+        """Raw manifest column descriptors (name, type_name, precision, ...)"""
+        return self.manifest.get("schema", {}).get("columns", [])
+
+    @property
+    def total_chunks(self) -> int:
+        return self.manifest.get("total_chunk_count", 1)
+
+    @property
+    def total_rows(self) -> int:
+        return self.manifest.get("total_row_count", 0)
+
+    def chunk_byte_count(self, chunk_index: int) -> Optional[int]:
+        """Size of a chunk as reported by the manifest, if available"""
+        for chunk in self.manifest.get("chunks", []):
+            if chunk.get("chunk_index") == chunk_index:
+                return chunk.get("byte_count")
+        return None
+
+    def fetch(self, chunk_index: int) -> List[List[Any]]:
+        """Returns the rows of one chunk, reusing the inline first chunk"""
+        if chunk_index == self.first_chunk.get("chunk_index", 0):
+            return self.first_chunk.get("data_array", [])
+        return self._fetch_chunk(chunk_index).get("data_array", [])
+
+    @property
+    def supports_raw(self) -> bool:
+        return self._fetch_raw_chunk is not None
+
+    def fetch_raw(self, chunk_index: int) -> bytes:
+        """Returns the undecoded response body of one chunk"""
+        if self._fetch_raw_chunk is None:
+            raise NotImplementedError("This stream cannot fetch raw chunks")
+        return self._fetch_raw_chunk(chunk_index)
+
+    def __iter__(self) -> Iterator[Tuple[int, List[List[Any]]]]:
+        """Yields (chunk_index, data_array) in chunk order"""
+        return self.iter_chunks()
+
+    def iter_chunks(self, before_fetch: Optional[Callable[[int], Any]] = None
+                    ) -> Iterator[Tuple[int, List[List[Any]]]]:
+        """
+        Yields (chunk_index, data_array) in chunk order
+
+        Args:
+            before_fetch: Called with each chunk index before it is fetched
+        """
+        first_index = self.first_chunk.get("chunk_index", 0)
+        for chunk_index in range(self.total_chunks):
+            if before_fetch is not None:
+                before_fetch(chunk_index)
+            if chunk_index == first_index or self.total_chunks == 1:
+                rows = self.first_chunk.get("data_array", [])
+            else:
+                rows = self._fetch_chunk(chunk_index).get("data_array", [])
+            yield chunk_index, self.type_rows(rows) if self.typed else rows
+
+    def type_rows(self, rows: List[List[Any]]) -> List[List[Any]]:
+        """Converts string cells to Python values using the manifest column types"""
+        if not rows:
+            return rows
+        columns = [convert_column(values, type_name)
+                   for values, type_name in zip(zip(*rows), self.column_types)]
+        return [list(row) for row in zip(*columns)]
+
+    def to_results(self, data: List[List[Any]]) -> Dict[str, Any]:
+        """Builds the ``GenieResponse.results`` dict for the given rows"""
+        return {
+            "data": data,
+            "columns": self.columns,
+            "column_types": self.column_types,
+            "row_count": self.total_rows,
+            "chunk_count": self.total_chunks
+        }
@@ -0,0 +1,319 @@
+"""Approximate question-similarity index for reusing earlier answers.
+
+Questions are reduced to character trigrams of their words (stop words
+removed, word order ignored), summarized by a MinHash signature and bucketed
+with locality-sensitive hashing, so a lookup only compares against the few
+past questions that share a band. Candidates are then scored by the exact
+Jaccard similarity of their trigram sets.
+
+The MinHash values of a trigram are one SHAKE-128 digest split into 32-bit
+words, cached per trigram, so a signature is an element-wise minimum
+computed in C rather than num_perm hash evaluations per trigram.
+
+Numbers, quoted strings, month and day names and polarity words
+("including"/"excluding", "ascending"/"descending", ...) must match exactly:
+"revenue in May 2024" and "revenue in June 2024" share nearly every trigram
+but need different SQL.
+"""
+import hashlib
+import random
+import re
+import threading
+import time
+import zlib
+from array import array
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Deque, Dict, FrozenSet, List, Optional, Tuple
+
+from .sql_cache import normalize_question
+
+# Words that rarely change the SQL of an analytics question. Grouping and
+# filtering words ("by", "per", "not", "top", "and") are deliberately absent.
+STOP_WORDS = frozenset({
+    "a", "an", "the", "of", "in", "on", "for", "at", "during", "over", "from",
+    "what", "which", "was", "is", "are", "were", "be", "been", "did", "do", "does",
+    "show", "me", "give", "tell", "list", "find", "get", "display", "please", "can", "you",
+    "how", "much", "many", "total", "overall", "our", "we", "i", "my", "there",
+})
+
+# Words that change the SQL while barely changing the trigrams, mapped to a
+# canonical form so that synonyms ("asc", "ascending") still match
+_MONTHS = ["january", "february", "march", "april", "may", "june", "july",
+           "august", "september", "october", "november", "december"]
+_DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+PROTECTED_WORDS = {
+    **{month: month for month in _MONTHS},
+    **{month[:3]: month for month in _MONTHS},
+    "sept": "september",
+    **{day: day for day in _DAYS},
+    **{word: "include" for word in ("include", "includes", "including", "included", "inclusive")},
+    **{word: "exclude" for word in ("exclude", "excludes", "excluding", "excluded", "exclusive", "without")},
+    **{word: "ascending" for word in ("asc", "ascending")},
+    **{word: "descending" for word in ("desc", "descending")},
+    **{word: "highest" for word in ("highest", "max", "maximum", "largest", "biggest")},
+    **{word: "lowest" for word in ("lowest", "min", "minimum", "smallest")},
+    **{word: "before" for word in ("before", "prior")},
+    **{word: "after" for word in ("after", "since")},
+}
+
+_WORD = re.compile(r"\w+")
+_LITERAL = re.compile(r"'[^']*'|\"[^\"]*\"|\d+(?:[.,]\d+)*")
+_MAX_HASH = (1 << 32) - 1
+
+
+def normalize_sql(sql: str) -> str:
+    """Case- and whitespace-insensitive form of SQL for comparing answers"""
+    return re.sub(r"\s+", " ", sql.strip().rstrip(";")).lower()
+
+
+def question_trigrams(question: str) -> FrozenSet[str]:
+    """Character trigrams of a question's content words"""
+    trigrams = set()
+    for word in _WORD.findall(normalize_question(question)):
+        if word not in STOP_WORDS:
+            padded = f" {word} "
+            trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(trigrams)
+
+
+@lru_cache(maxsize=65536)
+def _trigram_hashes(trigram: str, seed: bytes, count: int) -> array:
+    hashes = array("I")
+    hashes.frombytes(hashlib.shake_128(seed + trigram.encode()).digest(4 * count))
+    return hashes
+
+
+def question_literals(question: str) -> Tuple[str, ...]:
+    """Numbers, quoted strings and protected words, which must match for questions to be similar"""
+    question = question.lower()
+    literals = _LITERAL.findall(question)
+    literals.extend(PROTECTED_WORDS[word] for word in _WORD.findall(question) if word in PROTECTED_WORDS)
+    return tuple(sorted(literals))
+
+
+@dataclass
+class QuestionMatch:
+    """A previous question found similar to a new one"""
+    space_id: str
+    question: str
+    sql: str
+    similarity: float
+    response: Any = None
+
+
+@dataclass
+class _Entry:
+    question: str
+    sql: str
+    shingles: array
+    signature: array
+    literals: Tuple[str, ...]
+    created: float
+    response: Any = None
+
+
+class _SpaceIndex:
+    def __init__(self, bands: int):
+        self.entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.buckets: List[Dict[tuple, set]] = [{} for _ in range(bands)]
+
+
+class QuestionIndex:
+    """Per-space MinHash/LSH index of answered questions and their SQL"""
+
+    def __init__(self, threshold: float = 0.8, max_size: int = 1024, ttl: float = 3600,
+                 num_perm: int = 64, bands: int = 16, audit_rate: float = 0.0,
+                 audit_log_size: int = 100, seed: int = 1):
+        """
+        Args:
+            threshold: Minimum Jaccard similarity of trigram sets for a match
+            max_size: Questions kept per space before the least recently used is dropped
+            ttl: Seconds an entry stays valid; 0 disables expiry
+            num_perm: MinHash signature length
+            bands: LSH bands; num_perm must be a multiple. More bands find
+                less similar candidates at the cost of more comparisons
+            audit_rate: Share of matches the client re-asks Genie to audit
+            audit_log_size: Recent matches kept for recent_matches()
+            seed: Seed for the MinHash hash functions
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl = ttl
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.audit_rate = audit_rate
+        self._seed = seed.to_bytes(8, "big")
+        self._random = random.Random()
+        self._spaces: Dict[str, _SpaceIndex] = {}
+        self._lock = threading.Lock()
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=audit_log_size)
+        self.lookups = 0
+        self.hits = 0
+        self.audits = 0
+        self.false_matches = 0
+
+    def _fingerprint(self, question: str) -> Tuple[FrozenSet[int], array, Tuple[str, ...]]:
+        """Trigram ids, MinHash signature and literals of a question"""
+        trigrams = question_trigrams(question)
+        if trigrams:
+            hashes = [_trigram_hashes(t, self._seed, self.num_perm) for t in trigrams]
+            signature = array("I", map(min, *hashes)) if len(hashes) > 1 else array("I", hashes[0])
+        else:
+            signature = array("I", [_MAX_HASH] * self.num_perm)
+        shingles = frozenset(zlib.crc32(t.encode()) for t in trigrams)
+        return shingles, signature, question_literals(question)
+
+    def _band_keys(self, signature: array, literals: Tuple[str, ...]) -> List[tuple]:
+        # Literals are part of every key, so only questions with the same
+        # numbers, quoted strings and protected words ever become candidates
+        rows = self.rows
+        return [(literals, *signature[i * rows:(i + 1) * rows]) for i in range(self.bands)]
+
+    def _remove(self, space: _SpaceIndex, key: str) -> None:
+        entry = space.entries.pop(key)
+        for band, band_key in enumerate(self._band_keys(entry.signature, entry.literals)):
+            bucket = space.buckets[band].get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del space.buckets[band][band_key]
+
+    def add(self, space_id: str, question: str, sql: str, response: Any = None) -> None:
+        """
+        Indexes a question Genie answered
+
+        Args:
+            space_id: Genie space the question was asked in
+            question: Question text
+            sql: SQL Genie generated for it
+            response: Response to reuse as-is, when results are reused
+        """
+        shingles, signature, literals = self._fingerprint(question)
+        entry = _Entry(
+            question=question,
+            sql=sql,
+            shingles=array("I", sorted(shingles)),
+            signature=signature,
+            literals=literals,
+            created=time.monotonic(),
+            response=response,
+        )
+        key = normalize_question(question)
+        with self._lock:
+            space = self._spaces.setdefault(space_id, _SpaceIndex(self.bands))
+            if key in space.entries:
+                self._remove(space, key)
+            space.entries[key] = entry
+            for band, band_key in enumerate(self._band_keys(signature, literals)):
+                space.buckets[band].setdefault(band_key, set()).add(key)
+            while len(space.entries) > self.max_size:
+                self._remove(space, next(iter(space.entries)))
+
+    def lookup(self, space_id: str, question: str) -> Optional[QuestionMatch]:
+        """
+        Finds the most similar indexed question at or above the threshold
+
+        Returns:
+            QuestionMatch, or None if no indexed question is close enough
+        """
+        shingles, signature, literals = self._fingerprint(question)
+        exact_key = normalize_question(question)
+        now = time.monotonic()
+        with self._lock:
+            self.lookups += 1
+            space = self._spaces.get(space_id)
+            if space is None:
+                return None
+            candidates = set()
+            for band, band_key in enumerate(self._band_keys(signature, literals)):
+                candidates.update(space.buckets[band].get(band_key, ()))
+
+            # Ties go to the same question, then to the most recently added
+            best_key, best_rank = None, None
+            expires_before = now - self.ttl if self.ttl else None
+            for key in candidates:
+                entry = space.entries[key]
+                if expires_before is not None and entry.created < expires_before:
+                    self._remove(space, key)
+                    continue
+                shared = len(shingles.intersection(entry.shingles))
+                union = len(shingles) + len(entry.shingles) - shared
+                similarity = shared / union if union else 1.0
+                rank = (similarity, key == exact_key, entry.created)
+                if similarity >= self.threshold and (best_rank is None or rank > best_rank):
+                    best_key, best_rank = key, rank
+            if best_key is None:
+                return None
+            best_similarity = best_rank[0]
+
+            self.hits += 1
+            space.entries.move_to_end(best_key)
+            entry = space.entries[best_key]
+            self._recent.append({
+                "space_id": space_id,
+                "question": question,
+                "matched_question": entry.question,
+                "similarity": round(best_similarity, 3),
+                "audit": None,
+            })
+            return QuestionMatch(space_id, entry.question, entry.sql, best_similarity, entry.response)
+
+    def remove(self, space_id: str, question: str) -> None:
+        """Drops a question, e.g. after its SQL failed to execute"""
+        with self._lock:
+            space = self._spaces.get(space_id)
+            key = normalize_question(question)
+            if space is not None and key in space.entries:
+                self._remove(space, key)
+
+    def should_audit(self) -> bool:
+        return self.audit_rate > 0 and self._random.random() < self.audit_rate
+
+    def record_audit(self, match: QuestionMatch, question: str, genie_sql: str) -> bool:
+        """
+        Records whether Genie's own SQL for a reused question agrees with the match
+
+        A disagreement counts as a false match, and the question is indexed
+        with Genie's SQL so later variants of it match correctly.
+
+        Returns:
+            True if the SQL matched
+        """
+        agreed = normalize_sql(genie_sql) == normalize_sql(match.sql)
+        with self._lock:
+            self.audits += 1
+            if not agreed:
+                self.false_matches += 1
+            for record in reversed(self._recent):
+                if record["question"] == question and record["matched_question"] == match.question:
+                    record["audit"] = "agreed" if agreed else "false_match"
+                    break
+        if not agreed:
+            self.add(match.space_id, question, genie_sql)
+        return agreed
+
+    def recent_matches(self) -> List[Dict[str, Any]]:
+        """Recent matches with their similarity and audit outcome, newest last"""
+        with self._lock:
+            return [dict(record) for record in self._recent]
+
+    def __len__(self) -> int:
+        return sum(len(space.entries) for space in self._spaces.values())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": sum(len(space.entries) for space in self._spaces.values()),
+                "spaces": len(self._spaces),
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "reuse_rate": self.hits / self.lookups if self.lookups else 0.0,
+                "audits": self.audits,
+                "false_matches": self.false_matches,
+                "false_match_rate": self.false_matches / self.audits if self.audits else 0.0,
+            }
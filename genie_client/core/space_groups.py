@@ -0,0 +1,187 @@
+"""Groups of equivalent Genie spaces with load balancing and failover.
+
+A space group names several spaces that answer the same questions, usually
+backed by different SQL warehouses. Passing the group name wherever a
+space_id is accepted routes each new conversation to one member:
+
+- ``least_outstanding``: the member with the fewest questions in flight
+- ``lowest_latency``: the lowest EWMA of observed answer latency, scaled by
+  the questions already in flight so a burst does not pile onto one member
+- ``weighted``: random choice in proportion to configured weights
+
+Latency is measured from the message status phases seen while polling, and
+the time spent in ``SUBMITTED`` and ``PENDING_WAREHOUSE`` is tracked
+separately as the member's queue time. A member that fails
+``failure_threshold`` times in a row is skipped for ``cooldown_seconds``,
+after which it gets traffic again and one success restores it.
+"""
+import random
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Union
+
+from ..exceptions.custom_errors import ConfigurationError
+from ..utils.constants import RoutingStrategies, Status
+
+QUEUED_STATUSES = (Status.SUBMITTED, Status.PENDING_WAREHOUSE)
+
+
+class SpaceHealth:
+    """Load, latency and failure state of one space in a group"""
+
+    def __init__(self, space_id: str, weight: float = 1.0):
+        self.space_id = space_id
+        self.weight = weight
+        self.outstanding = 0
+        self.ewma_latency_ms: Optional[float] = None
+        self.ewma_queue_ms: Optional[float] = None
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+        self.requests = 0
+        self.failures = 0
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.unhealthy_until
+
+    def to_dict(self, now: float) -> Dict[str, Any]:
+        return {
+            "weight": self.weight,
+            "healthy": self.healthy(now),
+            "outstanding": self.outstanding,
+            "ewma_latency_ms": None if self.ewma_latency_ms is None else round(self.ewma_latency_ms, 1),
+            "ewma_queue_ms": None if self.ewma_queue_ms is None else round(self.ewma_queue_ms, 1),
+            "requests": self.requests,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+def _ewma(current: Optional[float], sample: float, alpha: float) -> float:
+    return sample if current is None else alpha * sample + (1 - alpha) * current
+
+
+class SpaceGroup:
+    """Routes questions across equivalent Genie spaces"""
+
+    def __init__(self, name: str, spaces: Union[Iterable[str], Mapping[str, float]],
+                 strategy: str = RoutingStrategies.LEAST_OUTSTANDING, ewma_alpha: float = 0.3,
+                 failure_threshold: int = 3, cooldown_seconds: float = 30.0):
+        """
+        Args:
+            name: Group name, used in place of a space_id
+            spaces: Member space IDs, or a mapping of space ID to routing weight
+            strategy: One of RoutingStrategies.ALL
+            ewma_alpha: Weight of the newest latency sample in the moving averages
+            failure_threshold: Consecutive failures before a space is skipped
+            cooldown_seconds: Seconds an unhealthy space is skipped
+        """
+        weights = dict(spaces) if isinstance(spaces, Mapping) else dict.fromkeys(spaces, 1.0)
+        if not weights:
+            raise ConfigurationError(f"Space group {name} has no spaces")
+        if strategy not in RoutingStrategies.ALL:
+            raise ConfigurationError(
+                f"Unknown routing strategy: {strategy}",
+                context={"routing_strategies": list(RoutingStrategies.ALL)}
+            )
+        if any(weight <= 0 for weight in weights.values()):
+            raise ConfigurationError(f"Space weights in group {name} must be positive")
+        self.name = name
+        self.strategy = strategy
+        self.ewma_alpha = ewma_alpha
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.spaces: Dict[str, SpaceHealth] = {
+            space_id: SpaceHealth(space_id, weight) for space_id, weight in weights.items()
+        }
+        self._lock = threading.Lock()
+        self._random = random.Random()
+        self.failovers = 0
+
+    def acquire(self, exclude: Iterable[str] = ()) -> Optional[str]:
+        """
+        Picks a space for a new question and counts it as outstanding
+
+        Healthy spaces are preferred; if every remaining space is cooling
+        down, the one whose cooldown ends first is used.
+
+        Args:
+            exclude: Spaces already tried for this question
+
+        Returns:
+            Space ID, or None if every space was excluded
+        """
+        with self._lock:
+            chosen = self._pick(exclude)
+            if chosen is None:
+                return None
+            chosen.outstanding += 1
+            chosen.requests += 1
+            return chosen.space_id
+
+    def choose(self) -> str:
+        """Picks a space without counting a question, e.g. to resolve its warehouse"""
+        with self._lock:
+            return self._pick(()).space_id
+
+    def _pick(self, exclude: Iterable[str]) -> Optional[SpaceHealth]:
+        now = time.monotonic()
+        candidates = [health for health in self.spaces.values() if health.space_id not in exclude]
+        if not candidates:
+            return None
+        healthy = [health for health in candidates if health.healthy(now)]
+        if not healthy:
+            return min(candidates, key=lambda health: health.unhealthy_until)
+        return self._choose(healthy)
+
+    def _choose(self, candidates: List[SpaceHealth]) -> SpaceHealth:
+        if self.strategy == RoutingStrategies.WEIGHTED:
+            return self._random.choices(candidates, weights=[h.weight for h in candidates])[0]
+        if self.strategy == RoutingStrategies.LOWEST_LATENCY:
+            # Spaces without samples yet score 0, so each is tried early
+            def score(health: SpaceHealth) -> float:
+                return (health.ewma_latency_ms or 0.0) * (health.outstanding + 1)
+        else:
+            def score(health: SpaceHealth) -> float:
+                return health.outstanding / health.weight
+        best = min(score(health) for health in candidates)
+        return self._random.choice([health for health in candidates if score(health) == best])
+
+    def release(self, space_id: str, success: bool,
+                status_ms: Optional[Mapping[str, float]] = None) -> None:
+        """
+        Records the outcome of a question acquired for a space
+
+        Args:
+            space_id: Space returned by acquire()
+            success: False if the space errored, which counts towards cooldown
+            status_ms: Milliseconds spent in each message status while polling
+        """
+        with self._lock:
+            health = self.spaces[space_id]
+            health.outstanding -= 1
+            if status_ms:
+                alpha = self.ewma_alpha
+                health.ewma_latency_ms = _ewma(health.ewma_latency_ms, sum(status_ms.values()), alpha)
+                queue_ms = sum(status_ms.get(status, 0.0) for status in QUEUED_STATUSES)
+                health.ewma_queue_ms = _ewma(health.ewma_queue_ms, queue_ms, alpha)
+            if success:
+                health.consecutive_failures = 0
+                health.unhealthy_until = 0.0
+                return
+            health.failures += 1
+            health.consecutive_failures += 1
+            if health.consecutive_failures >= self.failure_threshold:
+                health.unhealthy_until = time.monotonic() + self.cooldown_seconds
+
+    def record_failover(self) -> None:
+        with self._lock:
+            self.failovers += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "strategy": self.strategy,
+                "failovers": self.failovers,
+                "spaces": {space_id: health.to_dict(now) for space_id, health in self.spaces.items()},
+            }
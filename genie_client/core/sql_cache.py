@@ -0,0 +1,61 @@
+"""Question-to-SQL cache so repeated questions skip Genie's LLM planning."""
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+def normalize_question(question: str) -> str:
+    """Lower-cases and collapses whitespace and trailing punctuation"""
+    return re.sub(r"\s+", " ", question.strip().lower()).rstrip(" ?.!")
+
+
+class SQLCache:
+    """Thread-safe LRU cache of generated SQL keyed by (space_id, question)"""
+
+    def __init__(self, max_size: int = 256, ttl: float = 3600):
+        """
+        Args:
+            max_size: Maximum number of cached mappings
+            ttl: Seconds an entry stays valid; 0 disables expiry
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, space_id: str, question: str) -> Optional[str]:
+        """Returns cached SQL for the question, or None"""
+        key = (space_id, normalize_question(question))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl and time.monotonic() - entry[1] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, space_id: str, question: str, sql: str) -> None:
+        """Caches the SQL Genie generated for a question"""
+        key = (space_id, normalize_question(question))
+        with self._lock:
+            self._entries[key] = (sql, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, space_id: str, question: str) -> None:
+        """Drops a mapping, e.g. after its SQL failed to execute"""
+        with self._lock:
+            self._entries.pop((space_id, normalize_question(question)), None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
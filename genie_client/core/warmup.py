@@ -0,0 +1,208 @@
+"""Start-up warm-up and keep-warm for GenieClient.
+
+The first ``ask_genie`` after a deploy otherwise pays for the TLS handshake,
+Azure AD token acquisition, first-use Pydantic validation and frequently a
+stopped SQL warehouse. ``ClientWarmer`` primes these concurrently, records a
+per-component readiness state for health checks and can keep them warm on a
+schedule from a background thread.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from ..exceptions.custom_errors import GenieBaseError
+from ..models.response_models import Attachment, GenieResponse
+from ..utils.constants import Status, WAREHOUSE_STOPPED_STATES
+from ..utils.logging import logger
+
+PENDING = "pending"
+READY = "ready"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+class WarmupState:
+    """Thread-safe readiness state, queryable by health checks"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.components: Dict[str, Dict[str, Any]] = {}
+        self.warmed_at: Optional[datetime] = None
+        self.last_keep_warm: Optional[datetime] = None
+        self.first_request_ms: Optional[float] = None
+        self.first_request_warm: Optional[bool] = None
+
+    def update(self, component: str, status: str, duration_ms: Optional[float] = None,
+               error: Optional[str] = None, **details):
+        with self._lock:
+            self.components[component] = {
+                "status": status,
+                "duration_ms": duration_ms,
+                "error": error,
+                **details
+            }
+
+    @property
+    def ready(self) -> bool:
+        """True once every attempted component is ready (or skipped)"""
+        with self._lock:
+            return bool(self.components) and all(
+                c["status"] in (READY, SKIPPED) for c in self.components.values()
+            )
+
+    def record_first_request(self, duration_ms: Optional[float]) -> bool:
+        """Records the first ask_genie latency; returns True if this was the first"""
+        with self._lock:
+            if self.first_request_ms is not None or duration_ms is None:
+                return False
+            self.first_request_ms = duration_ms
+            self.first_request_warm = self.warmed_at is not None
+            return True
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "ready": bool(self.components) and all(
+                    c["status"] in (READY, SKIPPED) for c in self.components.values()
+                ),
+                "components": {name: dict(c) for name, c in self.components.items()},
+                "warmed_at": self.warmed_at.isoformat() if self.warmed_at else None,
+                "last_keep_warm": self.last_keep_warm.isoformat() if self.last_keep_warm else None,
+                "first_request_ms": self.first_request_ms,
+                "first_request_warm": self.first_request_warm,
+            }
+
+
+class ClientWarmer:
+    """Primes a GenieClient's connection, auth, models and warehouse"""
+
+    def __init__(self, client):
+        self.client = client
+        self.state = WarmupState()
+        self._stop_event = threading.Event()
+        self._keep_warm_thread: Optional[threading.Thread] = None
+
+    def warmup(self, space_id: Optional[str] = None, warehouse: bool = True,
+               wait_for_warehouse: bool = False, timeout: float = 60) -> Dict[str, Any]:
+        """
+        Primes all components concurrently
+
+        Args:
+            space_id: Genie space whose warehouse should be started
+            warehouse: Start the SQL warehouse if it is stopped
+            wait_for_warehouse: Block until the warehouse reports RUNNING
+            timeout: Maximum seconds to wait for the warehouse
+
+        Returns:
+            Readiness state as a dict
+        """
+        space_id = space_id or self.client.config.default_space_id
+        tasks: Dict[str, Callable[[], Dict[str, Any]]] = {
+            "auth": self._warm_auth,
+            "connection": self._warm_connection,
+            "models": self._warm_models,
+        }
+        if warehouse:
+            tasks["warehouse"] = lambda: self._warm_warehouse(space_id, wait_for_warehouse, timeout)
+        for name in tasks:
+            self.state.update(name, PENDING)
+
+        with ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix="genie-warmup") as pool:
+            futures = {name: pool.submit(self._run, name, task) for name, task in tasks.items()}
+            for future in futures.values():
+                future.result()
+
+        self.state.warmed_at = datetime.now()
+        logger.info("Warm-up finished, ready=%s", self.state.ready)
+        return self.state.to_dict()
+
+    def _run(self, name: str, task: Callable[[], Dict[str, Any]]) -> None:
+        start = time.perf_counter()
+        try:
+            details = task() or {}
+            status = details.pop("status", READY)
+            self.state.update(name, status, (time.perf_counter() - start) * 1000, **details)
+        except (GenieBaseError, ValueError) as e:
+            logger.warning("Warm-up of %s failed: %s", name, e)
+            self.state.update(name, FAILED, (time.perf_counter() - start) * 1000, error=str(e))
+
+    def _warm_auth(self) -> Dict[str, Any]:
+        self.client.token_manager.get_access_token()
+        return {}
+
+    def _warm_connection(self) -> Dict[str, Any]:
+        self.client.api_client.warm_connection()
+        return {}
+
+    def _warm_models(self) -> Dict[str, Any]:
+        # Exercise validation and serialization once so first use is not slower
+        response = GenieResponse.model_validate({
+            "start_time": datetime.now(),
+            "status": Status.COMPLETED,
+            "success": True,
+            "attachments": [{"type": "query", "content": {}, "attachment_id": "warmup"}],
+        })
+        response.model_dump_json()
+        Attachment.model_validate({"type": "text", "content": {}})
+        return {}
+
+    def _warm_warehouse(self, space_id: Optional[str], wait: bool, timeout: float) -> Dict[str, Any]:
+        warehouse_id = self.client.resolve_warehouse_id(space_id)
+        if not warehouse_id:
+            return {"status": SKIPPED, "error": "No warehouse_id configured or resolvable"}
+
+        api_client = self.client.api_client
+        state = api_client.get_warehouse(warehouse_id).get("state")
+        started = False
+        if state in WAREHOUSE_STOPPED_STATES:
+            logger.info("Starting SQL warehouse %s (state: %s)", warehouse_id, state)
+            api_client.start_warehouse(warehouse_id)
+            started = True
+
+        if wait:
+            deadline = time.time() + timeout
+            while state != "RUNNING" and time.time() < deadline:
+                time.sleep(self.client.config.poll_interval)
+                state = api_client.get_warehouse(warehouse_id).get("state")
+            if state != "RUNNING":
+                raise ValueError(f"Warehouse {warehouse_id} not running after {timeout}s (state: {state})")
+        return {"warehouse_id": warehouse_id, "warehouse_state": state, "started": started}
+
+    def start_keep_warm(self, interval: float, space_id: Optional[str] = None,
+                        warehouse: bool = True) -> None:
+        """
+        Re-runs warm-up every ``interval`` seconds on a daemon thread
+
+        Args:
+            interval: Seconds between keep-warm pings
+            space_id: Genie space whose warehouse should be kept running
+            warehouse: Also keep the SQL warehouse started
+        """
+        if interval <= 0:
+            raise ValueError("Keep-warm interval must be positive")
+        self.stop_keep_warm()
+        self._stop_event.clear()
+
+        def loop():
+            while not self._stop_event.wait(interval):
+                try:
+                    self.warmup(space_id=space_id, warehouse=warehouse)
+                except Exception as e:  # Keep the thread alive; the next ping may succeed
+                    logger.error("Keep-warm ping failed: %s", e, exc_info=True)
+                    continue
+                self.state.last_keep_warm = datetime.now()
+
+        self._keep_warm_thread = threading.Thread(target=loop, name="genie-keep-warm", daemon=True)
+        self._keep_warm_thread.start()
+        logger.info("Keep-warm started with %ss interval", interval)
+
+    def stop_keep_warm(self) -> None:
+        """Stops the keep-warm thread, if running"""
+        if self._keep_warm_thread is None:
+            return
+        self._stop_event.set()
+        self._keep_warm_thread.join(timeout=5)
+        self._keep_warm_thread = None
+        logger.info("Keep-warm stopped")
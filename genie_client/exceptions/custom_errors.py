@@ -41,4 +41,16 @@ class OperationAbortedError(GenieBaseError):
     """Operation aborted by client or server"""
 
 class NLGenerationError(GenieBaseError):
-    """Natural language generation failed"""
\ No newline at end of file
+    """Natural language generation failed"""
+
+class CircuitOpenError(GenieBaseError):
+    """Endpoint circuit breaker is open; call failed fast"""
+
+class LoadShedError(GenieBaseError):
+    """Request rejected because the in-flight limit was reached"""
+
+class MemoryBudgetExceededError(GenieBaseError):
+    """Result rejected because it does not fit in the memory budget"""
+
+class SerializationError(GenieBaseError):
+    """Serialized response is malformed or uses an unsupported format version"""
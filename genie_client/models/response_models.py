@@ -1,20 +1,153 @@
 from datetime import datetime
-from typing import Dict, Any, List, Optional
-from pydantic import BaseModel
+from typing import Callable, Dict, Any, List, Optional
+import threading
+import weakref
+from pydantic import BaseModel, Field, PrivateAttr, field_serializer, model_validator
+
+def determine_attachment_type(attachment: dict) -> str:
+    """Identifies attachment type based on content"""
+    if "query" in attachment:
+        return "query"
+    elif "text" in attachment:
+        return "text"
+    elif "error" in attachment:
+        return "error"
+    return "unknown"
+
+class LazyResults(dict):
+    """
+    Results dict whose rows are fetched on first access
+
+    Reading any key, iterating or serializing the owning response triggers
+    the download; ``row_count`` is available before that when Genie reported
+    it. Fetch errors are raised to the code that first reads the results.
+    """
+
+    def __init__(self, loader: Callable[[], Dict[str, Any]], row_count: Optional[int] = None):
+        super().__init__()
+        self._loader = loader
+        self._lock = threading.Lock()
+        self.loaded = False
+        self.row_count = row_count
+
+    def load(self) -> "LazyResults":
+        """Fetches the results now if they have not been fetched yet"""
+        if not self.loaded:
+            with self._lock:
+                if not self.loaded:
+                    dict.update(self, self._loader())
+                    self._loader = None
+                    self.loaded = True
+                    self.row_count = dict.get(self, "row_count", self.row_count)
+        return self
+
+    def __getitem__(self, key):
+        return dict.__getitem__(self.load(), key)
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self.load(), key, value)
+
+    def __contains__(self, key) -> bool:
+        return dict.__contains__(self.load(), key)
+
+    def __iter__(self):
+        return dict.__iter__(self.load())
+
+    def __len__(self) -> int:
+        return dict.__len__(self.load())
+
+    def __bool__(self) -> bool:
+        # Pending results exist; checking for them must not download them
+        return not self.loaded or dict.__len__(self) > 0
+
+    def __eq__(self, other) -> bool:
+        return dict.__eq__(self.load(), other)
+
+    def __ne__(self, other) -> bool:
+        return dict.__ne__(self.load(), other)
+
+    __hash__ = None
+
+    def get(self, key, default=None):
+        return dict.get(self.load(), key, default)
+
+    def keys(self):
+        return dict.keys(self.load())
+
+    def values(self):
+        return dict.values(self.load())
+
+    def items(self):
+        return dict.items(self.load())
+
+    def copy(self) -> Dict[str, Any]:
+        return dict(self.load())
+
+    def __repr__(self) -> str:
+        if not self.loaded:
+            return f"LazyResults(row_count={self.row_count}, loaded=False)"
+        return dict.__repr__(self)
+
+
+def _serialize_results(value, handler):
+    # Lazy results are fetched before the response is dumped
+    if isinstance(value, LazyResults):
+        value.load()
+    from ..core.memory import SpilledRows
+    if isinstance(value, dict) and isinstance(value.get("data"), SpilledRows):
+        # Spilled rows are read back from disk for the dump
+        value = dict(value, data=value["data"].to_list())
+    return handler(value)
+
+
+# Written in place of an attachment's results when they are GenieResponse.results
+RESULTS_REF = {"$ref": "#/results"}
+
 
 class Attachment(BaseModel):
     """Represents a Genie response attachment"""
     type: str  # "text", "query", "error"
     content: Dict[str, Any]
     attachment_id: Optional[str] = None
+    results: Optional[Dict[str, Any]] = None  # Query results, for query attachments
+    error_message: Optional[str] = None  # Set if fetching this attachment's results failed
+
+    @classmethod
+    def from_api(cls, raw: Dict[str, Any]) -> "Attachment":
+        """
+        Builds an attachment from an API payload without full validation
+
+        The payload comes straight from the Genie API, so only its shape is
+        checked here; ``model_construct`` skips re-validating the nested
+        content dict on every poll.
+        """
+        if not isinstance(raw, dict):
+            raise ValueError(f"Attachment payload must be a dict, got {type(raw).__name__}")
+        attachment_id = raw.get("attachment_id")
+        return cls.model_construct(
+            type=determine_attachment_type(raw),
+            content=raw,
+            attachment_id=None if attachment_id is None else str(attachment_id)
+        )
+
+    @field_serializer("results", mode="wrap")
+    def _serialize_results(self, value, handler):
+        return _serialize_results(value, handler)
+
+    @property
+    def result_row_count(self) -> Optional[int]:
+        """Row count Genie reported in query_result_metadata, without fetching results"""
+        query = self.content.get("query") or {}
+        return (query.get("query_result_metadata") or {}).get("row_count")
 
 class GenieResponse(BaseModel):
     """Comprehensive response model for Genie operations"""
     success: bool
+    space_id: Optional[str] = None
     conversation_id: Optional[str] = None
     message_id: Optional[str] = None
     status: str  # IN_PROGRESS, EXECUTING_QUERY, COMPLETED, FAILED, CANCELLED
-    attachments: List[Attachment] = []
+    attachments: List[Attachment] = Field(default_factory=list)
     results: Optional[Dict[str, Any]] = None
     natural_language_answer: Optional[str] = None
     start_time: datetime
@@ -22,8 +155,83 @@ class GenieResponse(BaseModel):
     duration_ms: Optional[float] = None
     error_type: Optional[str] = None
     error_message: Optional[str] = None
-    metrics: Dict[str, Any] = {}  # For usage tracking
-    
+    metrics: Dict[str, Any] = Field(default_factory=dict)  # For usage tracking
+    _memory_holds: List[Any] = PrivateAttr(default_factory=list)
+    _row_index: Any = PrivateAttr(default=None)  # RowIndex of results, kept by GenieClient.refresh
+
+    @classmethod
+    def start(cls, **fields) -> "GenieResponse":
+        """
+        Creates an in-flight response without validation
+
+        Used on the hot path where every field is set by the client itself;
+        values received from the API go through Attachment.from_api instead.
+        """
+        fields.setdefault("start_time", datetime.now())
+        fields.setdefault("success", False)
+        return cls.model_construct(**fields)
+
+    @field_serializer("results", mode="wrap")
+    def _serialize_results(self, value, handler):
+        return _serialize_results(value, handler)
+
+    @field_serializer("attachments", mode="wrap")
+    def _serialize_attachments(self, value, handler):
+        # response.results is the first query attachment's results; write the rows once
+        results = self.results
+        if results is None or not any(att.results is results for att in value):
+            return handler(value)
+        return handler([
+            att.model_copy(update={"results": RESULTS_REF}) if att.results is results else att
+            for att in value
+        ])
+
+    @model_validator(mode="after")
+    def _link_results(self) -> "GenieResponse":
+        """Points attachments written with RESULTS_REF back at response.results"""
+        for attachment in self.attachments:
+            if type(attachment.results) is dict and attachment.results == RESULTS_REF:
+                attachment.results = self.results
+        return self
+
+    @property
+    def query_attachments(self) -> List[Attachment]:
+        """Query attachments in message order, each carrying its own results"""
+        return [att for att in self.attachments if att.type == "query"]
+
+    @property
+    def sql(self) -> Optional[str]:
+        """SQL generated by Genie for the first query attachment, if any"""
+        for attachment in self.attachments:
+            query = attachment.content.get("query")
+            if attachment.type == "query" and query:
+                return query.get("query")
+        return None
+
+    def hold_memory(self, release) -> None:
+        """Ties a memory reservation to this response; it is released when the response is collected"""
+        self._memory_holds.append(weakref.finalize(self, release))
+
+    def release_results(self) -> None:
+        """Drops result rows and returns their memory to the client's budget"""
+        self.results = None
+        for attachment in self.attachments:
+            attachment.results = None
+        for hold in self._memory_holds:
+            hold()
+        self._memory_holds.clear()
+
+    def to_bytes(self, compress: bool = True) -> bytes:
+        """Serializes to the compact binary format (see models.serialization)"""
+        from .serialization import dump_response
+        return dump_response(self, compress=compress)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "GenieResponse":
+        """Deserializes a response written by to_bytes()"""
+        from .serialization import load_response
+        return load_response(data)
+
     def finalize(self):
         """Finalizes response with end time and duration"""
         self.end_time = datetime.now()
@@ -0,0 +1,291 @@
+"""Compact binary serialization of GenieResponse.
+
+Layout (all integers big-endian)::
+
+    b"GNIE" | version: u8 | flags: u8 | header length: u32 | header | blocks
+
+The header is an uncompressed msgpack map with every response field except
+result rows, plus an index of result blocks. Each block holds the rows of one
+result set (the response's or an attachment's) as msgpack columns and is
+compressed with zstd when ``FLAG_ZSTD`` is set. A result set shared by the
+response and an attachment (``GenieClient`` sets ``response.results`` to the
+first query attachment's results) is written once; the attachment's header
+names the block it shares (version 2). Blocks are decoded independently, so
+``ResponseArchive`` can read metadata, or one attachment's rows, without
+touching the rest.
+
+Requires the optional ``msgpack`` dependency; compression also requires
+``zstandard``.
+"""
+import struct
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from ..exceptions.custom_errors import ConfigurationError, SerializationError
+from .response_models import Attachment, GenieResponse
+
+MAGIC = b"GNIE"
+FORMAT_VERSION = 2
+SUPPORTED_VERSIONS = {1, 2}
+FLAG_ZSTD = 0x01
+
+_PREFIX = struct.Struct(">4sBBI")
+
+# msgpack extension type codes for values JSON-like formats lose
+_EXT_DECIMAL = 1
+_EXT_DATE = 2
+_EXT_DATETIME = 3
+
+# Block owner of GenieResponse.results; attachments use their index
+RESPONSE_BLOCK = "response"
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError as e:
+        raise ConfigurationError(
+            "Binary serialization requires msgpack: pip install databricks-genie-client[binary]"
+        ) from e
+    return msgpack
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ConfigurationError(
+            "Compressed serialization requires zstandard: pip install databricks-genie-client[binary]"
+        ) from e
+    return zstandard
+
+
+def _encode_ext(value: Any):
+    msgpack = _msgpack()
+    if isinstance(value, Decimal):
+        return msgpack.ExtType(_EXT_DECIMAL, str(value).encode())
+    if isinstance(value, datetime):
+        return msgpack.ExtType(_EXT_DATETIME, value.isoformat().encode())
+    if isinstance(value, date):
+        return msgpack.ExtType(_EXT_DATE, value.isoformat().encode())
+    # Anything else (e.g. error contexts in metrics) is kept as text
+    return str(value)
+
+
+def _decode_ext(code: int, data: bytes) -> Any:
+    text = data.decode()
+    if code == _EXT_DECIMAL:
+        return Decimal(text)
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(text)
+    if code == _EXT_DATE:
+        return date.fromisoformat(text)
+    msgpack = _msgpack()
+    return msgpack.ExtType(code, data)
+
+
+def _pack(value: Any) -> bytes:
+    return _msgpack().packb(value, default=_encode_ext, use_bin_type=True, datetime=False)
+
+
+def _unpack(data: bytes) -> Any:
+    return _msgpack().unpackb(data, ext_hook=_decode_ext, raw=False, strict_map_key=False)
+
+
+def _split_results(results: Optional[Dict[str, Any]]):
+    """Separates row data from the rest of a results dict"""
+    if results is None:
+        return None, None
+    meta = {key: value for key, value in results.items() if key != "data"}
+    rows = results.get("data") or []
+    if not isinstance(rows, list):
+        rows = list(rows)  # e.g. SpilledRows
+    meta.pop("spill_path", None)
+    meta.pop("spilled", None)
+    return meta, rows
+
+
+def dump_response(response: GenieResponse, compress: bool = True, level: int = 1) -> bytes:
+    """
+    Serializes a response to the binary format
+
+    Args:
+        response: Response to serialize
+        compress: Compress result blocks with zstd
+        level: zstd compression level (1 is both faster and smaller than
+            higher levels on typical result sets)
+
+    Returns:
+        Serialized bytes
+    """
+    compressor = _zstd().ZstdCompressor(level=level) if compress else None
+    blocks: List[bytes] = []
+    index: List[Dict[str, Any]] = []
+
+    def add_block(owner: Union[str, int], rows: List[List[Any]]) -> None:
+        # Columns compress better than rows; msgpack packs the tuples as arrays
+        columns = list(zip(*rows))
+        payload = _pack({"rows": len(rows), "columns": columns})
+        if compressor is not None:
+            payload = compressor.compress(payload)
+        index.append({"owner": owner, "length": len(payload), "row_count": len(rows)})
+        blocks.append(payload)
+
+    # Result sets already written, by identity, with the block that holds them
+    written: List[tuple] = []
+    results_meta, rows = _split_results(response.results)
+    if rows is not None:
+        add_block(RESPONSE_BLOCK, rows)
+        written.append((response.results, RESPONSE_BLOCK))
+
+    attachments = []
+    for position, attachment in enumerate(response.attachments):
+        shared_block = next((owner for results, owner in written if results is attachment.results), None)
+        header_entry = {
+            "type": attachment.type,
+            "content": attachment.content,
+            "attachment_id": attachment.attachment_id,
+            "results": None,
+            "error_message": attachment.error_message,
+        }
+        if shared_block is not None:
+            header_entry["results_block"] = shared_block
+        else:
+            header_entry["results"], attachment_rows = _split_results(attachment.results)
+            if attachment_rows is not None:
+                add_block(position, attachment_rows)
+                written.append((attachment.results, position))
+        attachments.append(header_entry)
+
+    header = {
+        "success": response.success,
+        "space_id": response.space_id,
+        "conversation_id": response.conversation_id,
+        "message_id": response.message_id,
+        "status": response.status,
+        "attachments": attachments,
+        "results": results_meta,
+        "natural_language_answer": response.natural_language_answer,
+        "start_time": response.start_time,
+        "end_time": response.end_time,
+        "duration_ms": response.duration_ms,
+        "error_type": response.error_type,
+        "error_message": response.error_message,
+        "metrics": response.metrics,
+        "blocks": index,
+    }
+    header_bytes = _pack(header)
+    flags = FLAG_ZSTD if compressor is not None else 0
+    prefix = _PREFIX.pack(MAGIC, FORMAT_VERSION, flags, len(header_bytes))
+    return b"".join([prefix, header_bytes, *blocks])
+
+
+class ResponseArchive:
+    """
+    Lazily decoded serialized response
+
+    Only the header is decoded on open; result rows are decompressed and
+    decoded per block on first access.
+    """
+
+    def __init__(self, data: bytes):
+        if len(data) < _PREFIX.size:
+            raise SerializationError("Data is too short to be a serialized response")
+        magic, version, flags, header_length = _PREFIX.unpack_from(data)
+        if magic != MAGIC:
+            raise SerializationError("Not a serialized GenieResponse")
+        if version not in SUPPORTED_VERSIONS:
+            raise SerializationError(
+                f"Unsupported serialization version {version}",
+                context={"supported_versions": sorted(SUPPORTED_VERSIONS)}
+            )
+        self.version = version
+        self.compressed = bool(flags & FLAG_ZSTD)
+        self._data = memoryview(data)
+        start = _PREFIX.size
+        self.metadata: Dict[str, Any] = _unpack(self._data[start:start + header_length])
+        self._blocks: Dict[Union[str, int], tuple] = {}
+        offset = start + header_length
+        for block in self.metadata["blocks"]:
+            self._blocks[block["owner"]] = (offset, block["length"])
+            offset += block["length"]
+        self._decoded: Dict[Union[str, int], List[List[Any]]] = {}
+
+    def _owner(self, attachment: Optional[int]) -> Union[str, int]:
+        """Block owner holding the rows of the response results or of one attachment"""
+        if attachment is None:
+            return RESPONSE_BLOCK
+        return self.metadata["attachments"][attachment].get("results_block", attachment)
+
+    def _meta(self, owner: Union[str, int]) -> Optional[Dict[str, Any]]:
+        if owner == RESPONSE_BLOCK:
+            return self.metadata["results"]
+        return self.metadata["attachments"][owner]["results"]
+
+    @classmethod
+    def open(cls, source: Union[bytes, str, Path]) -> "ResponseArchive":
+        """Opens serialized bytes or a file containing them"""
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return cls(bytes(source))
+        return cls(Path(source).read_bytes())
+
+    def rows(self, attachment: Optional[int] = None) -> Optional[List[List[Any]]]:
+        """
+        Decodes the rows of the response results or of one attachment
+
+        Args:
+            attachment: Attachment index; None for ``GenieResponse.results``
+        """
+        owner = self._owner(attachment)
+        if owner not in self._blocks:
+            return None
+        if owner not in self._decoded:
+            offset, length = self._blocks[owner]
+            payload = self._data[offset:offset + length]
+            if self.compressed:
+                payload = _zstd().ZstdDecompressor().decompress(payload)
+            block = _unpack(payload)
+            columns = block["columns"]
+            if columns:
+                self._decoded[owner] = [list(row) for row in zip(*columns)]
+            else:
+                self._decoded[owner] = [[] for _ in range(block["rows"])]
+        return self._decoded[owner]
+
+    def results(self, attachment: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Results dict (with rows) of the response or of one attachment"""
+        meta = self._meta(self._owner(attachment))
+        if meta is None:
+            return None
+        return {"data": self.rows(attachment), **meta}
+
+    def load(self) -> GenieResponse:
+        """Builds the full GenieResponse without re-validating it; shared result sets stay shared"""
+        meta = self.metadata
+        loaded: Dict[Union[str, int], Optional[Dict[str, Any]]] = {RESPONSE_BLOCK: self.results()}
+        attachments = []
+        for position, raw in enumerate(meta["attachments"]):
+            owner = self._owner(position)
+            if owner not in loaded:
+                loaded[owner] = self.results(position)
+            attachments.append(Attachment.model_construct(
+                type=raw["type"],
+                content=raw["content"],
+                attachment_id=raw["attachment_id"],
+                results=loaded[owner],
+                error_message=raw.get("error_message"),
+            ))
+        fields = {key: value for key, value in meta.items() if key not in ("blocks", "attachments", "results")}
+        return GenieResponse.model_construct(attachments=attachments, results=loaded[RESPONSE_BLOCK], **fields)
+
+
+def load_response(data: bytes) -> GenieResponse:
+    """Deserializes bytes produced by dump_response"""
+    return ResponseArchive(data).load()
+
+
+def open_response(source: Union[bytes, str, Path]) -> ResponseArchive:
+    """Opens serialized bytes or a file lazily; only metadata is decoded"""
+    return ResponseArchive.open(source)
@@ -0,0 +1,177 @@
+"""Circuit breakers and admission control for API endpoints.
+
+A breaker tracks the outcome and latency of recent calls to one endpoint.
+When the failure or slow-call rate over the rolling window crosses its
+threshold it opens and calls fail fast with ``CircuitOpenError`` instead of
+going through ``retry_api_call``'s backoff. After ``open_seconds`` it lets a
+few trial calls through (half-open) and closes again if they succeed.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from ..exceptions.custom_errors import CircuitOpenError, LoadShedError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Rolling-window circuit breaker for a single endpoint"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        slow_call_ms: Optional[float] = None,
+        slow_call_rate_threshold: float = 0.8,
+        window_size: int = 20,
+        min_calls: int = 10,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 3
+    ):
+        """
+        Args:
+            name: Endpoint name, reported in errors and metrics
+            failure_rate_threshold: Failure ratio over the window that opens the breaker
+            slow_call_ms: Calls slower than this count as slow (None disables)
+            slow_call_rate_threshold: Slow-call ratio over the window that opens the breaker
+            window_size: Number of recent calls considered
+            min_calls: Calls required in the window before the breaker can open
+            open_seconds: Time the breaker stays open before allowing trial calls
+            half_open_max_calls: Successful trial calls needed to close again
+        """
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_ms = slow_call_ms
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self._window = deque(maxlen=window_size)
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        self._half_open_successes = 0
+        self.rejected_calls = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._half_open_in_flight = 0
+            self._half_open_successes = 0
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self.times_opened += 1
+
+    def before_call(self) -> None:
+        """Raises CircuitOpenError if the call must not be attempted"""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return
+            if self._state == HALF_OPEN and self._half_open_in_flight < self.half_open_max_calls:
+                self._half_open_in_flight += 1
+                return
+            self.rejected_calls += 1
+            retry_in = max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+        raise CircuitOpenError(
+            f"Circuit open for {self.name}",
+            context={"endpoint": self.name, "retry_in_seconds": round(retry_in, 1)}
+        )
+
+    def record(self, success: bool, duration_ms: float) -> None:
+        """Records the outcome of a call that passed before_call()"""
+        slow = self.slow_call_ms is not None and duration_ms > self.slow_call_ms
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+                if not success or slow:
+                    self._open()
+                    return
+                self._half_open_successes += 1
+                if self._half_open_successes >= self.half_open_max_calls:
+                    self._state = CLOSED
+                    self._window.clear()
+                return
+            if self._state == OPEN:
+                return
+
+            self._window.append((not success, slow))
+            calls = len(self._window)
+            if calls < self.min_calls:
+                return
+            failures = sum(1 for failed, _ in self._window if failed)
+            slow_calls = sum(1 for _, was_slow in self._window if was_slow)
+            if (failures / calls >= self.failure_rate_threshold
+                    or slow_calls / calls >= self.slow_call_rate_threshold):
+                self._open()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._maybe_half_open()
+            calls = len(self._window)
+            failures = sum(1 for failed, _ in self._window if failed)
+            return {
+                "state": self._state,
+                "window_calls": calls,
+                "failure_rate": failures / calls if calls else 0.0,
+                "rejected_calls": self.rejected_calls,
+                "times_opened": self.times_opened,
+            }
+
+
+class AdmissionController:
+    """Non-blocking cap on concurrent requests; excess load is shed immediately"""
+
+    def __init__(self, max_in_flight: int):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.max_in_flight = max_in_flight
+        self._semaphore = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.shed_count = 0
+
+    def acquire(self, endpoint: Optional[str] = None) -> None:
+        """Takes a slot or raises LoadShedError without waiting"""
+        if not self.try_acquire():
+            with self._lock:
+                self.shed_count += 1
+            raise LoadShedError(
+                "Too many requests in flight, request shed",
+                context={"endpoint": endpoint, "max_in_flight": self.max_in_flight}
+            )
+
+    def try_acquire(self) -> bool:
+        """Takes a slot if one is free; returns False instead of shedding"""
+        if not self._semaphore.acquire(blocking=False):
+            return False
+        with self._lock:
+            self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+        self._semaphore.release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "shed_count": self.shed_count,
+            }
@@ -4,10 +4,67 @@ class GenieEndpoints:
     SEND_MESSAGE = "/api/2.0/genie/spaces/{space_id}/conversations/{conversation_id}/messages"
     GET_MESSAGE = "/api/2.0/genie/spaces/{space_id}/conversations/{conversation_id}/messages/{message_id}"
     GET_QUERY_RESULT = "/api/2.0/genie/spaces/{space_id}/conversations/{conversation_id}/messages/{message_id}/query-result/{attachment_id}"
+    GET_SPACE = "/api/2.0/genie/spaces/{space_id}"
+
+class SQLWarehouseEndpoints:
+    """SQL warehouse API endpoint templates"""
+    GET_WAREHOUSE = "/api/2.0/sql/warehouses/{warehouse_id}"
+    START_WAREHOUSE = "/api/2.0/sql/warehouses/{warehouse_id}/start"
 
 class ModelServingEndpoints:
     MODEL_ENDPOINT_BASE = "/serving-endpoints/{endpoint_name}/invocations"
 
+class SQLStatementEndpoints:
+    """SQL statement execution API endpoint templates"""
+    EXECUTE = "/api/2.0/sql/statements"
+    GET_STATEMENT = "/api/2.0/sql/statements/{statement_id}"
+    GET_RESULT_CHUNK = "/api/2.0/sql/statements/{statement_id}/result/chunks/{chunk_index}"
+    CANCEL = "/api/2.0/sql/statements/{statement_id}/cancel"
+
+class BreakerEndpoints:
+    """Endpoint groups that each get their own circuit breaker"""
+    START_CONVERSATION = "start-conversation"
+    GET_MESSAGE = "get-message"
+    QUERY_RESULT = "query-result"
+    SERVING = "serving-endpoints"
+    SQL_STATEMENTS = "sql-statements"
+    ALL = (START_CONVERSATION, GET_MESSAGE, QUERY_RESULT, SERVING, SQL_STATEMENTS)
+
+class RequestKinds:
+    """Request kinds scheduled as separate flows by RequestScheduler"""
+    START = "start"
+    POLL = "poll"
+    CHUNK = "chunk"
+    NL = "nl"
+    OTHER = "other"
+    # Starting work and fetching results of finished work beat status polls
+    WEIGHTS = {START: 4.0, CHUNK: 2.0, NL: 2.0, POLL: 1.0, OTHER: 1.0}
+
+class PriorityClasses:
+    """Built-in priority classes and their default scheduling budgets"""
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+    DEFAULTS = {
+        INTERACTIVE: {"weight": 8.0, "reserved": 1},
+        BATCH: {"weight": 1.0},
+    }
+
+class FetchPolicies:
+    """How much of a completed message's query results ask_genie downloads"""
+    NONE = "none"  # SQL and text only
+    METADATA = "metadata"  # row count from query_result_metadata, no rows
+    FIRST_ROWS = "first_rows"  # first fetch_first_rows rows
+    FULL = "full"  # every chunk
+    LAZY = "lazy"  # every chunk, on first access of the results
+    ALL = (NONE, METADATA, FIRST_ROWS, FULL, LAZY)
+
+class RoutingStrategies:
+    """How a space group picks the space for a new question"""
+    LEAST_OUTSTANDING = "least_outstanding"  # fewest questions in flight
+    LOWEST_LATENCY = "lowest_latency"  # lowest EWMA latency x questions in flight
+    WEIGHTED = "weighted"  # random, proportional to weight
+    ALL = (LEAST_OUTSTANDING, LOWEST_LATENCY, WEIGHTED)
+
 class Status:
     """Status constants for Genie operations"""
     INITIATED = "INITIATED"
@@ -25,4 +82,7 @@ POLLABLE_STATUSES = {Status.INITIATED, Status.IN_PROGRESS, Status.EXECUTING_QUER
 MAX_RETRIES = 3
 RETRY_INTERVAL = 5  # seconds
 RATE_LIMIT_WAIT = 60  # seconds for 429 errors
-POLL_TIMEOUT = 600  # 10 minutes
\ No newline at end of file
+POLL_TIMEOUT = 600  # 10 minutes
+STATEMENT_PENDING_STATES = {"PENDING", "RUNNING"}
+WAREHOUSE_STOPPED_STATES = {"STOPPED"}  # Stopping and deleted warehouses cannot be started
+HEDGED_REQUEST_KINDS = {RequestKinds.POLL, RequestKinds.CHUNK}  # Idempotent GETs
\ No newline at end of file
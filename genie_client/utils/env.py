@@ -2,7 +2,6 @@
 import os
 from typing import Dict, Optional, Union, Any
 from pathlib import Path
-from dotenv import load_dotenv
 
 def load_env_vars(env_file: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
     """
@@ -15,6 +14,9 @@ def load_env_vars(env_file: Optional[Union[str, Path]] = None) -> Dict[str, Any]
     Returns:
         Dictionary of environment variables
     """
+    # python-dotenv is only needed here, so import it on first use
+    from dotenv import load_dotenv
+
     # Load environment variables from .env file
     if env_file:
         load_dotenv(env_file)
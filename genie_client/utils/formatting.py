@@ -1,50 +1,29 @@
-def format_results_to_markdown(columns: list, data: list, max_rows: int = 100) -> str:
+from typing import Optional, Sequence
+
+from .tables import render_table
+
+
+def format_results_to_markdown(columns: list, data: list, max_rows: Optional[int] = 100,
+                               column_types: Optional[Sequence[Optional[str]]] = None,
+                               max_chars: Optional[int] = None,
+                               max_tokens: Optional[int] = None,
+                               total_rows: Optional[int] = None) -> str:
     """
     Converts query results to a markdown table with smart formatting
-    
+
     Args:
         columns: List of column names
         data: List of rows (each row is a list of values)
         max_rows: Maximum rows to include in the output
-        
+        column_types: Manifest type names; inferred from the data if omitted
+        max_chars: Character budget for the table
+        max_tokens: Approximate token budget for the table
+        total_rows: Row count for the truncation note when data is partial
+
     Returns:
         Markdown-formatted table string
     """
-    if not columns or not data:
+    if not columns:
         return "No results found"
-    
-    # Truncate large datasets
-    truncated = False
-    if len(data) > max_rows:
-        data = data[:max_rows]
-        truncated = True
-    
-    # Create header
-    header = "| " + " | ".join(columns) + " |"
-    separator = "| " + " | ".join(["---"] * len(columns)) + " |"
-    
-    # Create rows
-    rows = []
-    for row in data:
-        # Format each cell
-        formatted_row = []
-        for value in row:
-            # Format numbers
-            if isinstance(value, (int, float)):
-                # Format large numbers with commas
-                if abs(value) >= 1000:
-                    try:
-                        value = f"{value:,.2f}" if isinstance(value, float) else f"{value:,}"
-                    except:
-                        pass
-            formatted_row.append(str(value))
-        rows.append("| " + " | ".join(formatted_row) + " |")
-    
-    # Build final table
-    table = "\n".join([header, separator] + rows)
-    
-    # Add truncation note
-    if truncated:
-        table += f"\n\n*Showing first {max_rows} of {len(data)} rows*"
-    
-    return table
\ No newline at end of file
+    return render_table(columns, data, column_types=column_types, max_chars=max_chars,
+                        max_tokens=max_tokens, max_rows=max_rows, total_rows=total_rows)
@@ -0,0 +1,195 @@
+"""Hedged requests for idempotent GETs.
+
+A hedged call is sent once; if it has not completed after the recent
+``percentile`` latency for its request kind, an identical second request is
+sent (the first still holds its pooled connection, so the hedge goes out on
+another one) and whichever response arrives first is returned. A running
+``requests`` call cannot be interrupted, so the losing request is cancelled
+if it has not started and otherwise left to finish in the background with
+its response discarded.
+
+Hedges are only sent once enough latencies have been observed to estimate
+the percentile, and never for more than ``max_hedge_rate`` of calls. With an
+admission controller each hedge also needs a free in-flight slot, held until
+both attempts have finished, so hedging never pushes traffic past the cap.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+if TYPE_CHECKING:
+    from .circuit_breaker import AdmissionController
+
+
+class LatencyTracker:
+    """Rolling window of call latencies with percentile lookup"""
+
+    def __init__(self, window_size: int = 200):
+        self._samples = deque(maxlen=window_size)
+        self._lock = threading.Lock()
+
+    def record(self, latency_ms: float) -> None:
+        with self._lock:
+            self._samples.append(latency_ms)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+        return ordered[index]
+
+
+class Hedger:
+    """Sends a backup request when the first one is slower than usual"""
+
+    def __init__(self, percentile: float = 95.0, min_delay_ms: float = 50.0,
+                 max_hedge_rate: float = 0.1, min_samples: int = 20,
+                 window_size: int = 200, max_workers: int = 16,
+                 executor: Optional[ThreadPoolExecutor] = None,
+                 admission: Optional["AdmissionController"] = None):
+        """
+        Args:
+            percentile: Latency percentile after which the hedge is sent
+            min_delay_ms: Lower bound on the hedge delay
+            max_hedge_rate: Largest share of calls that may be hedged
+            min_samples: Latencies observed per kind before hedging starts
+            window_size: Latencies kept per kind
+            max_workers: Threads running primary and hedge requests (ignored with executor)
+            executor: Shared executor (see GenieClientPool); not shut down by this hedger
+            admission: In-flight cap a hedge must find a free slot under
+        """
+        self.percentile = percentile
+        self.min_delay_ms = min_delay_ms
+        self.max_hedge_rate = max_hedge_rate
+        self.min_samples = min_samples
+        self.window_size = window_size
+        self._trackers: Dict[str, LatencyTracker] = {}
+        self.owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="genie-hedge")
+        self.admission = admission
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.hedges_denied = 0
+
+    def _tracker(self, kind: str) -> LatencyTracker:
+        with self._lock:
+            tracker = self._trackers.get(kind)
+            if tracker is None:
+                tracker = self._trackers[kind] = LatencyTracker(self.window_size)
+            return tracker
+
+    def delay_ms(self, kind: str) -> Optional[float]:
+        """Current hedge delay for a request kind, or None while still learning"""
+        tracker = self._tracker(kind)
+        if len(tracker) < self.min_samples:
+            return None
+        return max(self.min_delay_ms, tracker.percentile(self.percentile))
+
+    def _take_hedge(self) -> bool:
+        with self._lock:
+            if self.hedged + 1 > self.max_hedge_rate * self.calls:
+                return False
+            if self.admission is not None and not self.admission.try_acquire():
+                self.hedges_denied += 1
+                return False
+            self.hedged += 1
+            return True
+
+    def _release_when_done(self, primary, hedge) -> None:
+        """Frees the hedge's admission slot once neither attempt is still running"""
+        remaining = [2]
+
+        def finished(_future) -> None:
+            with self._lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                self.admission.release()
+
+        primary.add_done_callback(finished)
+        hedge.add_done_callback(finished)
+
+    def call(self, kind: str, send: Callable[[], Any]) -> Any:
+        """
+        Runs ``send`` and hedges it if it is slower than the kind's percentile
+
+        Args:
+            kind: Latency class, e.g. RequestKinds.POLL
+            send: Idempotent request function
+
+        Returns:
+            The result of whichever attempt succeeded first
+        """
+        tracker = self._tracker(kind)
+        delay = self.delay_ms(kind)
+        with self._lock:
+            self.calls += 1
+        start = time.perf_counter()
+        if delay is None:
+            result = send()
+            tracker.record((time.perf_counter() - start) * 1000)
+            return result
+
+        primary = self._executor.submit(send)
+        try:
+            result = primary.result(timeout=delay / 1000)
+            tracker.record((time.perf_counter() - start) * 1000)
+            return result
+        except FutureTimeoutError:
+            pass
+        if not self._take_hedge():
+            result = primary.result()
+            tracker.record((time.perf_counter() - start) * 1000)
+            return result
+
+        try:
+            hedge = self._executor.submit(send)
+        except BaseException:
+            if self.admission is not None:
+                self.admission.release()
+            raise
+        if self.admission is not None:
+            self._release_when_done(primary, hedge)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    tracker.record((time.perf_counter() - start) * 1000)
+                    if future is hedge:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    for loser in pending:
+                        loser.cancel()
+                    return future.result()
+        # Both attempts failed; report the original error
+        return primary.result()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            kinds = dict(self._trackers)
+            stats = {
+                "calls": self.calls,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "hedges_denied": self.hedges_denied,
+                "hedge_rate": self.hedged / self.calls if self.calls else 0.0,
+                "win_rate": self.hedge_wins / self.hedged if self.hedged else 0.0,
+            }
+        stats["delay_ms"] = {kind: self.delay_ms(kind) for kind in kinds}
+        return stats
+
+    def shutdown(self) -> None:
+        """Stops the worker threads without waiting for abandoned requests, unless shared"""
+        if self.owns_executor:
+            self._executor.shutdown(wait=False)
@@ -1,19 +1,55 @@
+import atexit
+import itertools
 import logging
 import json
+import queue
+import threading
 from logging import Logger, LogRecord
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
 
-def setup_logger(name: str, level=logging.INFO) -> Logger:
-    """Configures structured JSON logging"""
+LOGGER_NAME = "genie_client"
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+try:  # Optional fast JSON encoder
+    import orjson
+
+    def _encode_json(data: dict) -> str:
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+except ImportError:
+    _json_encoder = json.JSONEncoder(separators=(",", ":"), default=str)
+    _encode_json = _json_encoder.encode
+
+def setup_logger(name: str, level=logging.INFO, use_queue: bool = True,
+                 sample_rates: Optional[Dict[str, int]] = None) -> Logger:
+    """
+    Configures structured JSON logging
+
+    Args:
+        name: Logger name
+        level: Logging level
+        use_queue: Hand records to a background thread so the caller never
+            formats or writes them
+        sample_rates: Keep 1 in N records per ``extra={"event": ...}`` name
+    """
     logger = logging.getLogger(name)
     logger.setLevel(level)
-    
+
     # Avoid duplicate handlers
     if not logger.handlers:
         handler = logging.StreamHandler()
         formatter = StructuredFormatter()
         handler.setFormatter(formatter)
-        logger.addHandler(handler)
-    
+        if use_queue:
+            logger.addHandler(_start_queue_listener(handler))
+        else:
+            logger.addHandler(handler)
+
+    if sample_rates:
+        logger.addFilter(SamplingFilter(sample_rates))
+
     # Prevent propagation to root logger
     logger.propagate = False
     return logger
@@ -27,20 +63,121 @@ class StructuredFormatter(logging.Formatter):
             "level": record.levelname,
             "message": record.getMessage(),
         }
-        
+
         # Add exception info if present
         if record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
-        
+        elif record.exc_text:
+            log_data["exception"] = record.exc_text
+
         # Add custom context if available
-        if hasattr(record, "context"):
-            log_data.update(record.context)
-        
-        # Add NL generation metrics
-        if hasattr(record, 'nl_generated'):
-            log_data["nl_generated"] = record.nl_generated
-            
-        return json.dumps(log_data)
-
-# Configure package-level logger
-logger = setup_logger("genie_client")
\ No newline at end of file
+        context = record.__dict__.get("context")
+        if isinstance(context, dict):
+            log_data.update(context)
+
+        # Add remaining extras (metrics, nl_generated, event, ...)
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and key != "context":
+                log_data[key] = value
+
+        return _encode_json(log_data)
+
+class LazyQueueHandler(QueueHandler):
+    """
+    Queue handler that defers message formatting to the listener thread
+
+    The stock QueueHandler renders the message on the calling thread; here
+    only the traceback is rendered eagerly because it cannot outlive the
+    exception safely. Once the listener is stopped, records go straight to
+    ``fallback`` on the calling thread instead of into an unread queue.
+    """
+    def __init__(self, queue, fallback: Optional[logging.Handler] = None):
+        super().__init__(queue)
+        self.fallback = fallback
+        self.listening = True
+
+    def emit(self, record: LogRecord) -> None:
+        if not self.listening and self.fallback is not None:
+            self.fallback.handle(record)
+            return
+        super().emit(record)
+
+    def prepare(self, record: LogRecord) -> LogRecord:
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+class SamplingFilter(logging.Filter):
+    """Keeps 1 in N records for each sampled ``event`` name"""
+    def __init__(self, sample_rates: Dict[str, int]):
+        super().__init__()
+        self.sample_rates = {event: max(1, int(rate)) for event, rate in sample_rates.items()}
+        self._counters = {event: itertools.count() for event in self.sample_rates}
+
+    def filter(self, record: LogRecord) -> bool:
+        event = record.__dict__.get("event")
+        rate = self.sample_rates.get(event)
+        if rate is None or rate == 1:
+            return True
+        # itertools.count is atomic under the GIL
+        if next(self._counters[event]) % rate:
+            return False
+        record.sample_rate = rate
+        return True
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[LazyQueueHandler] = None
+
+def _start_queue_listener(handler: logging.Handler) -> QueueHandler:
+    global _listener, _queue_handler
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(flush_logging)
+    _queue_handler = LazyQueueHandler(log_queue, fallback=handler)
+    return _queue_handler
+
+def flush_logging() -> None:
+    """
+    Drains queued log records and stops the background listener
+
+    Records logged afterwards, e.g. by other atexit hooks, are written
+    directly by the handler.
+    """
+    global _listener
+    if _listener is not None:
+        # Switch first so records logged while draining are not queued behind the stop
+        if _queue_handler is not None:
+            _queue_handler.listening = False
+        _listener.stop()
+        _listener = None
+
+_configured = False
+_configure_lock = threading.Lock()
+
+def configure_logging(level=logging.INFO, use_queue: bool = True,
+                      sample_rates: Optional[Dict[str, int]] = None) -> Logger:
+    """
+    Attaches the structured handler to the package logger on first call
+
+    Handler setup is deferred until a client is created so importing the
+    package stays cheap. Call this before creating a client to change the
+    defaults; later calls are no-ops.
+
+    Args:
+        level: Logging level
+        use_queue: Log through a background queue listener (default)
+        sample_rates: Per-event 1-in-N sampling, e.g. {"poll": 10}
+    """
+    global _configured
+    if _configured:
+        return logger
+    with _configure_lock:
+        if not _configured:
+            setup_logger(LOGGER_NAME, level, use_queue=use_queue, sample_rates=sample_rates)
+            _configured = True
+    return logger
+
+# Package-level logger; handlers are attached by configure_logging()
+logger = logging.getLogger(LOGGER_NAME)
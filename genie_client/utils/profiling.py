@@ -0,0 +1,201 @@
+"""Opt-in per-call profiling of CPU time and allocations.
+
+A profiled call runs under ``cProfile`` and ``tracemalloc``. Internal phases
+(HTTP round trips, JSON decode, attachment rebuilding while polling, row
+list extension, markdown formatting, prompt building) are wrapped in
+``phase(name)``, which records their wall time, thread CPU time and net
+allocated memory. The summary lists the phases, the functions with the most
+self time and the source lines that allocated the most memory.
+
+``phase`` is a no-op unless a profiled call is running, so the hooks cost a
+global read when profiling is off, and cProfile, pstats and tracemalloc
+are only imported by the first profiled call. cProfile only sees the calling thread;
+phases also run on attachment worker threads, but not on hedged requests.
+tracemalloc traces the whole process, so allocations made by concurrent
+unprofiled calls are included.
+"""
+import contextvars
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional
+
+_NO_PHASE = nullcontext()
+_current: contextvars.ContextVar[Optional["CallProfile"]] = contextvars.ContextVar(
+    "genie_call_profile", default=None
+)
+_lock = threading.Lock()
+_active = 0  # Profiled calls in progress
+_started_tracing = False  # Whether tracemalloc was started here and must be stopped
+
+
+def phase(name: str):
+    """Context manager timing one internal phase of the profiled call, if any"""
+    if not _active:
+        return _NO_PHASE
+    profile = _current.get()
+    if profile is None:
+        return _NO_PHASE
+    return _Phase(profile, name)
+
+
+class _Phase:
+    __slots__ = ("profile", "name", "wall", "cpu", "memory")
+
+    def __init__(self, profile: "CallProfile", name: str):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self) -> None:
+        import tracemalloc
+        self.memory = tracemalloc.get_traced_memory()[0]
+        self.cpu = time.thread_time()
+        self.wall = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        import tracemalloc
+        wall = time.perf_counter() - self.wall
+        cpu = time.thread_time() - self.cpu
+        memory = tracemalloc.get_traced_memory()[0] - self.memory
+        self.profile.record(self.name, wall, cpu, memory)
+
+
+class CallProfile:
+    """Profiles one call: cProfile on the calling thread, tracemalloc and phase timings"""
+
+    def __init__(self, top: int = 10):
+        """
+        Args:
+            top: Functions and allocation sites listed in the summary
+        """
+        self.top = top
+        self.phases: Dict[str, List[float]] = {}
+        self.profiler = None
+        self.cpu_profiled = False
+        self._phase_lock = threading.Lock()
+        self._token = None
+        self._start_snapshot = None
+        self.end_snapshot = None
+        self.wall_ms = 0.0
+        self.cpu_ms = 0.0
+
+    def __enter__(self) -> "CallProfile":
+        global _active, _started_tracing
+        import cProfile
+        import tracemalloc
+        self.profiler = cProfile.Profile()
+        with _lock:
+            if _active == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _started_tracing = True
+            _active += 1
+        self._start_snapshot = tracemalloc.take_snapshot().filter_traces(self._filters())
+        self._token = _current.set(self)
+        self._cpu = time.thread_time()
+        self._wall = time.perf_counter()
+        try:
+            self.profiler.enable()
+            self.cpu_profiled = True
+        except ValueError:  # Another profiler is active on this thread (Python 3.12+)
+            pass
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        global _active, _started_tracing
+        import tracemalloc
+        if self.cpu_profiled:
+            self.profiler.disable()
+        self.wall_ms = (time.perf_counter() - self._wall) * 1000
+        self.cpu_ms = (time.thread_time() - self._cpu) * 1000
+        _current.reset(self._token)
+        self.end_snapshot = tracemalloc.take_snapshot().filter_traces(self._filters())
+        with _lock:
+            _active -= 1
+            if _active == 0 and _started_tracing:
+                tracemalloc.stop()
+                _started_tracing = False
+
+    @staticmethod
+    def _filters() -> list:
+        """Frames of the profiler itself, left out of allocation statistics"""
+        import pstats
+        import tracemalloc
+        return [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, pstats.__file__),
+        ]
+
+    def record(self, name: str, wall: float, cpu: float, memory: int) -> None:
+        with self._phase_lock:
+            stats = self.phases.setdefault(name, [0, 0.0, 0.0, 0])
+            stats[0] += 1
+            stats[1] += wall
+            stats[2] += cpu
+            stats[3] += memory
+
+    def top_functions(self) -> List[Dict[str, Any]]:
+        """Functions with the most self time on the calling thread"""
+        if not self.cpu_profiled:
+            return []
+        import pstats
+        stats = pstats.Stats(self.profiler).stats
+        ranked = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:self.top]
+        return [
+            {
+                "function": name if filename == "~" else f"{os.path.basename(filename)}:{line}({name})",
+                "calls": calls,
+                "self_ms": round(self_time * 1000, 2),
+                "cumulative_ms": round(cumulative * 1000, 2),
+            }
+            for (filename, line, name), (_, calls, self_time, cumulative, _) in ranked
+        ]
+
+    def top_allocations(self) -> List[Dict[str, Any]]:
+        """Source lines whose allocations grew the most during the call"""
+        diffs = self.end_snapshot.compare_to(self._start_snapshot, "lineno")
+        return [
+            {
+                "line": f"{os.path.basename(diff.traceback[0].filename)}:{diff.traceback[0].lineno}",
+                "size_kb": round(diff.size_diff / 1024, 1),
+                "count": diff.count_diff,
+            }
+            for diff in diffs[:self.top]
+            if diff.size_diff > 0
+        ]
+
+    def summary(self) -> Dict[str, Any]:
+        """Compact, JSON-serializable profile for response.metrics"""
+        with self._phase_lock:
+            phases = {
+                name: {
+                    "calls": calls,
+                    "wall_ms": round(wall * 1000, 2),
+                    "cpu_ms": round(cpu * 1000, 2),
+                    "allocated_kb": round(memory / 1024, 1),
+                }
+                for name, (calls, wall, cpu, memory) in self.phases.items()
+            }
+        return {
+            "wall_ms": round(self.wall_ms, 2),
+            "cpu_ms": round(self.cpu_ms, 2),
+            "phases": phases,
+            "top_functions": self.top_functions(),
+            "top_allocations": self.top_allocations(),
+        }
+
+    def dump(self, directory: str, name: str) -> Dict[str, str]:
+        """
+        Writes the full profiles, readable with pstats and tracemalloc.Snapshot.load
+
+        Returns:
+            Paths of the written ``.prof`` and ``.tracemalloc`` files
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = {"allocations": os.path.join(directory, f"{name}.tracemalloc")}
+        self.end_snapshot.dump(paths["allocations"])
+        if self.cpu_profiled:
+            paths["cpu"] = os.path.join(directory, f"{name}.prof")
+            self.profiler.dump_stats(paths["cpu"])
+        return paths
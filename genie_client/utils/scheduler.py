@@ -0,0 +1,252 @@
+"""Priority-aware scheduling of API requests.
+
+Requests are tagged with a priority class (``interactive``, ``batch``, ...)
+and a request kind (start, poll, chunk, nl). Each (class, kind) pair is a
+flow; waiting requests are granted slots in weighted-fair-queuing order, so
+a flow with weight 8 gets eight grants for every one of a weight-1 flow while
+both are backlogged. Each class can reserve slots other classes may not take,
+cap its own concurrency and be rate limited with a token bucket.
+
+The current priority is carried in a context variable so it applies to every
+request made while answering one question without threading a parameter
+through each API method.
+"""
+import contextvars
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+from ..exceptions.custom_errors import InvalidInputError
+from .constants import PriorityClasses, RequestKinds
+
+_current_priority: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "genie_priority", default=None
+)
+_current_wait: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar(
+    "genie_queue_wait", default=None
+)
+
+
+@contextmanager
+def request_priority(priority: str) -> Iterator[Dict[str, float]]:
+    """
+    Runs API requests made in the block under a priority class
+
+    Yields:
+        Dict accumulating ``queue_wait_ms`` and ``queued_requests`` for the block
+    """
+    wait = {"queue_wait_ms": 0.0, "queued_requests": 0}
+    priority_token = _current_priority.set(priority)
+    wait_token = _current_wait.set(wait)
+    try:
+        yield wait
+    finally:
+        _current_priority.reset(priority_token)
+        _current_wait.reset(wait_token)
+
+
+def current_priority() -> Optional[str]:
+    return _current_priority.get()
+
+
+@dataclass
+class PriorityClass:
+    """Scheduling budget of one priority class"""
+    weight: float = 1.0
+    reserved: int = 0
+    max_concurrency: Optional[int] = None
+    rate_per_second: Optional[float] = None
+    burst: Optional[float] = None
+
+    def __post_init__(self):
+        self._tokens = self.burst or self.rate_per_second or 0.0
+        self._refilled_at = time.monotonic()
+        self.in_flight = 0
+        self.granted = 0
+        self.total_wait_ms = 0.0
+
+    def take_token(self, now: float) -> float:
+        """Consumes a rate token; returns seconds until one is available if none is"""
+        if not self.rate_per_second:
+            return 0.0
+        capacity = self.burst or self.rate_per_second
+        self._tokens = min(capacity, self._tokens + (now - self._refilled_at) * self.rate_per_second)
+        self._refilled_at = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate_per_second
+
+
+class _Ticket:
+    __slots__ = ("priority", "kind", "finish_tag", "seq", "granted")
+
+    def __init__(self, priority: str, kind: str, finish_tag: float, seq: int):
+        self.priority = priority
+        self.kind = kind
+        self.finish_tag = finish_tag
+        self.seq = seq
+        self.granted = False
+
+
+class RequestScheduler:
+    """Weighted fair queue in front of the HTTP session with per-class budgets"""
+
+    def __init__(self, max_concurrency: int = 8,
+                 classes: Optional[Dict[str, Dict[str, Any]]] = None,
+                 kind_weights: Optional[Dict[str, float]] = None,
+                 default_priority: str = PriorityClasses.INTERACTIVE):
+        """
+        Args:
+            max_concurrency: Requests in flight across all classes
+            classes: PriorityClass settings per class name (defaults to
+                PriorityClasses.DEFAULTS, whose reservations are dropped when
+                max_concurrency is too small to honour them)
+            kind_weights: Relative weight per request kind (defaults to RequestKinds.WEIGHTS)
+            default_priority: Class used outside a request_priority() block
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if classes is None:
+            classes = PriorityClasses.DEFAULTS
+            if max_concurrency <= sum(c.get("reserved", 0) for c in classes.values()):
+                classes = {
+                    name: {k: v for k, v in settings.items() if k != "reserved"}
+                    for name, settings in classes.items()
+                }
+        self.classes = {name: PriorityClass(**settings) for name, settings in classes.items()}
+        if default_priority not in self.classes:
+            raise InvalidInputError(f"Unknown priority class: {default_priority}")
+        shared = max_concurrency - sum(c.reserved for c in self.classes.values())
+        if shared < 0 or (shared == 0 and any(c.reserved == 0 for c in self.classes.values())):
+            raise ValueError("Reserved slots leave no capacity for classes without a reservation")
+        self.max_concurrency = max_concurrency
+        self.kind_weights = dict(RequestKinds.WEIGHTS, **(kind_weights or {}))
+        self.default_priority = default_priority
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._waiting: List[_Ticket] = []
+        self._flow_finish: Dict[tuple, float] = {}
+        self._virtual_time = 0.0
+        self._seq = itertools.count()
+        self.in_flight = 0
+
+    def _resolve(self, priority: Optional[str]) -> str:
+        priority = priority or current_priority() or self.default_priority
+        if priority not in self.classes:
+            raise InvalidInputError(
+                f"Unknown priority class: {priority}",
+                context={"priority_classes": sorted(self.classes)}
+            )
+        return priority
+
+    def acquire(self, kind: str = RequestKinds.OTHER, priority: Optional[str] = None) -> str:
+        """
+        Blocks until the request may be sent
+
+        Args:
+            kind: Request kind from RequestKinds
+            priority: Priority class (defaults to the current request_priority())
+
+        Returns:
+            The priority class the slot was granted to; pass it to release()
+        """
+        priority = self._resolve(priority)
+        weight = self.classes[priority].weight * self.kind_weights.get(kind, 1.0)
+        start = time.monotonic()
+        with self._lock:
+            flow = (priority, kind)
+            finish_tag = max(self._virtual_time, self._flow_finish.get(flow, 0.0)) + 1.0 / weight
+            self._flow_finish[flow] = finish_tag
+            ticket = _Ticket(priority, kind, finish_tag, next(self._seq))
+            self._waiting.append(ticket)
+            try:
+                while True:
+                    retry_in = self._dispatch()
+                    if ticket.granted:
+                        break
+                    self._changed.wait(retry_in)
+            except BaseException:
+                if ticket.granted:
+                    self.in_flight -= 1
+                    self.classes[priority].in_flight -= 1
+                else:
+                    self._waiting.remove(ticket)
+                self._dispatch()
+                raise
+
+        waited_ms = (time.monotonic() - start) * 1000
+        budget = self.classes[priority]
+        with self._lock:
+            budget.total_wait_ms += waited_ms
+        wait = _current_wait.get()
+        if wait is not None:
+            wait["queue_wait_ms"] += waited_ms
+            wait["queued_requests"] += 1
+        return priority
+
+    def release(self, priority: str) -> None:
+        """Returns the slot taken by acquire()"""
+        with self._lock:
+            self.in_flight -= 1
+            self.classes[priority].in_flight -= 1
+            self._dispatch()
+
+    def _can_start(self, name: str, budget: PriorityClass) -> bool:
+        if self.in_flight >= self.max_concurrency:
+            return False
+        if budget.max_concurrency is not None and budget.in_flight >= budget.max_concurrency:
+            return False
+        if budget.in_flight < budget.reserved:
+            return True
+        held_for_others = sum(
+            max(0, other.reserved - other.in_flight)
+            for other_name, other in self.classes.items() if other_name != name
+        )
+        return self.max_concurrency - self.in_flight > held_for_others
+
+    def _dispatch(self) -> Optional[float]:
+        """Grants slots to waiting tickets; returns seconds until a rate token frees up"""
+        retry_in = None
+        granted = False
+        now = time.monotonic()
+        for ticket in sorted(self._waiting, key=lambda t: (t.finish_tag, t.seq)):
+            if self.in_flight >= self.max_concurrency:
+                break
+            budget = self.classes[ticket.priority]
+            if not self._can_start(ticket.priority, budget):
+                continue
+            token_wait = budget.take_token(now)
+            if token_wait:
+                retry_in = token_wait if retry_in is None else min(retry_in, token_wait)
+                continue
+            ticket.granted = True
+            granted = True
+            self._waiting.remove(ticket)
+            self._virtual_time = max(self._virtual_time, ticket.finish_tag)
+            self.in_flight += 1
+            budget.in_flight += 1
+            budget.granted += 1
+        if granted:
+            self._changed.notify_all()
+        return retry_in
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "max_concurrency": self.max_concurrency,
+                "waiting": len(self._waiting),
+                "classes": {
+                    name: {
+                        "in_flight": c.in_flight,
+                        "waiting": sum(1 for t in self._waiting if t.priority == name),
+                        "granted": c.granted,
+                        "avg_wait_ms": c.total_wait_ms / c.granted if c.granted else 0.0,
+                    }
+                    for name, c in self.classes.items()
+                },
+            }
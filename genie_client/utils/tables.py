@@ -0,0 +1,305 @@
+"""Column-wise markdown table rendering for query results.
+
+Cells are formatted a whole column at a time using the manifest
+``type_name`` (or a type inferred from a sample when none is given), so
+numbers that Genie sends as strings still get thousands separators and
+right alignment. Output is capped by characters or approximate tokens rather
+than rows, and ``TableRenderer.feed`` renders chunk by chunk as results
+arrive.
+"""
+from decimal import Decimal, InvalidOperation
+from typing import Any, Iterable, List, Optional, Sequence
+
+from .types import FLOAT_TYPES, INTEGER_TYPES, infer_column_type
+
+# Rough size of an LLM token in English and tabular text
+CHARS_PER_TOKEN = 4
+
+NULL_TEXT = "NULL"
+_ROWS_PER_BATCH = 1000
+
+
+def _format_integer(value: Any) -> str:
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return str(value)
+    return f"{number:,}"
+
+
+def _format_float(value: Any) -> str:
+    text = value if isinstance(value, str) else str(value)
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return text
+    return f"{number:,.2f}" if abs(number) >= 1000 else text
+
+
+def _format_decimal(value: Any) -> str:
+    text = value if isinstance(value, str) else str(value)
+    try:
+        number = Decimal(value)
+    except (TypeError, ValueError, InvalidOperation):
+        return text
+    return f"{number:,.2f}" if abs(number) >= 1000 else text
+
+
+def _integer_column(values: Sequence[Any]) -> List[str]:
+    # Strings of up to three characters never need a separator
+    return [
+        NULL_TEXT if v is None else v if type(v) is str and len(v) < 4 else f"{int(v):,}"
+        for v in values
+    ]
+
+
+def _float_column(values: Sequence[Any]) -> List[str]:
+    return [
+        NULL_TEXT if v is None else f"{x:,.2f}" if abs(x := float(v)) >= 1000
+        else v if type(v) is str else str(v)
+        for v in values
+    ]
+
+
+def _format_large_decimal(value: Any) -> str:
+    # Plain strings with at most two decimals (e.g. DECIMAL(p, 2)) need no
+    # rounding, so only the integer part is parsed
+    if type(value) is str:
+        whole, _, fraction = value.partition(".")
+        if len(fraction) <= 2 and whole.lstrip("-").isdigit():
+            return f"{int(whole):,}.{fraction:0<2}"
+    return _format_decimal(value)
+
+
+def _decimal_column(values: Sequence[Any]) -> List[str]:
+    # float() is only used to find large values; those are formatted exactly
+    return [
+        NULL_TEXT if v is None else _format_large_decimal(v) if abs(float(v)) >= 1000
+        else v if type(v) is str else str(v)
+        for v in values
+    ]
+
+
+def _text_column(values: Sequence[Any]) -> List[str]:
+    return [NULL_TEXT if v is None else v if type(v) is str else str(v) for v in values]
+
+
+# (whole-column formatter, per-cell fallback for columns with malformed values)
+_COLUMN_FORMATTERS = {
+    **{t: (_integer_column, _format_integer) for t in INTEGER_TYPES},
+    **{t: (_float_column, _format_float) for t in FLOAT_TYPES},
+    "DECIMAL": (_decimal_column, _format_decimal),
+}
+
+
+def _is_numeric(type_name: Optional[str]) -> bool:
+    return (type_name or "").upper() in _COLUMN_FORMATTERS
+
+
+def format_column(values: Sequence[Any], type_name: Optional[str]) -> List[str]:
+    """
+    Formats every cell of a column as table text
+
+    Numbers of 1,000 or more get thousands separators (floats and decimals
+    two decimal places), None becomes NULL and pipes and line breaks are
+    escaped so they cannot break the table. Cells that do not parse as the
+    column type are kept as they are.
+    """
+    formatters = _COLUMN_FORMATTERS.get((type_name or "").upper())
+    if formatters is None:
+        cells = _text_column(values)
+    else:
+        column_formatter, cell_formatter = formatters
+        try:
+            cells = column_formatter(values)
+        except (ValueError, TypeError, InvalidOperation):
+            cells = [NULL_TEXT if v is None else cell_formatter(v) for v in values]
+    # One scan of the joined column is far cheaper than a check per cell
+    joined = "".join(cells)
+    if "|" in joined or "\n" in joined or "\r" in joined:
+        cells = [
+            c.replace("|", "\\|").replace("\r\n", " ").replace("\n", " ").replace("\r", " ")
+            for c in cells
+        ]
+    return cells
+
+
+def _truncate(cells: List[str], width: int) -> List[str]:
+    return [c if len(c) <= width else c[:width - 1] + "…" for c in cells]
+
+
+class TableRenderer:
+    """
+    Renders a markdown table incrementally within a size budget
+
+    Column widths are fixed by the first batch of rows; later rows wider
+    than that stay valid markdown but are no longer aligned.
+    """
+
+    def __init__(self, columns: Sequence[str], column_types: Optional[Sequence[Optional[str]]] = None,
+                 max_chars: Optional[int] = None, max_tokens: Optional[int] = None,
+                 max_cell_width: Optional[int] = None, total_rows: Optional[int] = None):
+        """
+        Args:
+            columns: Column names
+            column_types: Manifest type names (inferred from the first rows if omitted)
+            max_chars: Character budget for the table, note excluded
+            max_tokens: Token budget, converted at CHARS_PER_TOKEN characters per token
+            max_cell_width: Longer cells are cut to this width
+            total_rows: Total row count used in the truncation note, if known
+        """
+        if max_tokens is not None:
+            token_chars = max_tokens * CHARS_PER_TOKEN
+            max_chars = token_chars if max_chars is None else min(max_chars, token_chars)
+        self.columns = [str(c) for c in columns]
+        self.column_types = list(column_types) if column_types else None
+        self.max_chars = max_chars
+        self.max_cell_width = max_cell_width
+        self.total_rows = total_rows
+        self.rows_rendered = 0
+        self.rows_seen = 0
+        self.chars = 0
+        self.truncated = False
+        self._widths: Optional[List[int]] = None
+        self._numeric: List[bool] = []
+
+    @property
+    def full(self) -> bool:
+        """True once the budget is used up; further rows are only counted"""
+        return self.truncated
+
+    def max_rows(self) -> Optional[int]:
+        """Upper bound on the rows that can fit in the budget"""
+        if self.max_chars is None:
+            return None
+        # Every row takes at least "| " + " | " per column + " |" and a newline
+        return max(0, self.max_chars // (3 * max(1, len(self.columns)) + 2))
+
+    def _start(self, rows: List[List[Any]]) -> None:
+        if self.column_types is None:
+            self.column_types = [
+                infer_column_type(values) for values in zip(*rows[:100])
+            ] if rows else ["STRING"] * len(self.columns)
+        self._numeric = [_is_numeric(t) for t in self.column_types]
+        self._widths = [max(3, len(name)) for name in self.columns]
+
+    def _line(self, cells: Iterable[str]) -> str:
+        return "| " + " | ".join(cells) + " |"
+
+    def feed(self, rows: List[List[Any]]) -> str:
+        """
+        Renders the next batch of rows
+
+        Returns:
+            Markdown for this batch (the header is included in the first),
+            or "" once the budget is used up
+        """
+        self.rows_seen += len(rows)
+        if self.truncated:
+            return ""
+        first = self._widths is None
+        if first:
+            self._start(rows)
+        if self.max_chars is not None:
+            rows = rows[:self.max_rows() + 1]
+
+        if rows:
+            columns = [
+                format_column(values, type_name)
+                for values, type_name in zip(zip(*rows), self.column_types)
+            ]
+            if self.max_cell_width:
+                columns = [_truncate(cells, self.max_cell_width) for cells in columns]
+        else:
+            columns = [[] for _ in self.columns]
+
+        lines: List[str] = []
+        if first:
+            self._widths = [
+                max([width] + [len(c) for c in cells]) for width, cells in zip(self._widths, columns)
+            ]
+            lines.append(self._line(name.ljust(w) for name, w in zip(self.columns, self._widths)))
+            lines.append(self._line(
+                "-" * (w - 1) + ":" if numeric else "-" * w
+                for w, numeric in zip(self._widths, self._numeric)
+            ))
+        # One str.format call per row pads and joins every cell
+        line_format = "| " + " | ".join(
+            f"{{:{'>' if numeric else '<'}{width}}}" for width, numeric in zip(self._widths, self._numeric)
+        ) + " |"
+        lines.extend(map(line_format.format, *columns))
+
+        out: List[str] = []
+        rendered_rows = 0
+        for position, line in enumerate(lines):
+            if self.max_chars is not None and self.chars + len(line) + 1 > self.max_chars:
+                self.truncated = True
+                break
+            out.append(line)
+            self.chars += len(line) + 1
+            if not first or position >= 2:
+                rendered_rows += 1
+        self.rows_rendered += rendered_rows
+        return "".join(line + "\n" for line in out)
+
+    def finish(self) -> str:
+        """Returns the truncation note if rows were left out, else an empty string"""
+        if self.total_rows is None:
+            if not self.truncated:
+                return ""
+            return f"\n*Showing first {self.rows_rendered} rows; output truncated*"
+        if self.rows_rendered >= self.total_rows:
+            return ""
+        return f"\n*Showing first {self.rows_rendered} of {self.total_rows} rows*"
+
+
+def render_table(columns: Sequence[str], rows: Iterable[List[Any]],
+                 column_types: Optional[Sequence[Optional[str]]] = None,
+                 max_chars: Optional[int] = None, max_tokens: Optional[int] = None,
+                 max_rows: Optional[int] = None, max_cell_width: Optional[int] = None,
+                 total_rows: Optional[int] = None) -> str:
+    """
+    Renders rows as an aligned markdown table
+
+    Rows are consumed lazily, so an iterator (e.g. spilled results) is only
+    read as far as the budget allows.
+
+    Args:
+        columns: Column names
+        rows: Rows of values
+        column_types: Manifest type names (inferred if omitted)
+        max_chars: Character budget
+        max_tokens: Approximate token budget
+        max_rows: Row cap, applied in addition to the size budget
+        max_cell_width: Longer cells are cut to this width
+        total_rows: Total row count for the truncation note (len(rows) if known)
+
+    Returns:
+        Markdown table, or "No results found" when there are no rows
+    """
+    if total_rows is None and hasattr(rows, "__len__"):
+        total_rows = len(rows)
+    renderer = TableRenderer(columns, column_types, max_chars=max_chars, max_tokens=max_tokens,
+                             max_cell_width=max_cell_width, total_rows=total_rows)
+    limit = max_rows
+    bound = renderer.max_rows()
+    if bound is not None:
+        limit = bound + 1 if limit is None else min(limit, bound + 1)
+
+    parts: List[str] = []
+    iterator = iter(rows)
+    taken = 0
+    while not renderer.full and (limit is None or taken < limit):
+        size = _ROWS_PER_BATCH if limit is None else min(_ROWS_PER_BATCH, limit - taken)
+        batch = [row for _, row in zip(range(size), iterator)]
+        if not batch:
+            break
+        taken += len(batch)
+        parts.append(renderer.feed(batch))
+    if not renderer.rows_seen:
+        return "No results found"
+    if renderer.total_rows is None and not renderer.full and next(iterator, None) is not None:
+        # Stopped by max_rows with rows left over
+        renderer.truncated = True
+    parts.append(renderer.finish())
+    return "".join(parts).rstrip("\n")
@@ -0,0 +1,123 @@
+"""Conversion helpers for Databricks SQL result values.
+
+Genie and the SQL statement API return every cell in ``data_array`` as a
+string (or ``None``). These helpers turn whole columns into Python values
+using the ``type_name`` reported in the result manifest schema.
+"""
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+INTEGER_TYPES = {"BYTE", "SHORT", "INT", "LONG"}
+FLOAT_TYPES = {"FLOAT", "DOUBLE"}
+NUMERIC_TYPES = INTEGER_TYPES | FLOAT_TYPES | {"DECIMAL"}
+
+
+def _to_bool(value: str) -> bool:
+    return value.lower() == "true"
+
+
+def _to_date(value: str) -> date:
+    return date.fromisoformat(value)
+
+
+def _to_timestamp(value: str) -> datetime:
+    # Databricks emits a trailing "Z" which fromisoformat only accepts from 3.11
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    return datetime.fromisoformat(value)
+
+
+def _to_decimal(value: str) -> Decimal:
+    return Decimal(value)
+
+
+CONVERTERS: Dict[str, Callable[[str], Any]] = {
+    "BYTE": int,
+    "SHORT": int,
+    "INT": int,
+    "LONG": int,
+    "FLOAT": float,
+    "DOUBLE": float,
+    "DECIMAL": _to_decimal,
+    "BOOLEAN": _to_bool,
+    "DATE": _to_date,
+    "TIMESTAMP": _to_timestamp,
+}
+
+
+def to_raw_string(value: Any) -> Any:
+    """Turns a typed cell back into the string Databricks returns for it"""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def extract_column_types(manifest: dict) -> List[Optional[str]]:
+    """Returns the ``type_name`` of every column in a result manifest"""
+    columns = manifest.get("schema", {}).get("columns", [])
+    return [col.get("type_name") for col in columns]
+
+
+def infer_column_type(values: Sequence[Any], sample_size: int = 100) -> str:
+    """
+    Infers a Databricks type name for a column without manifest types
+
+    Args:
+        values: Column values as returned in ``data_array``
+        sample_size: Number of non-null values to inspect
+
+    Returns:
+        "LONG", "DOUBLE" or "STRING"
+    """
+    inferred = "LONG"
+    seen = 0
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            return "STRING"
+        if isinstance(value, int):
+            pass
+        elif isinstance(value, float):
+            inferred = "DOUBLE"
+        else:
+            text = str(value)
+            try:
+                int(text)
+            except ValueError:
+                try:
+                    float(text)
+                    inferred = "DOUBLE"
+                except ValueError:
+                    return "STRING"
+        seen += 1
+        if seen >= sample_size:
+            break
+    return inferred if seen else "STRING"
+
+
+def convert_column(values: Sequence[Any], type_name: Optional[str]) -> List[Any]:
+    """
+    Converts a whole column of raw values to Python values
+
+    Values that cannot be converted, including ones that are already typed,
+    are kept as-is so a single malformed cell never fails the whole column.
+    """
+    converter = CONVERTERS.get((type_name or "").upper())
+    if converter is None:
+        return list(values)
+    try:
+        return [None if v is None else converter(v) for v in values]
+    except (ValueError, TypeError, AttributeError, InvalidOperation):
+        converted = []
+        for v in values:
+            try:
+                converted.append(None if v is None else converter(v))
+            except (ValueError, TypeError, AttributeError, InvalidOperation):
+                converted.append(v)
+        return converted
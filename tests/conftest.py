@@ -0,0 +1,38 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from genie_client.config import PATGenieClientConfig
+from genie_client.core.client import GenieClient
+
+CLIENT_CONFIG = {
+    "personal_access_token": "test",
+    "databricks_url": "https://test.databricks.com",
+    "workspace_id": "test",
+    "default_space_id": "space1",
+    "poll_interval": 0,
+}
+
+
+@pytest.fixture
+def make_client():
+    """
+    Factory for test clients backed by a MagicMock api_client
+
+    Keyword arguments override CLIENT_CONFIG; ``mock_api=False`` keeps the
+    real GenieAPIClient for tests that patch its transport. Test modules
+    override this fixture to add their own API replies. Clients are closed
+    when the test ends.
+    """
+    clients = []
+
+    def make(mock_api: bool = True, **overrides) -> GenieClient:
+        client = GenieClient(PATGenieClientConfig(**{**CLIENT_CONFIG, **overrides}))
+        if mock_api:
+            client.api_client = MagicMock()
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
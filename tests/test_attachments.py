@@ -0,0 +1,73 @@
+import json
+import time
+
+import pytest
+
+from genie_client.models.response_models import GenieResponse
+from genie_client.utils.constants import Status
+
+
+def statement(column, value):
+    return {"statement_response": {
+        "status": {"state": "SUCCEEDED"},
+        "manifest": {"schema": {"columns": [{"name": column, "type_name": "LONG"}]},
+                     "total_chunk_count": 1, "total_row_count": 1},
+        "result": {"chunk_index": 0, "data_array": [[value]]},
+    }}
+
+
+@pytest.fixture
+def make_client(make_client):
+    def make(**overrides):
+        client = make_client(**overrides)
+        api = client.api_client
+        api.start_conversation.return_value = {"conversation": {"id": "c"},
+                                               "message": {"id": "m", "status": Status.SUBMITTED}}
+        api.get_message.return_value = {"status": Status.COMPLETED, "attachments": [
+            {"attachment_id": "a1", "query": {"query": "SELECT count(*) AS orders FROM o"}},
+            {"attachment_id": "t1", "text": {"content": "Two queries"}},
+            {"attachment_id": "a2", "query": {"query": "SELECT sum(x) AS revenue FROM o"}},
+        ]}
+        results = {"a1": statement("orders", "10"), "a2": statement("revenue", "99")}
+
+        def get_query_result(space_id, conversation_id, message_id, attachment_id, chunk_index=None):
+            time.sleep(0.2)
+            return results[attachment_id]
+
+        api.get_query_result.side_effect = get_query_result
+        return client
+    return make
+
+
+def test_query_attachments_are_fetched_concurrently_and_kept_separately(make_client):
+    client = make_client()
+    start = time.monotonic()
+    response = client.ask_genie("Orders and revenue?")
+    assert time.monotonic() - start < 0.35
+    first, second = response.query_attachments
+    assert first.results["data"] == [["10"]]
+    assert second.results["data"] == [["99"]]
+    assert response.results is first.results
+    assert response.metrics["query_attachment_count"] == 2
+    assert response.metrics["result_row_count"] == 2
+
+
+def test_single_nl_call_summarizes_all_queries(make_client):
+    client = make_client(enable_natural_language=True, model_endpoint_name="llm")
+    client.api_client.generate_natural_language.return_value = "10 orders, 99 revenue"
+    response = client.ask_genie("Orders and revenue?")
+    assert response.natural_language_answer == "10 orders, 99 revenue"
+    client.api_client.generate_natural_language.assert_called_once()
+    prompt = client.api_client.generate_natural_language.call_args[0][1]["messages"][1]["content"]
+    assert "**Query 1:**" in prompt and "| revenue |" in prompt
+
+
+def test_shared_results_are_serialized_once(make_client):
+    response = make_client().ask_genie("Orders and revenue?")
+    dumped = response.model_dump_json()
+    assert dumped.count('"orders"') == 1
+    assert json.loads(dumped)["attachments"][0]["results"] == {"$ref": "#/results"}
+    loaded = GenieResponse.model_validate_json(dumped)
+    first, second = loaded.query_attachments
+    assert loaded.results is first.results and first.results["data"] == [["10"]]
+    assert second.results["data"] == [["99"]]
@@ -0,0 +1,103 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from genie_client.core.api_client import GenieAPIClient
+from genie_client.exceptions.custom_errors import (
+    APIRequestError, CircuitOpenError, LoadShedError
+)
+from genie_client.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, AdmissionController, CircuitBreaker
+from genie_client.utils.constants import BreakerEndpoints, Status
+
+
+def test_breaker_opens_on_failure_rate_and_recovers():
+    breaker = CircuitBreaker("test", window_size=4, min_calls=4, open_seconds=0.05, half_open_max_calls=1)
+    for success in (True, False, True, False):
+        breaker.before_call()
+        breaker.record(success, 1)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    with patch("genie_client.utils.circuit_breaker.time.monotonic", return_value=breaker._opened_at + 1):
+        assert breaker.state == HALF_OPEN
+        breaker.before_call()
+        breaker.record(True, 1)
+        assert breaker.state == CLOSED
+
+
+def test_slow_calls_open_breaker():
+    breaker = CircuitBreaker("test", slow_call_ms=100, window_size=3, min_calls=3)
+    for _ in range(3):
+        breaker.record(True, 500)
+    assert breaker.state == OPEN
+
+
+def test_admission_sheds_without_blocking():
+    admission = AdmissionController(1)
+    admission.acquire()
+    with pytest.raises(LoadShedError):
+        admission.acquire("get-message")
+    admission.release()
+    admission.acquire()
+    assert admission.snapshot() == {"in_flight": 1, "max_in_flight": 1, "shed_count": 1}
+
+
+@pytest.fixture
+def api():
+    settings = {"window_size": 2, "min_calls": 2, "open_seconds": 60}
+    return GenieAPIClient("https://test.databricks.com", MagicMock(), breaker_settings=settings)
+
+
+def test_server_errors_open_only_their_endpoint(api):
+    error = APIRequestError("Bad request", status_code=400, response_body="")
+    with patch.object(api, "_send", side_effect=error):
+        for _ in range(2):
+            with pytest.raises(APIRequestError):
+                api.get_message("s", "c", "m")
+    assert api.breakers[BreakerEndpoints.GET_MESSAGE].state == CLOSED
+
+    error = APIRequestError("Unavailable", status_code=503, response_body="")
+    with patch.object(api, "_send", side_effect=error) as send, patch("genie_client.utils.retry.time.sleep"):
+        # One 503 in the two-call window hits the 50% threshold; the retry is rejected
+        with pytest.raises(CircuitOpenError):
+            api.get_message("s", "c", "m")
+    assert send.call_count == 1
+    assert api.breakers[BreakerEndpoints.GET_MESSAGE].state == OPEN
+
+    with patch.object(api, "_send", return_value={"ok": True}) as send:
+        with pytest.raises(CircuitOpenError):
+            api.get_message("s", "c", "m")
+        send.assert_not_called()
+        assert api.get_query_result("s", "c", "m", "a") == {"ok": True}
+    metrics = api.resilience_metrics()
+    assert metrics["circuit_breakers"][BreakerEndpoints.GET_MESSAGE]["rejected_calls"] == 2
+
+
+def test_in_flight_limit_sheds_new_asks_but_not_admitted_ones(make_client):
+    client = make_client(mock_api=False, max_in_flight_requests=1)
+    api = client.api_client
+    entered, release = threading.Event(), threading.Event()
+    statuses = iter([Status.EXECUTING_QUERY, Status.EXECUTING_QUERY, Status.COMPLETED])
+
+    def get_message(*args):
+        entered.set()
+        release.wait(5)
+        return {"status": next(statuses), "attachments": [{"attachment_id": "a", "text": {"content": "Hi"}}]}
+
+    api.start_conversation = MagicMock(return_value={"conversation": {"id": "c"},
+                                                     "message": {"id": "m", "status": Status.SUBMITTED}})
+    api.get_message = MagicMock(side_effect=get_message)
+    first = []
+    worker = threading.Thread(target=lambda: first.append(client.ask_genie("Hello?")))
+    worker.start()
+    entered.wait(5)
+    shed = client.ask_genie("Hello again?")
+    release.set()
+    worker.join()
+
+    assert not shed.success and shed.error_type == "LoadShedError"
+    assert first[0].success and api.get_message.call_count == 3
+    api.start_conversation.assert_called_once()
+    assert api.resilience_metrics()["admission"] == {"in_flight": 0, "max_in_flight": 1, "shed_count": 1}
@@ -0,0 +1,80 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from genie_client.core.conversation import ConversationStore, FileConversationStore, GenieConversation
+from genie_client.exceptions.custom_errors import InvalidInputError
+from genie_client.models.response_models import Attachment, GenieResponse
+from genie_client.utils.constants import Status
+
+
+def make_response(message_id, conversation_id="conv1", sql="SELECT 1"):
+    return GenieResponse(
+        start_time=datetime.now(),
+        status=Status.COMPLETED,
+        success=True,
+        space_id="space1",
+        conversation_id=conversation_id,
+        message_id=message_id,
+        attachments=[Attachment(type="query", content={"query": {"query": sql}})],
+        results={"data": [["amex", "6"], ["visa", "24"]], "columns": ["paymentMethod", "totalPrice"],
+                 "row_count": 2, "chunk_count": 1}
+    )
+
+
+@pytest.fixture
+def client():
+    client = MagicMock()
+    client.config.default_space_id = "space1"
+    client.ask_genie.side_effect = [make_response("msg1"), make_response("msg2"), make_response("msg3")]
+    return client
+
+
+def test_threads_follow_up_and_indexes_history(client):
+    conversation = GenieConversation(client, max_history=2)
+    conversation.ask("Revenue in May 2024?")
+    conversation.ask("Only visa")
+
+    first_call, second_call = client.ask_genie.call_args_list
+    assert first_call.kwargs["follow_up"] is False
+    assert second_call.kwargs == {"space_id": "space1", "follow_up": True, "conversation_id": "conv1"}
+    assert conversation["msg1"].sql == "SELECT 1"
+
+    conversation.ask("And mastercard?")
+    assert [turn.message_id for turn in conversation.history] == ["msg2", "msg3"]
+    assert "msg1" not in conversation
+
+
+def test_persists_and_resumes(client, tmp_path):
+    store = FileConversationStore(tmp_path)
+    conversation = GenieConversation(client, store=store)
+    conversation.ask("Revenue in May 2024?")
+
+    resumed = GenieConversation.resume(client, "conv1", store)
+    assert resumed.space_id == "space1"
+    assert resumed.last_response.results["row_count"] == 2
+    resumed.ask("Only visa")
+    assert client.ask_genie.call_args.kwargs["conversation_id"] == "conv1"
+
+    with pytest.raises(InvalidInputError):
+        GenieConversation.resume(client, "unknown", store)
+
+
+def test_answers_follow_ups_locally(client):
+    conversation = GenieConversation(client, answer_locally=True)
+    conversation.ask("Revenue in May 2024?")
+    response = conversation.ask("Show the top 1 by totalPrice")
+    assert response.metrics["answered_locally"] is True
+    assert response.results["data"] == [["visa", 24]]
+    assert client.ask_genie.call_count == 1
+    assert conversation.last_turn.answered_locally
+
+
+def test_store_must_implement_every_method():
+    class LoadOnlyStore(ConversationStore):
+        def load(self, conversation_id):
+            return None
+
+    with pytest.raises(TypeError):
+        LoadOnlyStore()
@@ -0,0 +1,122 @@
+import csv
+import json
+
+import pytest
+
+from genie_client.core.export import ResultWriter, export_stream
+from genie_client.core.results import ResultStream
+from genie_client.exceptions.custom_errors import InvalidInputError
+
+SCHEMA = [
+    {"name": "product", "type_name": "STRING"},
+    {"name": "quantity", "type_name": "INT"},
+    {"name": "totalPrice", "type_name": "DECIMAL", "type_precision": 10, "type_scale": 2},
+    {"name": "dateTime", "type_name": "TIMESTAMP"},
+]
+CHUNKS = [
+    [["Biscotti", "2", "6.00", "2024-05-14T12:17:01.495Z"]],
+    [["Ginger", "8", "24.50", "2024-05-10T23:10:10.239Z"], ["Pretzel", None, "3.00", None]],
+    [["Scone", "1", "2.25", "2024-05-01T00:00:00Z"]],
+]
+
+
+@pytest.fixture
+def stream():
+    fetched = []
+
+    def fetch_chunk(chunk_index):
+        fetched.append(chunk_index)
+        return {"chunk_index": chunk_index, "data_array": CHUNKS[chunk_index]}
+
+    stream = ResultStream({
+        "status": {"state": "SUCCEEDED"},
+        "manifest": {"schema": {"columns": SCHEMA}, "total_chunk_count": 3, "total_row_count": 4},
+        "result": {"chunk_index": 0, "data_array": CHUNKS[0]},
+    }, fetch_chunk)
+    stream.fetched = fetched
+    return stream
+
+
+def test_csv_export_streams_all_chunks(stream, tmp_path):
+    summary = export_stream(stream, tmp_path / "out.csv", max_workers=2)
+    with open(tmp_path / "out.csv", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == [col["name"] for col in SCHEMA]
+    assert [row[0] for row in rows[1:]] == ["Biscotti", "Ginger", "Pretzel", "Scone"]
+    assert summary["row_count"] == 4
+    assert sorted(stream.fetched) == [1, 2]
+
+
+def test_ndjson_export_types_numbers(stream, tmp_path):
+    export_stream(stream, tmp_path / "out.jsonl")
+    records = [json.loads(line) for line in open(tmp_path / "out.jsonl")]
+    assert records[1] == {"product": "Ginger", "quantity": 8, "totalPrice": "24.50",
+                          "dateTime": "2024-05-10T23:10:10.239Z"}
+    assert records[2]["quantity"] is None
+
+
+def test_parquet_export_uses_manifest_types(stream, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    export_stream(stream, tmp_path / "out.parquet")
+    parquet_file = pq.ParquetFile(tmp_path / "out.parquet")
+    assert parquet_file.metadata.num_row_groups == 3
+    table = parquet_file.read()
+    assert str(table.schema.field("quantity").type) == "int32"
+    assert str(table.schema.field("totalPrice").type) == "decimal128(10, 2)"
+    assert table.column("quantity").to_pylist() == [2, 8, None, 1]
+
+
+def test_unknown_format_rejected(stream, tmp_path):
+    with pytest.raises(InvalidInputError):
+        export_stream(stream, tmp_path / "out.xlsx")
+
+
+def test_writer_must_implement_every_method(tmp_path):
+    class EncodeOnlyWriter(ResultWriter):
+        def encode(self, rows):
+            return rows
+
+    with pytest.raises(TypeError):
+        EncodeOnlyWriter(tmp_path / "out", SCHEMA)
+
+
+def test_ndjson_writes_nan_and_infinity_as_null(tmp_path):
+    stream = ResultStream({
+        "status": {"state": "SUCCEEDED"},
+        "manifest": {"schema": {"columns": [{"name": "ratio", "type_name": "DOUBLE"}]},
+                     "total_chunk_count": 1, "total_row_count": 3},
+        "result": {"chunk_index": 0, "data_array": [["NaN"], ["Infinity"], ["0.5"]]},
+    }, lambda chunk_index: None)
+    export_stream(stream, tmp_path / "out.ndjson")
+    lines = open(tmp_path / "out.ndjson").read().splitlines()
+    assert [json.loads(line, parse_constant=pytest.fail)["ratio"] for line in lines] == [None, None, 0.5]
+
+
+def test_failed_export_removes_the_partial_file(stream, tmp_path):
+    def fetch_chunk(chunk_index):
+        raise OSError("connection reset")
+
+    stream._fetch_chunk = fetch_chunk
+    with pytest.raises(OSError):
+        export_stream(stream, tmp_path / "out.csv")
+    assert not (tmp_path / "out.csv").exists()
+
+
+def test_responses_without_attachments_export_their_results(make_client, tmp_path):
+    client = make_client()
+    client.api_client.execute_statement.return_value = {
+        "statement_id": "st", "status": {"state": "SUCCEEDED"},
+        "manifest": {"schema": {"columns": SCHEMA[:2]}, "total_chunk_count": 1, "total_row_count": 2},
+        "result": {"chunk_index": 0, "data_array": [["Biscotti", "2"], ["Ginger", None]]},
+    }
+    response = client.execute_sql("SELECT product, quantity FROM sales", warehouse_id="wh")
+    summary = client.export_results(response, tmp_path / "out.ndjson")
+    assert summary["row_count"] == 2
+    records = [json.loads(line) for line in open(tmp_path / "out.ndjson")]
+    assert records == [{"product": "Biscotti", "quantity": 2}, {"product": "Ginger", "quantity": None}]
+
+    typed = make_client(typed_results=True)
+    typed.api_client.execute_statement.return_value = client.api_client.execute_statement.return_value
+    typed.export_results(typed.execute_sql("SELECT 1", warehouse_id="wh"), tmp_path / "typed.csv")
+    with open(tmp_path / "typed.csv", newline="") as f:
+        assert list(csv.reader(f)) == [["product", "quantity"], ["Biscotti", "2"], ["Ginger", ""]]
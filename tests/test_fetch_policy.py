@@ -0,0 +1,89 @@
+import pytest
+
+from genie_client.models.response_models import LazyResults
+from genie_client.utils.constants import FetchPolicies, Status
+
+CHUNKS = {i: [[str(i * 10 + j)] for j in range(10)] for i in range(3)}
+
+
+def query_result(chunk_index=None):
+    if chunk_index:
+        return {"statement_response": {"result": {"chunk_index": chunk_index, "data_array": CHUNKS[chunk_index]}}}
+    return {"statement_response": {
+        "status": {"state": "SUCCEEDED"},
+        "manifest": {"schema": {"columns": [{"name": "id", "type_name": "LONG"}]},
+                     "total_chunk_count": 3, "total_row_count": 30},
+        "result": {"chunk_index": 0, "data_array": CHUNKS[0]},
+    }}
+
+
+@pytest.fixture
+def make_client(make_client):
+    def make(**overrides):
+        client = make_client(**overrides)
+        api = client.api_client
+        api.start_conversation.return_value = {"conversation": {"id": "c"},
+                                               "message": {"id": "m", "status": Status.SUBMITTED}}
+        api.get_message.return_value = {"status": Status.COMPLETED, "attachments": [
+            {"attachment_id": "a1", "query": {"query": "SELECT id FROM t",
+                                              "query_result_metadata": {"row_count": 30}}},
+        ]}
+        api.get_query_result.side_effect = lambda *args, chunk_index=None: query_result(chunk_index)
+        return client
+    return make
+
+
+@pytest.mark.parametrize("policy", [FetchPolicies.NONE, FetchPolicies.METADATA])
+def test_sql_only_policies_skip_result_download(make_client, policy):
+    client = make_client()
+    response = client.ask_genie("Ids?", fetch_policy=policy)
+    assert response.success and response.sql == "SELECT id FROM t"
+    client.api_client.get_query_result.assert_not_called()
+    if policy == FetchPolicies.NONE:
+        assert response.results is None
+    else:
+        assert response.results == {"data": [], "row_count": 30, "complete": False}
+        assert response.metrics["result_row_count"] == 30
+
+
+def test_first_rows_stops_after_enough_chunks(make_client):
+    client = make_client(fetch_first_rows=15)
+    response = client.ask_genie("Ids?", fetch_policy=FetchPolicies.FIRST_ROWS)
+    assert [row[0] for row in response.results["data"]] == [str(i) for i in range(15)]
+    assert response.results["row_count"] == 30 and response.results["complete"] is False
+    assert client.api_client.get_query_result.call_count == 2
+
+
+def test_lazy_results_fetch_on_first_access(make_client):
+    client = make_client(fetch_policy=FetchPolicies.LAZY)
+    response = client.ask_genie("Ids?")
+    assert isinstance(response.results, LazyResults) and not response.results.loaded
+    assert response.metrics["result_row_count"] == 30
+    client.api_client.get_query_result.assert_not_called()
+
+    assert len(response.results["data"]) == 30
+    assert client.api_client.get_query_result.call_count == 3
+    response.results.get("row_count")
+    assert client.api_client.get_query_result.call_count == 3
+
+
+def test_saving_a_conversation_does_not_fetch_lazy_results(make_client):
+    client = make_client(fetch_policy=FetchPolicies.LAZY)
+    conversation = client.conversation()
+    response = conversation.ask("Ids?")
+    state = conversation.to_state()
+    client.api_client.get_query_result.assert_not_called()
+    saved = state["turns"][0]["response"]
+    assert "results" not in saved and "results" not in saved["attachments"][0]
+    assert len(response.results["data"]) == 30
+
+
+def test_lazy_results_are_fetched_when_dumped(make_client):
+    client = make_client()
+    response = client.ask_genie("Ids?", fetch_policy=FetchPolicies.LAZY)
+    assert len(response.model_dump()["results"]["data"]) == 30
+
+
+def test_unknown_policy_fails_the_response(make_client):
+    response = make_client().ask_genie("Ids?", fetch_policy="some")
+    assert not response.success and response.error_type == "InvalidInputError"
@@ -0,0 +1,113 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from genie_client.core.api_client import GenieAPIClient
+from genie_client.exceptions.custom_errors import APIRequestError
+from genie_client.utils.circuit_breaker import AdmissionController
+from genie_client.utils.constants import RequestKinds
+from genie_client.utils.hedging import Hedger, LatencyTracker
+
+
+def trained(**kwargs):
+    hedger = Hedger(min_samples=5, min_delay_ms=10, max_hedge_rate=1.0, **kwargs)
+    for _ in range(5):
+        hedger.call(RequestKinds.POLL, lambda: None)
+    return hedger
+
+
+def test_percentile():
+    tracker = LatencyTracker()
+    for latency in range(1, 101):
+        tracker.record(latency)
+    assert tracker.percentile(95) == 96
+
+
+def test_no_hedging_until_latencies_are_known():
+    hedger = Hedger(min_samples=5)
+    assert hedger.delay_ms(RequestKinds.POLL) is None
+    hedger.call(RequestKinds.POLL, lambda: "ok")
+    assert hedger.snapshot()["hedged"] == 0
+
+
+def test_slow_primary_is_hedged_and_hedge_wins():
+    hedger = trained()
+    attempts = []
+
+    def send():
+        attempts.append(1)
+        if len(attempts) == 1:
+            time.sleep(0.5)
+            return "slow"
+        return "fast"
+
+    start = time.monotonic()
+    assert hedger.call(RequestKinds.POLL, send) == "fast"
+    assert time.monotonic() - start < 0.3
+    stats = hedger.snapshot()
+    assert (stats["hedged"], stats["hedge_wins"]) == (1, 1)
+    hedger.shutdown()
+
+
+def test_hedge_needs_a_free_slot_and_holds_it_until_the_loser_finishes():
+    admission = AdmissionController(2)
+    hedger = trained(admission=admission)
+    admission.acquire()  # the operation's own slot
+    loser_done = threading.Event()
+    attempts = []
+
+    def send():
+        attempts.append(1)
+        if len(attempts) == 1:
+            time.sleep(0.3)
+            loser_done.set()
+            return "slow"
+        return "fast"
+
+    assert hedger.call(RequestKinds.POLL, send) == "fast"
+    assert admission.snapshot()["in_flight"] == 2
+    loser_done.wait(5)
+    time.sleep(0.05)
+    assert admission.snapshot()["in_flight"] == 1
+
+    slow = lambda: time.sleep(0.05) or "slow"
+    admission.acquire()  # no slot left for a hedge
+    assert hedger.call(RequestKinds.POLL, slow) == "slow"
+    stats = hedger.snapshot()
+    assert (stats["hedged"], stats["hedges_denied"]) == (1, 1)
+    assert admission.snapshot()["shed_count"] == 0
+    hedger.shutdown()
+
+
+def test_hedge_rate_is_capped():
+    hedger = Hedger(percentile=50, min_samples=5, min_delay_ms=1, max_hedge_rate=0.1)
+    for _ in range(20):
+        hedger.call(RequestKinds.POLL, lambda: None)
+    slow = lambda: time.sleep(0.02) or "done"
+    for _ in range(10):
+        hedger.call(RequestKinds.POLL, slow)
+    assert hedger.snapshot()["hedged"] == 3
+
+
+def test_error_is_raised_when_both_attempts_fail():
+    hedger = trained()
+
+    def send():
+        time.sleep(0.05)
+        raise APIRequestError("Unavailable", status_code=503, response_body="")
+
+    with pytest.raises(APIRequestError):
+        hedger.call(RequestKinds.POLL, send)
+
+
+def test_only_idempotent_gets_are_hedged():
+    hedger = MagicMock()
+    api = GenieAPIClient("https://test.databricks.com", MagicMock(), hedger=hedger)
+    with patch.object(api, "_send", return_value={}):
+        api.start_conversation("s", "q")
+        hedger.call.assert_not_called()
+        api.get_message("s", "c", "m")
+        hedger.call.assert_called_once()
+        assert hedger.call.call_args[0][0] == RequestKinds.POLL
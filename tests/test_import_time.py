@@ -0,0 +1,65 @@
+"""Import-time regression checks, measured with ``python -X importtime``.
+
+Set GENIE_IMPORT_BUDGET_SCALE to loosen budgets on slow CI machines and
+GENIE_IMPORT_BUDGET_MS to change the budget for the package's own share of the
+client import (dependencies such as pydantic and requests are not counted).
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BUDGET_SCALE = float(os.getenv("GENIE_IMPORT_BUDGET_SCALE", "1.0"))
+CLIENT_BUDGET_MS = float(os.getenv("GENIE_IMPORT_BUDGET_MS", "150"))
+OPT_IN_MODULES = (
+    "genie_client.core.similarity", "genie_client.core.space_groups", "genie_client.core.sql_cache",
+    "genie_client.core.warmup", "genie_client.core.memory", "genie_client.core.refresh",
+    "genie_client.utils.hedging", "genie_client.utils.scheduler",
+)
+
+
+def import_profile(statement: str, self_time: bool = False) -> dict:
+    """Runs ``statement`` in a fresh interpreter and returns cumulative (or self) µs per module"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(own if self_time else cumulative)
+    return modules
+
+
+def test_package_import_is_lazy():
+    modules = import_profile("import genie_client")
+    for heavy in ("requests", "pydantic", "dotenv", "genie_client.core.client"):
+        assert heavy not in modules, f"{heavy} imported eagerly"
+    assert modules["genie_client"] < 20_000 * BUDGET_SCALE
+
+
+def test_client_import_skips_optional_pieces():
+    modules = import_profile("from genie_client import GenieClient")
+    for optional in ("dotenv", "genie_client.utils.formatting", "genie_client.utils.prompts",
+                     "genie_client.utils.env", "genie_client.core.conversation"):
+        assert optional not in modules, f"{optional} imported eagerly"
+
+
+def test_client_import_skips_opt_in_features():
+    modules = import_profile("import genie_client.core.client")
+    for optional in OPT_IN_MODULES + ("cProfile", "pstats", "tracemalloc"):
+        assert optional not in modules, f"{optional} imported eagerly"
+
+
+def test_client_import_budget():
+    modules = import_profile("import genie_client.core.client", self_time=True)
+    own_us = sum(us for name, us in modules.items() if name.split(".")[0] == "genie_client")
+    assert own_us < CLIENT_BUDGET_MS * 1000 * BUDGET_SCALE
@@ -0,0 +1,119 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from genie_client.core.local_query import LocalQueryRouter, LocalResultSet, plan_follow_up
+from genie_client.exceptions.custom_errors import InvalidInputError
+from genie_client.models.response_models import GenieResponse
+from genie_client.utils.constants import Status
+
+COLUMNS = ["transactionID", "product", "quantity", "totalPrice", "paymentMethod"]
+ROWS = [
+    ["1", "Biscotti", "2", "6", "amex"],
+    ["2", "Ginger", "8", "24", "visa"],
+    ["3", "Biscotti", "4", "12", "visa"],
+    ["4", "Pretzel", "1", "3", "mastercard"],
+]
+
+
+@pytest.fixture
+def previous():
+    return GenieResponse(
+        start_time=datetime.now(),
+        status=Status.COMPLETED,
+        success=True,
+        space_id="space1",
+        conversation_id="conv1",
+        results={"data": ROWS, "columns": COLUMNS, "row_count": 4, "chunk_count": 1}
+    )
+
+
+def test_result_set_infers_numeric_types():
+    result_set = LocalResultSet.from_results({"data": ROWS, "columns": COLUMNS})
+    assert result_set.data["quantity"] == [2, 8, 4, 1]
+    assert result_set.is_numeric("totalPrice")
+    assert not result_set.is_numeric("paymentMethod")
+
+
+def test_filter_group_and_top_n():
+    result_set = LocalResultSet.from_results({"data": ROWS, "columns": COLUMNS})
+    grouped = result_set.filter("quantity", ">", "1").group_by(
+        ["payment method"], [("count", None), ("sum", "totalPrice")]
+    )
+    assert grouped.to_results()["data"] == [["amex", 1, 6], ["visa", 2, 36]]
+    top = result_set.top_n("totalPrice", 2)
+    assert top.data["transactionID"] == [2, 3]
+
+
+def test_unknown_column_raises():
+    result_set = LocalResultSet.from_results({"data": ROWS, "columns": COLUMNS})
+    with pytest.raises(InvalidInputError):
+        result_set.filter("region", "=", "EU")
+
+
+def test_plan_follow_up():
+    result_set = LocalResultSet.from_results({"data": ROWS, "columns": COLUMNS})
+    plan = plan_follow_up("Now break that down by paymentMethod", result_set)
+    assert plan.group_by == ["paymentMethod"]
+    plan = plan_follow_up("Show the top 2 products by totalPrice", result_set)
+    assert (plan.order_by, plan.limit) == ("totalPrice", 2)
+    assert plan.group_by == ["product"] and plan.aggregations == [("sum", "totalPrice")]
+    assert plan.execute(result_set).to_results()["data"] == [["Ginger", 24], ["Biscotti", 18]]
+    assert plan_follow_up("top 2 rows by totalPrice", result_set).group_by == []
+    assert plan_follow_up("What about last year?", result_set) is None
+
+
+def test_plan_needs_every_group_key_and_ranked_noun():
+    result_set = LocalResultSet.from_results({"data": ROWS, "columns": COLUMNS})
+    assert plan_follow_up("top 5 franchises by totalPrice", result_set) is None
+    plan = plan_follow_up("break it down by product and paymentMethod", result_set)
+    assert plan.group_by == ["product", "paymentMethod"]
+    assert plan_follow_up("break it down by product and region", result_set) is None
+
+
+def test_chained_filters_are_all_applied():
+    result_set = LocalResultSet.from_results({"data": ROWS, "columns": COLUMNS})
+    plan = plan_follow_up("only quantity > 1 and paymentMethod is visa", result_set)
+    assert plan.filters == [("quantity", ">", "1"), ("paymentMethod", "=", "visa")]
+    assert plan.execute(result_set).data["transactionID"] == [2, 3]
+    plan = plan_follow_up("only quantity > 1 and where product is Biscotti", result_set)
+    assert len(plan.filters) == 2
+
+
+@pytest.mark.parametrize("question", [
+    "only paymentMethod is visa or amex",
+    "only quantity > 1 and region is EU",
+    "only quantity > 1 and last year too",
+])
+def test_unconsumed_filter_clauses_fall_back(question):
+    assert plan_follow_up(question, LocalResultSet.schema_of({"data": ROWS, "columns": COLUMNS})) is None
+
+
+def test_router_converts_rows_only_for_answerable_questions(previous, monkeypatch):
+    converted = []
+    from_results = LocalResultSet.from_results.__func__
+    monkeypatch.setattr(LocalResultSet, "from_results",
+                        classmethod(lambda cls, *args: converted.append(1) or from_results(cls, *args)))
+    router = LocalQueryRouter(MagicMock())
+    assert router.try_local("Compare with April 2024", previous) is None
+    assert not converted
+    assert router.try_local("only quantity > 1 and paymentMethod is visa", previous).results["row_count"] == 2
+    assert converted == [1]
+
+
+def test_router_answers_locally(previous):
+    client = MagicMock()
+    response = LocalQueryRouter(client).ask("total totalPrice by paymentMethod", previous)
+    assert response.metrics["answered_locally"] is True
+    assert response.conversation_id == "conv1"
+    assert ["visa", 36] in response.results["data"]
+    client.ask_genie.assert_not_called()
+
+
+def test_router_falls_back_to_genie(previous):
+    client = MagicMock()
+    LocalQueryRouter(client).ask("Compare with April 2024", previous)
+    client.ask_genie.assert_called_once_with(
+        "Compare with April 2024", space_id="space1", follow_up=True, conversation_id="conv1"
+    )
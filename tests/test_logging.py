@@ -0,0 +1,56 @@
+import json
+import logging
+import queue
+
+from genie_client.utils import logging as genie_logging
+from genie_client.utils.logging import LazyQueueHandler, SamplingFilter, StructuredFormatter
+
+
+def make_record(msg="Operation metrics", args=(), **extra):
+    record = logging.LogRecord("genie_client", logging.INFO, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_formatter_emits_metrics_and_context():
+    record = make_record(metrics={"duration_ms": 12.5}, context={"space_id": "s1"})
+    data = json.loads(StructuredFormatter().format(record))
+    assert data["metrics"] == {"duration_ms": 12.5}
+    assert data["space_id"] == "s1"
+    assert data["message"] == "Operation metrics"
+
+
+def test_queue_handler_defers_formatting():
+    class Unformattable:
+        def __str__(self):
+            raise AssertionError("formatted on the calling thread")
+
+    log_queue = queue.SimpleQueue()
+    LazyQueueHandler(log_queue).emit(make_record("Value: %s", (Unformattable(),)))
+    assert log_queue.get_nowait().msg == "Value: %s"
+
+
+def test_records_after_flush_are_written_directly(monkeypatch):
+    class Capture(logging.Handler):
+        def __init__(self):
+            super().__init__()
+            self.messages = []
+
+        def emit(self, record):
+            self.messages.append(record.getMessage())
+
+    monkeypatch.setattr(genie_logging, "_listener", None)
+    monkeypatch.setattr(genie_logging, "_queue_handler", None)
+    capture = Capture()
+    handler = genie_logging._start_queue_listener(capture)
+    handler.handle(make_record("queued"))
+    genie_logging.flush_logging()
+    handler.handle(make_record("after exit"))
+    assert capture.messages == ["queued", "after exit"]
+
+
+def test_sampling_filter_keeps_one_in_n():
+    sampler = SamplingFilter({"poll": 5})
+    kept = [sampler.filter(make_record(event="poll")) for _ in range(20)]
+    assert kept.count(True) == 4
+    assert sampler.filter(make_record(event="other"))
@@ -0,0 +1,103 @@
+import os
+import threading
+import time
+
+import pytest
+
+from genie_client.core.memory import BudgetedCollector, MemoryBudget, SpilledRows
+from genie_client.exceptions.custom_errors import MemoryBudgetExceededError
+from genie_client.models.response_models import GenieResponse
+
+ROWS = [[str(i), "x" * 20] for i in range(100)]
+
+
+def test_reserve_waits_for_release():
+    budget = MemoryBudget(100, wait_timeout=5)
+    assert budget.reserve(80)
+    threading.Timer(0.05, budget.release, args=(80,)).start()
+    start = time.monotonic()
+    assert budget.reserve(50)
+    assert time.monotonic() - start >= 0.04
+    snapshot = budget.snapshot()
+    assert (snapshot["used_bytes"], snapshot["peak_bytes"], snapshot["waits"]) == (50, 80, 1)
+
+
+def test_oversized_request_is_granted_when_budget_is_idle():
+    assert MemoryBudget(10).reserve(1000)
+
+
+def test_collector_spills_when_memory_stays_unavailable(tmp_path):
+    budget = MemoryBudget(10_000, wait_timeout=0)
+    collector = BudgetedCollector(budget, spill_directory=str(tmp_path))
+    collector.before_fetch(None)
+    collector.add(ROWS[:10])
+    collector.before_fetch(50_000)
+    collector.add(ROWS[10:])
+    assert isinstance(collector.rows, SpilledRows)
+    assert list(collector.rows) == ROWS
+    assert budget.snapshot()["used_bytes"] == 0 and budget.spills == 1
+    collector.rows.close()
+    assert not os.listdir(tmp_path)
+
+
+def test_collector_rejects_when_configured():
+    budget = MemoryBudget(10_000, wait_timeout=0)
+    budget.reserve(10_000)
+    collector = BudgetedCollector(budget, overflow="reject")
+    with pytest.raises(MemoryBudgetExceededError):
+        collector.before_fetch(5_000)
+    assert budget.rejections == 1
+
+
+@pytest.fixture
+def make_client(make_client):
+    def make(**overrides):
+        client = make_client(warehouse_id="wh1", **overrides)
+        api = client.api_client
+        api.execute_statement.return_value = {
+            "statement_id": "st1",
+            "status": {"state": "SUCCEEDED"},
+            "manifest": {"schema": {"columns": [{"name": "id"}, {"name": "label"}]},
+                         "total_chunk_count": 2, "total_row_count": 100,
+                         "chunks": [{"chunk_index": 0, "byte_count": 2000},
+                                    {"chunk_index": 1, "byte_count": 2000}]},
+            "result": {"chunk_index": 0, "data_array": ROWS[:50]},
+        }
+        api.get_statement_result_chunk.return_value = {"chunk_index": 1, "data_array": ROWS[50:]}
+        return client
+    return make
+
+
+def test_response_holds_memory_until_released(make_client):
+    client = make_client(memory_budget_mb=1)
+    response = client.execute_sql("SELECT * FROM t")
+    assert response.success and response.results["data"] == ROWS
+    used = client.memory_budget.snapshot()["used_bytes"]
+    assert used == response.metrics["result_bytes"] > 0
+    assert client.readiness()["memory"]["used_bytes"] == used
+    response.release_results()
+    assert client.memory_budget.snapshot()["used_bytes"] == 0
+
+
+def test_garbage_collected_response_returns_memory(make_client):
+    client = make_client(memory_budget_mb=1)
+    client.execute_sql("SELECT * FROM t")
+    assert client.memory_budget.snapshot()["used_bytes"] == 0
+
+
+def test_rejected_result_fails_the_response(make_client):
+    client = make_client(memory_budget_mb=0.001, memory_wait_timeout=0, memory_overflow="reject")
+    client.memory_budget.reserve(1024)
+    response = client.execute_sql("SELECT * FROM t")
+    assert not response.success
+    assert response.error_type == "MemoryBudgetExceededError"
+
+
+def test_spilled_response_reads_like_a_list(make_client):
+    client = make_client(memory_budget_mb=0.001, memory_wait_timeout=0)
+    response = client.execute_sql("SELECT * FROM t")
+    data = response.results["data"]
+    assert isinstance(data, SpilledRows)
+    assert (data[0], data[-1], data[48:52]) == (ROWS[0], ROWS[-1], ROWS[48:52])
+    dumped = GenieResponse.model_validate_json(response.model_dump_json())
+    assert dumped.results["data"] == ROWS
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from genie_client.core.offload import ResultOffloader, decode_chunk, unpack_chunk
+from genie_client.core.results import ResultStream
+
+COLUMNS = [{"name": "id", "type_name": "LONG"}, {"name": "price", "type_name": "DOUBLE"},
+           {"name": "active", "type_name": "BOOLEAN"}, {"name": "name", "type_name": "STRING"}]
+TYPES = [col["type_name"] for col in COLUMNS]
+
+
+def chunk(index, rows):
+    return {"statement_response": {"result": {"chunk_index": index, "data_array": rows}}}
+
+
+def test_decode_round_trip_through_shared_memory():
+    raw = json.dumps(chunk(1, [["1", "2.5", "true", "a"], [None, None, None, None]])).encode()
+    packed = decode_chunk(raw, TYPES)
+    assert packed[0] is not None and set(packed[2]) == {3}
+    assert unpack_chunk(packed, 4) == [[1, None], [2.5, None], [True, None], ["a", None]]
+
+
+def test_malformed_numeric_column_falls_back_to_pickled_values():
+    raw = json.dumps({"data_array": [["1"], ["n/a"]]}).encode()
+    packed = decode_chunk(raw, ["LONG"])
+    assert packed[0] is None
+    assert unpack_chunk(packed, 1) == [[1, "n/a"]]
+
+
+@pytest.fixture(scope="module")
+def offloader():
+    offloader = ResultOffloader(max_workers=2)
+    yield offloader
+    offloader.shutdown()
+
+
+CHUNKS = {i: [[str(i * 10 + j), "1.5", "false", f"r{i}"] for j in range(3)] for i in range(4)}
+
+
+def stream(typed):
+    return ResultStream(
+        {"status": {"state": "SUCCEEDED"},
+         "manifest": {"schema": {"columns": COLUMNS}, "total_chunk_count": 4, "total_row_count": 12},
+         "result": {"chunk_index": 0, "data_array": CHUNKS[0]}},
+        fetch_chunk=lambda i: {"data_array": CHUNKS[i]},
+        fetch_raw_chunk=lambda i: json.dumps(chunk(i, CHUNKS[i])).encode(),
+        typed=typed
+    )
+
+
+@pytest.mark.parametrize("typed", [False, True])
+def test_offloaded_rows_match_in_process_rows(offloader, typed):
+    in_process = [row for _, rows in stream(typed) for row in rows]
+    assert offloader.collect(stream(typed))["data"] == in_process
+    assert in_process[4] == ([11, 1.5, False, "r1"] if typed else ["11", "1.5", "false", "r1"])
+
+
+def test_collect_types_all_chunks_in_order(offloader):
+    results = offloader.collect(stream(typed=True))
+    assert [row[0] for row in results["data"]] == [0, 1, 2, 10, 11, 12, 20, 21, 22, 30, 31, 32]
+    assert results["data"][4] == [11, 1.5, False, "r1"]
+    assert "| id  | price |" in offloader.format_markdown(results["columns"][:2], results["data"])
@@ -0,0 +1,91 @@
+from unittest.mock import patch
+
+from genie_client import GenieClientPool
+from genie_client.core.pool import pool_key
+from genie_client.config import AzureADGenieClientConfig, PATGenieClientConfig
+
+
+def aad_config(url, tenant="tenant1"):
+    return AzureADGenieClientConfig(
+        client_id="app1", client_secret="secret", tenant_id=tenant,
+        databricks_url=url, workspace_id="ws"
+    )
+
+
+def pat_config(url, token="token"):
+    return PATGenieClientConfig(personal_access_token=token, databricks_url=url, workspace_id="ws")
+
+
+def test_clients_are_reused_and_share_resources():
+    with GenieClientPool(max_in_flight=8) as pool:
+        first = pool.get(aad_config("https://a.databricks.com"))
+        assert pool.get(aad_config("https://a.databricks.com")) is first
+        second = pool.get(aad_config("https://b.databricks.com"))
+        assert second is not first
+        assert second.token_manager is first.token_manager
+        assert second.api_client.session is pool.session
+        assert second.api_client.admission is pool.admission
+        assert pool.stats()["token_managers"] == 1
+
+
+def test_hedging_clients_share_one_executor():
+    pool = GenieClientPool(max_clients=1)
+    config = pat_config("https://a.databricks.com").model_copy(update={"enable_hedging": True})
+    first = pool.get(config).api_client.hedger
+    pool.get(pat_config("https://b.databricks.com").model_copy(update={"enable_hedging": True}))
+    second = pool.get(config).api_client.hedger
+    assert second is not first and second._executor is first._executor is pool.hedge_executor
+    assert pool.hedge_executor.submit(lambda: "ok").result() == "ok"  # survives eviction
+    pool.close()
+
+
+def test_lru_eviction_closes_client_but_not_shared_session():
+    pool = GenieClientPool(max_clients=2)
+    clients = [pool.get(pat_config(f"https://w{i}.databricks.com")) for i in range(2)]
+    pool.get(pat_config("https://w0.databricks.com"))  # w0 becomes most recent
+    with patch.object(clients[1], "close") as close:
+        pool.get(pat_config("https://w2.databricks.com"))
+        close.assert_called_once()
+    assert len(pool) == 2
+    assert pool.get(pat_config("https://w0.databricks.com")) is clients[0]
+    assert pool.stats()["evictions"] == 1
+    assert pool.session.adapters  # still open and usable
+    pool.close()
+    assert len(pool) == 0
+
+
+def test_idle_clients_and_orphaned_tokens_are_evicted():
+    pool = GenieClientPool(idle_timeout=60)
+    pool.get(aad_config("https://a.databricks.com"))
+    with patch("genie_client.core.pool.time.monotonic", return_value=10 ** 9):
+        pool.get(aad_config("https://b.databricks.com", tenant="tenant2"))
+    assert len(pool) == 1
+    assert pool.stats()["token_managers"] == 1
+
+
+def test_eviction_waits_for_requests_in_progress():
+    pool = GenieClientPool(max_clients=1)
+    config = pat_config("https://a.databricks.com")
+    busy = pool.get(config)
+    with patch.object(busy, "close") as close:
+        with busy._operation("ask_genie"):
+            pool.get(pat_config("https://b.databricks.com"))
+            assert pool_key(config) not in pool
+            close.assert_not_called()
+        close.assert_called_once()
+    pool.close()
+
+
+def test_clients_share_memory_budget_and_offloader():
+    pool = GenieClientPool(max_clients=1)
+    config = pat_config("https://a.databricks.com").model_copy(
+        update={"memory_budget_mb": 64, "offload_workers": 2})
+    first = pool.get(config)
+    second = pool.get(pat_config("https://b.databricks.com").model_copy(update={"offload_workers": 1}))
+    assert first.memory_budget is pool.memory_budget is second.memory_budget
+    assert first.offloader is pool.offloader is second.offloader
+    assert pool.offloader.max_workers == 2 and not first.owns_offloader
+    with patch.object(pool.offloader, "shutdown") as shutdown:
+        assert pool.get(pat_config("https://c.databricks.com")).offloader is None
+        shutdown.assert_not_called()  # evicting a client leaves the shared pool running
+    pool.close()
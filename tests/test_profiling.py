@@ -0,0 +1,76 @@
+import os
+import pstats
+import tracemalloc
+
+import pytest
+
+from genie_client.utils.constants import Status
+from genie_client.utils.profiling import CallProfile, phase
+
+
+def query_result(chunk_index=None):
+    rows = [[str(i), f"name {i}"] for i in range(1000)]
+    if chunk_index:
+        return {"statement_response": {"result": {"chunk_index": chunk_index, "data_array": rows}}}
+    return {"statement_response": {
+        "status": {"state": "SUCCEEDED"},
+        "manifest": {"schema": {"columns": [{"name": "id", "type_name": "LONG"},
+                                           {"name": "name", "type_name": "STRING"}]},
+                     "total_chunk_count": 3, "total_row_count": 3000},
+        "result": {"chunk_index": 0, "data_array": rows},
+    }}
+
+
+@pytest.fixture
+def make_client(make_client):
+    def make(**overrides):
+        client = make_client(**overrides)
+        api = client.api_client
+        api.start_conversation.return_value = {"conversation": {"id": "c"},
+                                               "message": {"id": "m", "status": Status.SUBMITTED}}
+        api.get_message.return_value = {"status": Status.COMPLETED, "attachments": [
+            {"attachment_id": "a1", "query": {"query": "SELECT id, name FROM t"}},
+        ]}
+        api.get_query_result.side_effect = lambda *args, chunk_index=None: query_result(chunk_index)
+        return client
+    return make
+
+
+def test_profiled_call_reports_phases_functions_and_allocations(make_client):
+    response = make_client().ask_genie("Names?", profile=True)
+    profile = response.metrics["profile"]
+    assert set(profile["phases"]) == {"poll_attachments", "extend_rows"}
+    assert profile["phases"]["extend_rows"]["calls"] == 3
+    assert profile["top_functions"] and profile["top_allocations"]
+    assert profile["wall_ms"] >= profile["phases"]["extend_rows"]["wall_ms"]
+    assert not tracemalloc.is_tracing()
+
+
+def test_calls_are_sampled_one_in_n(make_client):
+    client = make_client(profile_every=2)
+    profiled = ["profile" in client.ask_genie("Names?").metrics for _ in range(4)]
+    assert profiled == [True, False, True, False]
+    assert "profile" not in client.ask_genie("Names?", profile=False).metrics
+
+
+def test_full_profiles_are_dumped(make_client, tmp_path):
+    client = make_client(profile_directory=str(tmp_path))
+    paths = client.execute_sql("SELECT 1", warehouse_id="wh", profile=True).metrics["profile"]["paths"]
+    assert pstats.Stats(paths["cpu"]).total_calls > 0
+    assert isinstance(tracemalloc.Snapshot.load(paths["allocations"]), tracemalloc.Snapshot)
+
+
+def test_ask_profiles_are_named_after_the_message(make_client, tmp_path):
+    client = make_client(profile_directory=str(tmp_path))
+    response = client.ask_genie("Names?", profile=True)
+    assert response.success
+    paths = response.metrics["profile"]["paths"]
+    assert all(os.path.basename(path).split(".")[0].endswith("-m") for path in paths.values())
+
+
+def test_phase_is_a_no_op_without_a_profiled_call():
+    assert phase("markdown") is phase("http")
+    with CallProfile() as profiler:
+        with phase("markdown"):
+            "|".join(["x"] * 1000)
+    assert profiler.summary()["phases"]["markdown"]["calls"] == 1
@@ -0,0 +1,133 @@
+import json
+
+import pytest
+
+from genie_client.core.refresh import RowIndex
+from genie_client.utils.constants import Status
+
+COLUMNS = ["store", "revenue"]
+SQL = "SELECT store, SUM(totalPrice) AS revenue FROM sales GROUP BY 1"
+
+
+def statement(chunks):
+    return {
+        "statement_id": "st",
+        "status": {"state": "SUCCEEDED"},
+        "manifest": {"schema": {"columns": [{"name": "store", "type_name": "STRING"},
+                                            {"name": "revenue", "type_name": "LONG"}]},
+                     "total_chunk_count": len(chunks), "total_row_count": sum(map(len, chunks))},
+        "result": {"chunk_index": 0, "data_array": chunks[0]},
+    }
+
+
+def chunk_reply(data_array, decode=True):
+    """Chunk reply, or its raw body for the offloader"""
+    reply = {"data_array": data_array}
+    return reply if decode else json.dumps(reply).encode()
+
+
+@pytest.fixture
+def make_client(make_client):
+    def make(**overrides):
+        client = make_client(enable_natural_language=True, model_endpoint_name="llm", **overrides)
+        api = client.api_client
+        client.chunks = [[["a", "10"], ["b", "20"]], [["c", "30"]]]
+        api.get_space.return_value = {"warehouse_id": "wh1"}
+        api.execute_statement.side_effect = lambda *args: statement(client.chunks)
+        api.get_statement_result_chunk.side_effect = lambda statement_id, chunk_index, decode=True: (
+            chunk_reply(client.chunks[chunk_index], decode)
+        )
+        api.generate_natural_language.return_value = "Store c leads."
+        api.start_conversation.return_value = {"conversation": {"id": "c"},
+                                               "message": {"id": "m", "status": Status.SUBMITTED}}
+        api.get_message.return_value = {"status": Status.COMPLETED, "attachments": [
+            {"attachment_id": "a1", "query": {"query": SQL}}
+        ]}
+        api.get_query_result.side_effect = lambda *args, chunk_index=None, decode=True: (
+            {"statement_response": statement(client.chunks)} if chunk_index is None
+            else chunk_reply(client.chunks[chunk_index], decode) if not decode
+            else {"statement_response": {"result": chunk_reply(client.chunks[chunk_index])}}
+        )
+        return client
+    return make
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client()
+
+
+def test_keyed_diff_reports_inserts_updates_and_deletes():
+    old = RowIndex.from_rows(COLUMNS, ["store"], [["a", "10"], ["b", "20"], ["c", "30"]])
+    new, delta = old.diff([[["a", "10"], ["b", "25"]], [["d", "40"]]])
+    assert delta == {"changed": True, "inserted": [["d", "40"]], "updated": [["b", "25"]],
+                     "deleted": [["c", "30"]]}
+    assert new.data == [["a", "10"], ["b", "25"], ["d", "40"]]
+    assert new.diff([new.data])[1]["changed"] is False
+
+
+def test_unkeyed_diff_matches_duplicate_rows_in_order():
+    old = RowIndex.from_rows(COLUMNS, None, [["a", "1"], ["a", "1"], ["b", "2"]])
+    _, delta = old.diff([[["a", "1"], ["b", "3"]]])
+    assert delta["inserted"] == [["b", "3"]]
+    assert delta["updated"] == []
+    assert delta["deleted"] == [["a", "1"], ["b", "2"]]
+
+
+def test_rows_with_colliding_hashes_are_updates():
+    assert hash(-1.0) == hash(-2.0)
+    old = RowIndex.from_rows(["k", "v"], ["k"], [["a", "-1.0"]], ["STRING", "DOUBLE"])
+    assert old.diff([[["a", "-2.0"]]])[1]["updated"] == [["a", "-2.0"]]
+
+
+def test_typed_and_string_cells_compare_alike():
+    typed = RowIndex.from_rows(COLUMNS, ["store"], [["a", 10], ["b", 20]], ["STRING", "LONG"])
+    assert typed.diff([[["a", "10"], ["b", "20"]]])[1]["changed"] is False
+    doubles = RowIndex.from_rows(COLUMNS, ["store"], [["a", 1.5e10]], ["STRING", "DOUBLE"])
+    assert doubles.diff([[["a", "1.5E10"]]])[1]["changed"] is False
+    untyped = RowIndex.from_rows(COLUMNS, None, [["a", 10], ["b", True]])
+    assert untyped.diff([[["a", "10"], ["b", "true"]]])[1]["changed"] is False
+
+
+def test_refresh_returns_only_changes_and_skips_nl_when_unchanged(client):
+    previous = client.ask_genie("Revenue by store?")
+    assert client.api_client.generate_natural_language.call_count == 1
+
+    client.chunks = [[["a", "10"], ["b", "25"]], [["d", "40"]]]
+    changed = client.refresh(previous, key_columns=["store"], question="Revenue by store?")
+    assert changed.success and changed.metrics["changed"] is True
+    delta = changed.results["delta"]
+    assert (delta["inserted"], delta["updated"], delta["deleted"]) == ([["d", "40"]], [["b", "25"]], [["c", "30"]])
+    assert changed.metrics["refresh_baseline"] is True
+    assert client.api_client.generate_natural_language.call_count == 2
+
+    unchanged = client.refresh(changed, key_columns=["store"], question="Revenue by store?")
+    assert unchanged.results["delta"]["changed"] is False
+    assert unchanged.results["data"] == [["a", "10"], ["b", "25"], ["d", "40"]]
+    assert unchanged.natural_language_answer == "Store c leads."
+    assert client.api_client.generate_natural_language.call_count == 2
+
+
+def test_refresh_without_baseline_reports_every_row_inserted(client):
+    previous = client.ask_genie("Revenue by store?", fetch_policy="none")
+    response = client.refresh(previous)
+    assert response.metrics["refresh_baseline"] is False
+    assert response.metrics["rows_inserted"] == 3
+
+
+def test_unknown_key_column_fails_the_refresh(client):
+    response = client.refresh(client.ask_genie("Revenue by store?"), key_columns=["region"])
+    assert not response.success and response.error_type == "InvalidInputError"
+
+
+@pytest.mark.parametrize("typed_first", [True, False])
+def test_refresh_across_offloaded_typed_and_string_results(make_client, typed_first):
+    offloaded = make_client(offload_workers=1, typed_results=True)
+    plain = make_client()
+    first, second = (offloaded, plain) if typed_first else (plain, offloaded)
+    previous = first.ask_genie("Revenue by store?")
+    assert previous.results["data"][0] == (["a", 10] if typed_first else ["a", "10"])
+    for key_columns in (["store"], None):
+        response = second.refresh(previous, key_columns=key_columns)
+        assert response.metrics["refresh_baseline"] is True
+        assert response.results["delta"]["changed"] is False
@@ -0,0 +1,39 @@
+from genie_client.models.response_models import Attachment, GenieResponse
+from genie_client.utils.constants import Status
+
+QUERY_ATTACHMENT = {"attachment_id": "att1", "query": {"query": "SELECT 1"}}
+
+
+def test_start_uses_fresh_defaults():
+    first = GenieResponse.start(status=Status.INITIATED)
+    second = GenieResponse.start(status=Status.INITIATED)
+    first.metrics["x"] = 1
+    first.attachments.append(Attachment.from_api(QUERY_ATTACHMENT))
+    assert second.metrics == {} and second.attachments == []
+    assert first.success is False and first.start_time is not None
+
+
+def test_from_api_determines_type():
+    attachment = Attachment.from_api(QUERY_ATTACHMENT)
+    assert (attachment.type, attachment.attachment_id) == ("query", "att1")
+    assert Attachment.from_api({"text": {"content": "hi"}}).type == "text"
+
+
+def test_poll_reuses_unchanged_attachments(make_client):
+    client = make_client()
+    text = {"attachment_id": "att0", "text": {"content": "Working on it"}}
+    client.api_client.get_message.side_effect = [
+        {"status": Status.EXECUTING_QUERY, "attachments": [text]},
+        {"status": Status.EXECUTING_QUERY, "attachments": [text, QUERY_ATTACHMENT]},
+        {"status": Status.COMPLETED, "attachments": [dict(text), dict(QUERY_ATTACHMENT)]},
+    ]
+    response = GenieResponse.start(status=Status.SUBMITTED, conversation_id="c", message_id="m")
+
+    seen = []
+    original = client._update_attachments
+    client._update_attachments = lambda current, raw: seen.append(len(raw)) or original(current, raw)
+    response = client._poll_message_status("space1", response)
+
+    assert response.status == Status.COMPLETED
+    assert seen == [1, 2]
+    assert [att.type for att in response.attachments] == ["text", "query"]
@@ -0,0 +1,116 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from genie_client.exceptions.custom_errors import InvalidInputError
+from genie_client.utils.constants import RequestKinds, Status
+from genie_client.utils.scheduler import RequestScheduler, request_priority
+
+CLASSES = {"interactive": {"weight": 8}, "batch": {"weight": 1}}
+
+
+def drain(scheduler, tickets):
+    """Queues (priority, kind) requests behind one held slot and returns the grant order"""
+    holder = scheduler.acquire(RequestKinds.POLL, "batch")
+    order, threads = [], []
+    for priority, kind in tickets:
+        def run(priority=priority, kind=kind):
+            granted = scheduler.acquire(kind, priority)
+            order.append(priority)
+            scheduler.release(granted)
+        thread = threading.Thread(target=run)
+        thread.start()
+        threads.append(thread)
+    while scheduler.snapshot()["waiting"] < len(tickets):
+        time.sleep(0.001)
+    scheduler.release(holder)
+    for thread in threads:
+        thread.join(5)
+    return order
+
+
+def test_interactive_requests_overtake_queued_batch_polls():
+    scheduler = RequestScheduler(max_concurrency=1, classes=CLASSES)
+    order = drain(scheduler, [("batch", RequestKinds.POLL)] * 20 + [("interactive", RequestKinds.POLL)])
+    assert order.index("interactive") <= 1
+
+
+def test_weighted_share_between_backlogged_classes():
+    scheduler = RequestScheduler(max_concurrency=1, classes=CLASSES)
+    order = drain(scheduler, [("batch", RequestKinds.POLL)] * 18 + [("interactive", RequestKinds.POLL)] * 18)
+    assert order[:9].count("interactive") >= 7
+
+
+def test_reserved_slots_are_kept_for_their_class():
+    scheduler = RequestScheduler(max_concurrency=2, classes={
+        "interactive": {"weight": 8, "reserved": 1}, "batch": {"weight": 1}
+    })
+    held = scheduler.acquire(RequestKinds.CHUNK, "batch")
+    assert scheduler._can_start("batch", scheduler.classes["batch"]) is False
+    assert scheduler.acquire(RequestKinds.START, "interactive") == "interactive"
+    scheduler.release(held)
+
+
+def test_rate_budget_delays_class():
+    scheduler = RequestScheduler(max_concurrency=4, classes={
+        "interactive": {}, "batch": {"rate_per_second": 50, "burst": 1}
+    })
+    start = time.monotonic()
+    for _ in range(3):
+        scheduler.release(scheduler.acquire(RequestKinds.POLL, "batch"))
+    assert time.monotonic() - start >= 0.03
+
+
+def test_unknown_priority_is_rejected():
+    with pytest.raises(InvalidInputError):
+        RequestScheduler(classes=CLASSES).acquire(RequestKinds.POLL, "urgent")
+
+
+def test_queue_wait_is_reported_in_response_metrics(make_client):
+    client = make_client(mock_api=False, max_concurrent_requests=2)
+    replies = {
+        "start_conversation": {"conversation": {"id": "c"}, "message": {"id": "m", "status": Status.SUBMITTED}},
+        "get_message": {"status": Status.COMPLETED, "attachments": []},
+    }
+    with patch.object(client.api_client, "_send", side_effect=lambda method, endpoint, *args: (
+        replies["start_conversation"] if method == "POST" else replies["get_message"]
+    )):
+        response = client.ask_genie("How many orders?", priority="batch")
+    assert response.success
+    assert response.metrics["priority"] == "batch"
+    assert response.metrics["queued_requests"] == 2
+    assert response.metrics["queue_wait_ms"] >= 0
+    assert client.api_client.scheduler.snapshot()["in_flight"] == 0
+
+
+def test_request_priority_context_applies_to_nested_calls():
+    scheduler = RequestScheduler(classes=CLASSES)
+    with request_priority("batch") as wait:
+        assert scheduler.acquire(RequestKinds.POLL) == "batch"
+        scheduler.release("batch")
+    assert wait["queued_requests"] == 1
+
+
+def test_reservations_must_leave_room_for_other_classes():
+    with pytest.raises(ValueError):
+        RequestScheduler(max_concurrency=1, classes={"interactive": {"reserved": 1}, "batch": {}})
+
+
+def test_default_reservations_are_dropped_for_a_single_slot(make_client):
+    scheduler = make_client(mock_api=False, max_concurrent_requests=1).api_client.scheduler
+    assert scheduler.classes["interactive"].reserved == 0
+    scheduler.release(scheduler.acquire(RequestKinds.POLL, "batch"))
+    assert scheduler.snapshot()["in_flight"] == 0
+
+
+def test_interrupted_wait_gives_up_its_ticket():
+    scheduler = RequestScheduler(max_concurrency=1, classes=CLASSES)
+    holder = scheduler.acquire(RequestKinds.POLL, "batch")
+    with patch.object(scheduler._changed, "wait", side_effect=KeyboardInterrupt):
+        with pytest.raises(KeyboardInterrupt):
+            scheduler.acquire(RequestKinds.POLL, "interactive")
+    assert scheduler.snapshot()["waiting"] == 0
+    scheduler.release(holder)
+    assert scheduler.snapshot()["in_flight"] == 0
@@ -0,0 +1,87 @@
+import struct
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("msgpack")
+pytest.importorskip("zstandard")
+
+from genie_client.exceptions.custom_errors import SerializationError
+from genie_client.models.response_models import Attachment, GenieResponse
+from genie_client.models.serialization import (
+    FORMAT_VERSION, SUPPORTED_VERSIONS, dump_response, load_response, open_response
+)
+
+COLUMNS = [{"name": "id", "type_name": "INT"}, {"name": "amount", "type_name": "DECIMAL"}]
+
+
+def make_response():
+    rows = [[i, Decimal("1.50") * i, date(2024, 1, 1)] for i in range(500)]
+    return GenieResponse(
+        success=True,
+        conversation_id="c1",
+        message_id="m1",
+        status="COMPLETED",
+        start_time=datetime(2024, 1, 1, 12, 0),
+        attachments=[
+            Attachment(type="text", content={"content": "hello"}),
+            Attachment(
+                type="query",
+                content={"query": {"query": "SELECT 1"}},
+                attachment_id="a1",
+                results={"data": rows[:2], "columns": COLUMNS, "row_count": 2},
+            ),
+        ],
+        results={"data": rows, "columns": COLUMNS, "row_count": 500, "chunk_count": 1},
+        metrics={"result_row_count": 500},
+    )
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_round_trip(compress):
+    response = make_response()
+    loaded = load_response(dump_response(response, compress=compress))
+    assert loaded.model_dump() == response.model_dump()
+    assert loaded.sql == "SELECT 1"
+
+
+def test_compressed_is_smaller_than_json():
+    response = make_response()
+    assert len(response.to_bytes()) < len(response.model_dump_json()) / 4
+    assert GenieResponse.from_bytes(response.to_bytes()).results["row_count"] == 500
+
+
+def test_archive_reads_metadata_without_decoding_rows():
+    archive = open_response(make_response().to_bytes())
+    assert archive.version == FORMAT_VERSION and archive.compressed
+    assert archive.metadata["conversation_id"] == "c1"
+    assert archive.metadata["results"]["row_count"] == 500
+    assert archive._decoded == {}
+    assert archive.rows(attachment=1)[1][1] == Decimal("1.50")
+    assert list(archive._decoded) == [1]
+    assert archive.rows(attachment=0) is None
+
+
+def test_shared_results_are_written_once():
+    copied, response = make_response(), make_response()
+    copied.attachments[1].results = dict(copied.results)
+    response.attachments[1].results = response.results
+    data = response.to_bytes(compress=False)
+    assert len(data) < len(copied.to_bytes(compress=False)) * 0.6
+    archive = open_response(data)
+    assert [block["owner"] for block in archive.metadata["blocks"]] == ["response"]
+    assert archive.rows(attachment=1) is archive.rows()
+    loaded = archive.load()
+    assert loaded.attachments[1].results is loaded.results
+    assert loaded.model_dump() == response.model_dump()
+
+
+def test_rejects_unknown_data():
+    data = bytearray(make_response().to_bytes())
+    with pytest.raises(SerializationError):
+        load_response(b"{}" + bytes(data))
+    struct.pack_into(">B", data, 4, FORMAT_VERSION + 1)
+    with pytest.raises(SerializationError) as e:
+        load_response(bytes(data))
+    assert e.value.context["supported_versions"] == sorted(SUPPORTED_VERSIONS)
@@ -0,0 +1,118 @@
+import pytest
+
+from genie_client.core.similarity import QuestionIndex, question_literals
+from genie_client.utils.constants import Status
+
+QUESTION = "What was the total revenue in May 2024?"
+SQL = "SELECT SUM(totalPrice) FROM sales WHERE month = '2024-05'"
+STATEMENT = {
+    "statement_id": "st1",
+    "status": {"state": "SUCCEEDED"},
+    "manifest": {"schema": {"columns": [{"name": "revenue", "type_name": "LONG"}]},
+                 "total_chunk_count": 1, "total_row_count": 1},
+    "result": {"chunk_index": 0, "data_array": [["42"]]},
+}
+
+
+@pytest.fixture
+def make_client(make_client):
+    def make(**overrides):
+        client = make_client(enable_question_index=True, **overrides)
+        api = client.api_client
+        api.get_space.return_value = {"warehouse_id": "wh1"}
+        api.execute_statement.return_value = STATEMENT
+        api.start_conversation.return_value = {"conversation": {"id": "c"},
+                                               "message": {"id": "m", "status": Status.SUBMITTED}}
+        api.get_message.return_value = {"status": Status.COMPLETED, "attachments": [
+            {"attachment_id": "a1", "query": {"query": SQL, "statement_id": "st0"}}
+        ]}
+        api.get_query_result.return_value = {"statement_response": STATEMENT}
+        return client
+    return make
+
+
+def test_rephrased_question_matches():
+    index = QuestionIndex()
+    index.add("s", QUESTION, SQL)
+    for question in ("May 2024 total revenue", "Show me revenue for may 2024"):
+        match = index.lookup("s", question)
+        assert match.sql == SQL and match.similarity >= 0.8
+    assert index.stats()["reuse_rate"] == 1.0
+
+
+def test_different_numbers_or_grouping_do_not_match():
+    index = QuestionIndex()
+    index.add("s", QUESTION, SQL)
+    assert index.lookup("s", "What was the total revenue in May 2023?") is None
+    assert index.lookup("s", "Total revenue by product in May 2024") is None
+    assert index.lookup("other", QUESTION) is None
+
+
+@pytest.mark.parametrize("asked, other", [
+    ("Revenue of enterprise customers in May 2024", "Revenue of enterprise customers in June 2024"),
+    ("Orders placed on Monday by region", "Orders placed on Tuesday by region"),
+    ("Net revenue by product including returns", "Net revenue by product excluding returns"),
+    ("Products by revenue in ascending order", "Products by revenue in descending order"),
+    ("Stores with the highest revenue per city", "Stores with the lowest revenue per city"),
+    ("Orders by region before the 2024 price change", "Orders by region after the 2024 price change"),
+])
+def test_protected_words_must_match(asked, other):
+    index = QuestionIndex()
+    index.add("s", asked, SQL)
+    assert index.lookup("s", other) is None
+    assert index.lookup("s", asked).sql == SQL
+
+
+def test_protected_word_synonyms_share_literals():
+    assert question_literals("Top products, desc, in Sept") == question_literals("Top products descending in September")
+
+
+def test_least_recently_used_questions_are_evicted():
+    index = QuestionIndex(max_size=2)
+    index.add("s", "revenue in 2022", "SELECT 2022")
+    index.add("s", "revenue in 2023", "SELECT 2023")
+    assert index.lookup("s", "revenue in 2022") is not None
+    index.add("s", "revenue in 2024", "SELECT 2024")
+    assert index.lookup("s", "revenue in 2023") is None
+    assert len(index) == 2
+
+
+def test_audit_disagreement_counts_a_false_match_and_reindexes():
+    index = QuestionIndex()
+    index.add("s", QUESTION, SQL)
+    match = index.lookup("s", "Revenue in May 2024")
+    assert index.record_audit(match, "Revenue in May 2024", "select sum(x) from other") is False
+    assert index.stats()["false_match_rate"] == 1.0
+    assert index.recent_matches()[-1]["audit"] == "false_match"
+    assert index.lookup("s", "Revenue in May 2024").sql == "select sum(x) from other"
+
+
+def test_client_reuses_sql_of_similar_question(make_client):
+    client = make_client()
+    client.ask_genie(QUESTION)
+    response = client.ask_genie("May 2024 total revenue")
+    assert response.success and response.sql == SQL
+    assert response.metrics["similar_question_hit"] is True
+    assert response.metrics["matched_question"] == QUESTION
+    assert response.results["data"] == [["42"]]
+    assert client.api_client.start_conversation.call_count == 1
+    client.api_client.execute_statement.assert_called_once_with("wh1", SQL)
+
+
+def test_client_reuses_results_without_executing(make_client):
+    client = make_client(question_reuse="results")
+    first = client.ask_genie(QUESTION)
+    response = client.ask_genie("May 2024 total revenue")
+    assert response.results is first.results
+    client.api_client.execute_statement.assert_not_called()
+    assert client.readiness()["question_index"]["hits"] == 1
+
+
+def test_client_audits_sampled_matches_in_background(make_client):
+    client = make_client(question_audit_rate=1.0)
+    client.ask_genie(QUESTION)
+    client.ask_genie("May 2024 total revenue")
+    client._audit_pool.shutdown(wait=True)
+    assert client.api_client.start_conversation.call_count == 2
+    stats = client.question_index.stats()
+    assert stats["audits"] == 1 and stats["false_matches"] == 0
@@ -0,0 +1,117 @@
+import random
+
+import pytest
+
+from genie_client.core.space_groups import SpaceGroup
+from genie_client.exceptions.custom_errors import APIRequestError
+from genie_client.utils.constants import RoutingStrategies, Status
+
+
+@pytest.fixture
+def make_client(make_client):
+    def make(failing=(), **overrides):
+        client = make_client(default_space_id="sales", space_groups={"sales": ["s1", "s2"]}, **overrides)
+        api = client.api_client
+
+        def start_conversation(space_id, question):
+            if space_id in failing:
+                raise APIRequestError("Service unavailable", status_code=503, response_body="")
+            return {"conversation": {"id": f"conv-{space_id}"},
+                    "message": {"id": "m", "status": Status.SUBMITTED}}
+
+        api.start_conversation.side_effect = start_conversation
+        api.get_message.return_value = {"status": Status.COMPLETED, "attachments": [
+            {"attachment_id": "a1", "text": {"content": "Hello"}}
+        ]}
+        return client
+    return make
+
+
+def test_least_outstanding_spreads_concurrent_questions():
+    group = SpaceGroup("g", ["s1", "s2", "s3"])
+    assert {group.acquire(), group.acquire(), group.acquire()} == {"s1", "s2", "s3"}
+    group.release("s2", True)
+    assert group.acquire() == "s2"
+
+
+def test_lowest_latency_prefers_faster_space():
+    group = SpaceGroup("g", ["s1", "s2"], strategy=RoutingStrategies.LOWEST_LATENCY)
+    for space_id, queued_ms in (("s1", 5000.0), ("s2", 200.0)):
+        group.acquire(exclude=[s for s in group.spaces if s != space_id])
+        group.release(space_id, True, {Status.SUBMITTED: queued_ms, Status.EXECUTING_QUERY: 800.0})
+    assert group.acquire() == "s2"
+    assert group.snapshot()["spaces"]["s1"]["ewma_queue_ms"] == 5000.0
+
+
+def test_weighted_routing_follows_weights():
+    group = SpaceGroup("g", {"s1": 3.0, "s2": 1.0}, strategy=RoutingStrategies.WEIGHTED)
+    group._random = random.Random(0)
+    picks = [group.choose() for _ in range(2000)]
+    assert 1350 < picks.count("s1") < 1650
+
+
+def test_failing_space_cools_down():
+    group = SpaceGroup("g", ["s1", "s2"], failure_threshold=2, cooldown_seconds=60)
+    for _ in range(2):
+        group.acquire(exclude=["s2"])
+        group.release("s1", False)
+    assert [group.choose() for _ in range(10)] == ["s2"] * 10
+    assert group.snapshot()["spaces"]["s1"]["healthy"] is False
+
+
+def test_client_fails_over_to_another_space(make_client):
+    client = make_client(failing={"s1"}, space_routing="weighted")
+    client.space_groups["sales"].spaces["s2"].weight = 1e-9
+    response = client.ask_genie("Hello?")
+    assert response.success
+    assert response.space_id == "s2" and response.conversation_id == "conv-s2"
+    assert response.metrics["failed_over_from"] == ["s1"]
+    assert Status.SUBMITTED in response.metrics["status_ms"]
+    groups = client.readiness()["space_groups"]["sales"]
+    assert groups["failovers"] == 1 and groups["spaces"]["s1"]["failures"] == 1
+
+
+def test_every_space_failing_fails_the_response(make_client):
+    response = make_client(failing={"s1", "s2"}).ask_genie("Hello?")
+    assert not response.success and response.error_type == "APIRequestError"
+
+
+def test_failed_message_fails_over_to_another_space(make_client):
+    client = make_client(space_routing="weighted")
+    client.space_groups["sales"].spaces["s2"].weight = 1e-9
+    api = client.api_client
+    answered = {"status": Status.COMPLETED, "attachments": [{"attachment_id": "a1", "text": {"content": "Hello"}}]}
+    api.get_message.side_effect = lambda space_id, *args: (
+        {"status": Status.FAILED, "attachments": []} if space_id == "s1" else answered
+    )
+    response = client.ask_genie("Hello?")
+    assert response.success and response.status == Status.COMPLETED
+    assert response.space_id == "s2" and response.metrics["failed_over_from"] == ["s1"]
+    assert client.readiness()["space_groups"]["sales"]["spaces"]["s1"]["failures"] == 1
+
+
+def test_follow_ups_stay_on_the_answering_space(make_client):
+    client = make_client()
+    conversation = client.conversation()
+    conversation.ask("Hello?")
+    assert conversation.space_id in {"s1", "s2"}
+    assert not client.ask_genie("Again?", follow_up=True, conversation_id="c").success
+
+
+def test_cached_sql_is_stored_under_the_answering_space(make_client):
+    client = make_client(failing={"s1"}, space_routing="weighted", enable_sql_cache=True)
+    client.space_groups["sales"].spaces["s2"].weight = 1e-9
+    api = client.api_client
+    api.get_message.return_value = {"status": Status.COMPLETED, "attachments": [
+        {"attachment_id": "a1", "query": {"query": "SELECT 1"}}
+    ]}
+    api.get_query_result.return_value = {"statement_response": {"status": {"state": "SUCCEEDED"}}}
+    api.get_space.return_value = {"warehouse_id": "wh2"}
+    api.execute_statement.return_value = {"status": {"state": "SUCCEEDED"}}
+    assert client.ask_genie("Revenue?").space_id == "s2"
+    assert client.sql_cache.get("s2", "Revenue?") == "SELECT 1"
+
+    response = client.ask_genie("Revenue?")
+    assert response.metrics["sql_cache_hit"] is True and response.space_id == "s2"
+    api.get_space.assert_called_with("s2")
+    assert api.start_conversation.call_count == 2
@@ -0,0 +1,96 @@
+import pytest
+
+from genie_client.core.sql_cache import SQLCache
+from genie_client.exceptions.custom_errors import (APIRequestError, CircuitOpenError, LoadShedError,
+                                                  MemoryBudgetExceededError, TimeoutError)
+from genie_client.utils.constants import Status
+
+SQL = "SELECT paymentMethod, SUM(totalPrice) FROM sales GROUP BY 1"
+STATEMENT = {
+    "statement_id": "st1",
+    "status": {"state": "SUCCEEDED"},
+    "manifest": {"schema": {"columns": [{"name": "paymentMethod", "type_name": "STRING"},
+                                        {"name": "revenue", "type_name": "LONG"}]},
+                 "total_chunk_count": 2, "total_row_count": 2},
+    "result": {"chunk_index": 0, "data_array": [["amex", "6"]]},
+}
+
+
+@pytest.fixture
+def client(make_client):
+    client = make_client(enable_sql_cache=True)
+    api = client.api_client
+    api.get_space.return_value = {"warehouse_id": "wh1"}
+    api.execute_statement.return_value = {"statement_id": "st1", "status": {"state": "PENDING"}}
+    api.get_statement.return_value = STATEMENT
+    api.get_statement_result_chunk.return_value = {"chunk_index": 1, "data_array": [["visa", "24"]]}
+    api.start_conversation.return_value = {"conversation": {"id": "conv1"},
+                                           "message": {"id": "msg1", "status": Status.SUBMITTED}}
+    api.get_message.return_value = {"status": Status.COMPLETED, "attachments": [
+        {"attachment_id": "att1", "query": {"query": SQL, "statement_id": "st0"}}
+    ]}
+    api.get_query_result.side_effect = lambda *args, chunk_index=None: (
+        {"statement_response": STATEMENT} if chunk_index is None
+        else {"statement_response": {"result": {"chunk_index": 1, "data_array": [["visa", "24"]]}}}
+    )
+    return client
+
+
+def test_rerun_executes_sql_directly(client):
+    first = client.ask_genie("Revenue by payment method?")
+    response = client.rerun(first)
+    assert response.success
+    assert response.results["data"] == [["amex", "6"], ["visa", "24"]]
+    assert response.metrics["executed_directly"] is True
+    client.api_client.execute_statement.assert_called_once_with("wh1", SQL)
+
+
+def test_repeat_question_uses_sql_cache(client):
+    client.ask_genie("Revenue by payment method?")
+    response = client.ask_genie("revenue by payment method")
+    assert response.metrics["sql_cache_hit"] is True
+    assert response.sql == SQL
+    assert client.api_client.start_conversation.call_count == 1
+
+
+@pytest.mark.parametrize("error", [
+    APIRequestError("Table not found", status_code=400, response_body=""),
+    CircuitOpenError("Circuit open for statements"),
+    TimeoutError("Statement did not finish"),
+])
+def test_failed_cached_sql_falls_back_to_genie(client, error):
+    client.ask_genie("Revenue by payment method?")
+    client.api_client.execute_statement.side_effect = error
+    response = client.ask_genie("Revenue by payment method?")
+    assert response.success
+    assert "sql_cache_hit" not in response.metrics
+    assert client.api_client.start_conversation.call_count == 2
+
+
+@pytest.mark.parametrize("error", [
+    MemoryBudgetExceededError("Result does not fit"),
+    LoadShedError("Too many requests in flight"),
+])
+def test_capacity_errors_do_not_fall_back_to_genie(client, error):
+    client.ask_genie("Revenue by payment method?")
+    client.api_client.execute_statement.side_effect = error
+    response = client.ask_genie("Revenue by payment method?")
+    assert not response.success and response.error_type == type(error).__name__
+    assert client.api_client.start_conversation.call_count == 1
+
+
+def test_statement_timeout_cancels_the_statement(client):
+    client.config.poll_timeout = 0
+    client.api_client.get_statement.return_value = {"statement_id": "st1", "status": {"state": "RUNNING"}}
+    response = client.execute_sql(SQL, warehouse_id="wh1")
+    assert response.error_type == "TimeoutError"
+    client.api_client.cancel_statement.assert_called_once_with("st1")
+
+
+def test_sql_cache_evicts_and_expires():
+    cache = SQLCache(max_size=1, ttl=0)
+    cache.put("s", "Q one?", "SELECT 1")
+    assert cache.get("s", "q one") == "SELECT 1"
+    cache.put("s", "q two", "SELECT 2")
+    assert cache.get("s", "q one") is None
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 1}
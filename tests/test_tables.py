@@ -0,0 +1,59 @@
+from genie_client.utils.formatting import format_results_to_markdown
+from genie_client.utils.tables import CHARS_PER_TOKEN, TableRenderer, format_column, render_table
+
+COLUMNS = ["id", "amount", "name"]
+TYPES = ["LONG", "DECIMAL", "STRING"]
+
+
+def test_string_numbers_are_formatted_by_type():
+    assert format_column(["1", "12345", None, "n/a"], "INT") == ["1", "12,345", "NULL", "n/a"]
+    assert format_column(["999.5", "1234.567"], "DOUBLE") == ["999.5", "1,234.57"]
+    assert format_column(["a|b", "x\ny"], "STRING") == ["a\\|b", "x y"]
+
+
+def test_inferred_types_and_alignment():
+    table = format_results_to_markdown(COLUMNS, [["7", "1500.25", "Tom"], ["12000", "3", "Anne"]])
+    assert table.splitlines() == [
+        "| id     | amount   | name |",
+        "| -----: | -------: | ---- |",
+        "|      7 | 1,500.25 | Tom  |",
+        "| 12,000 |        3 | Anne |",
+    ]
+
+
+def test_character_budget_replaces_row_cap():
+    rows = [[str(i), "1.5", "x" * 10] for i in range(10_000)]
+    table = render_table(COLUMNS, rows, TYPES, max_chars=1000)
+    body, note = table.split("\n\n")
+    assert len(body) <= 1000
+    shown = len(body.splitlines()) - 2
+    assert note == f"*Showing first {shown} of 10000 rows*"
+    assert len(render_table(COLUMNS, rows, TYPES, max_tokens=250)) == len(table)
+    assert 250 * CHARS_PER_TOKEN == 1000
+
+
+def test_budget_stops_reading_iterators():
+    consumed = []
+
+    def rows():
+        for i in range(100_000):
+            consumed.append(i)
+            yield [str(i), "1", "x"]
+
+    table = render_table(COLUMNS, rows(), TYPES, max_chars=500)
+    assert table.endswith("output truncated*")
+    assert len(consumed) < 2000
+
+
+def test_incremental_rendering_matches_full_render():
+    # Widths are fixed by the first batch, so later rows must not be wider
+    rows = [[str(i), str(i * 10), f"row {i}"] for i in range(10, 40)]
+    renderer = TableRenderer(COLUMNS, TYPES, total_rows=30)
+    streamed = "".join(renderer.feed(rows[i:i + 10]) for i in range(0, 30, 10)) + renderer.finish()
+    assert streamed.rstrip("\n") == render_table(COLUMNS, rows, TYPES)
+    assert renderer.rows_rendered == 30
+
+
+def test_empty_results():
+    assert format_results_to_markdown(COLUMNS, []) == "No results found"
+    assert format_results_to_markdown([], [[1]]) == "No results found"
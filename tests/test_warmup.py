@@ -0,0 +1,76 @@
+import time
+from unittest.mock import patch
+
+import pytest
+
+from genie_client.core.client import GenieClient
+from genie_client.exceptions.custom_errors import APIRequestError
+
+
+@pytest.fixture
+def client(make_client):
+    client = make_client()
+    client.api_client.get_space.return_value = {"warehouse_id": "wh1"}
+    client.api_client.get_warehouse.return_value = {"state": "STOPPED"}
+    return client
+
+
+def test_warmup_primes_all_components(client):
+    state = client.warmup()
+    assert state["ready"] is True
+    assert set(state["components"]) == {"auth", "connection", "models", "warehouse"}
+    assert state["components"]["warehouse"]["started"] is True
+    client.api_client.start_warehouse.assert_called_once_with("wh1")
+    assert client.readiness()["warmed_at"] is not None
+
+
+def test_failed_component_is_reported(client):
+    client.api_client.warm_connection.side_effect = APIRequestError(
+        "Network error", status_code=0, response_body=""
+    )
+    state = client.warmup(warehouse=False)
+    assert state["ready"] is False
+    assert state["components"]["connection"]["status"] == "failed"
+
+
+def test_first_request_records_warm_start(client):
+    client.warmup(warehouse=False)
+    with patch.object(GenieClient, "_start_conversation", side_effect=APIRequestError(
+        "boom", status_code=500, response_body=""
+    )):
+        first = client.ask_genie("Revenue?")
+        second = client.ask_genie("Revenue?")
+    assert first.metrics["first_request"] is True
+    assert first.metrics["warm_start"] is True
+    assert "first_request" not in second.metrics
+    assert client.readiness()["first_request_ms"] == first.duration_ms
+
+
+def test_keep_warm_thread_stops(client):
+    client.warmer.start_keep_warm(0.01, warehouse=False)
+    client.close()
+    assert client.warmer._keep_warm_thread is None
+
+
+@pytest.mark.parametrize("state", ["STOPPING", "DELETED"])
+def test_unstartable_warehouse_is_not_started(client, state):
+    client.api_client.get_warehouse.return_value = {"state": state}
+    assert client.warmup()["components"]["warehouse"]["started"] is False
+    client.api_client.start_warehouse.assert_not_called()
+
+
+def test_keep_warm_survives_unexpected_errors(client):
+    client.api_client.warm_connection.side_effect = [RuntimeError("boom"), None, None, None]
+    client.warmer.start_keep_warm(0.01, warehouse=False)
+    for _ in range(200):
+        if client.warmer.state.last_keep_warm is not None:
+            break
+        time.sleep(0.01)
+    assert client.warmer._keep_warm_thread.is_alive()
+    assert client.warmer.state.last_keep_warm is not None
+
+
+def test_requests_without_warm_up_do_not_build_the_warmer(client):
+    client.api_client.start_conversation.side_effect = APIRequestError("boom", status_code=500, response_body="")
+    client.ask_genie("Revenue?")
+    assert client._warmer is None